@@ -0,0 +1,63 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+"""
+Requests/second of RestClient against a local stand-in server, with a new
+connection per request (pool_size=0, the behaviour before pooling) and
+with the pooled keep-alive connections.
+
+Usage: python benchmarks/bench_connection_pool.py [REQUESTS] [CONNECT_DELAY_MS]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from standin import StandInHandler, StandInServer  # noqa
+
+from zanataclient.zanatalib.rest.client import DEFAULT_POOL_SIZE, RestClient  # noqa
+
+
+def run(url, requests, pool_size):
+    client = RestClient(url, pool_size=pool_size)
+    headers = {'Accept': 'application/json'}
+    start = time.time()
+    for i in range(requests):
+        response, content = client.process_request('server_version', headers=dict(headers))
+        assert response['status'] == '200', response['status']
+    return time.time() - start
+
+
+def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    StandInHandler.connect_delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+    print("%d requests, simulated connect cost %.1f ms" % (requests, StandInHandler.connect_delay * 1000))
+    for label, pool_size in (('new connection per request', 0), ('pooled connections', DEFAULT_POOL_SIZE)):
+        server = StandInServer().start()
+        try:
+            elapsed = run(server.url, requests, pool_size)
+            print("%-28s %8.1f req/s  (%d connections)" % (label, requests / elapsed, server.connections))
+        finally:
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
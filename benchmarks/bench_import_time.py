@@ -0,0 +1,101 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+"""
+Time taken to import the zanata command in a new interpreter, which every
+run of the command pays before doing anything, and the modules loaded by
+zanata help and by a command. On python 3.7 and later the slowest imports
+are listed, as given by -X importtime. Exits with 1 when the median is
+over MAX_MS, to be used as a guard against startup regressions.
+
+Usage: python benchmarks/bench_import_time.py [MAX_MS]
+make bench passes IMPORT_MAX_MS of the Makefile as MAX_MS.
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+RUNS = 9
+SLOWEST = 10
+# imported by zanata help, each command imports the rest
+CLI_IMPORT = "from zanataclient import zanata"
+COMMAND_IMPORT = CLI_IMPORT + "; import zanataclient.pushcmd, zanataclient.pullcmd, zanataclient.context"
+TIMED = """
+import time
+start = time.time()
+%s
+import sys
+print('%%f %%d' %% (time.time() - start, len(sys.modules)))
+"""
+
+
+def run_python(code, *options):
+    env = dict(os.environ, PYTHONPATH=ROOT, PYTHONDONTWRITEBYTECODE='')
+    process = subprocess.Popen([sys.executable] + list(options) + ['-c', code], env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    out, err = process.communicate()
+    if process.returncode:
+        sys.exit(err.decode('utf-8'))
+    return out.decode('utf-8'), err.decode('utf-8')
+
+
+def time_import(statement):
+    runs = []
+    for i in range(RUNS):
+        seconds, modules = run_python(TIMED % statement)[0].split()
+        runs.append((float(seconds), int(modules)))
+    runs.sort()
+    return runs[RUNS // 2]
+
+
+def slowest_imports(statement):
+    """
+    (cumulative us, module) of the slowest imports, from -X importtime
+    """
+    imports = []
+    for line in run_python(statement, '-X', 'importtime')[1].splitlines():
+        fields = line.split('|')
+        if len(fields) == 3 and fields[1].strip().isdigit():
+            imports.append((int(fields[1]), fields[2].strip()))
+    return sorted(imports, reverse=True)[:SLOWEST]
+
+
+def main():
+    max_ms = float(sys.argv[1]) if len(sys.argv) > 1 else None
+    # compiled once, so that the runs do not time the compilation
+    run_python(COMMAND_IMPORT)
+    print("python %s, median of %d imports" % (sys.version.split()[0], RUNS))
+    cli_time = None
+    for name, statement in (('zanata help', CLI_IMPORT), ('command', COMMAND_IMPORT)):
+        seconds, modules = time_import(statement)
+        cli_time = cli_time if cli_time is not None else seconds
+        print("%-12s %8.1f ms %6d modules" % (name, seconds * 1000, modules))
+    if sys.version_info >= (3, 7):
+        print("\nslowest imports of zanata help, cumulative")
+        for microseconds, module in slowest_imports(CLI_IMPORT):
+            print("%8.1f ms  %s" % (microseconds / 1000.0, module))
+    if max_ms is not None and cli_time * 1000 > max_ms:
+        print("\nzanata help imports in %.1f ms, over %.1f ms" % (cli_time * 1000, max_ms))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
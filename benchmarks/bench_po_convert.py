@@ -0,0 +1,148 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+"""
+Throughput in entries/second and peak memory of the conversion of
+generated POT and PO files to the JSON bodies pushed, as push does it:
+the plural check and potfile_to_json for a template, pofile_to_json for
+a translation with a share of obsolete entries. The files are read by
+polib and by the lexer of polexer, for the speedup of the lexer. Each
+conversion runs in its own process, the peak memory is its growth over
+the process after the imports.
+
+Usage: python benchmarks/bench_po_convert.py [ENTRIES,...] [OBSOLETE_SHARE]
+e.g. python benchmarks/bench_po_convert.py 10000,100000,1000000 0.1
+"""
+
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from zanataclient.publicanutil import PublicanUtility  # noqa
+
+
+WORDS = ('file', 'server', 'project', 'version', 'document', 'translation', 'cannot', 'open',
+         'the', 'a', 'of', 'is', 'not', 'was', 'found', 'please', 'select', 'settings', 'error')
+HEADER = '''# Generated for the benchmark
+msgid ""
+msgstr ""
+"Project-Id-Version: bench 1.0\\n"
+"Content-Type: text/plain; charset=UTF-8\\n"
+"Content-Transfer-Encoding: 8bit\\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\\n"
+
+'''
+
+
+def sentence(rand, words):
+    return ' '.join(rand.choice(WORDS) for i in range(words)).capitalize()
+
+
+def write_po_file(path, entries, translated=True, obsolete=0.0, seed=0):
+    """
+    Writes a POT file, or a PO file when translated, with the obsolete
+    entries at the end as gettext keeps them
+    """
+    rand = random.Random(seed)
+    with open(path, 'w') as po:
+        po.write(HEADER)
+        for i in range(entries):
+            is_obsolete = i >= entries * (1 - obsolete)
+            prefix = '#~ ' if is_obsolete else ''
+            lines = []
+            if not is_obsolete:
+                lines.append('#. extracted comment %d' % i)
+                lines.append('#: src/module%d.c:%d src/other%d.c:%d' % (i % 40, i, i % 7, i * 3))
+                if i % 9 == 0:
+                    lines.append('#, c-format')
+            if i % 20 == 5:
+                lines.append(prefix + 'msgctxt "menu %d"' % i)
+            msgid = '%s %d' % (sentence(rand, rand.randint(2, 12)), i)
+            lines.append(prefix + 'msgid "%s"' % msgid)
+            if i % 20 == 0:
+                lines.append(prefix + 'msgid_plural "%s items"' % msgid)
+                for form in range(2):
+                    msgstr = sentence(rand, 6) if translated else ''
+                    lines.append(prefix + 'msgstr[%d] "%s"' % (form, msgstr))
+            else:
+                lines.append(prefix + 'msgstr "%s"' % (sentence(rand, 8) if translated else ''))
+            po.write('\n'.join(lines) + '\n\n')
+
+
+def convert(kind, path, parser):
+    """
+    Converts the file as push does, returns seconds and peak memory growth in KB
+    """
+    publicanutil = PublicanUtility(lexer=parser == 'lexer')
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.time()
+    if kind == 'pot':
+        pofile = publicanutil.read_pofile(path)
+        publicanutil.has_plural(pofile)
+        body = publicanutil.potfile_to_json(path, os.path.dirname(path), pofile)[0]
+        publicanutil.close_pofile(pofile)
+    else:
+        body = publicanutil.pofile_to_json(path)
+    elapsed = time.time() - start
+    assert body
+    return elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - baseline
+
+
+def run_case(kind, path, parser):
+    output = subprocess.check_output([sys.executable, __file__, '--convert', kind, path, parser])
+    elapsed, memory = output.split()
+    return float(elapsed), int(memory)
+
+
+def main():
+    if sys.argv[1:2] == ['--convert']:
+        print("%f %d" % convert(sys.argv[2], sys.argv[3], sys.argv[4]))
+        return
+    sizes = [int(size) for size in sys.argv[1].split(',')] if len(sys.argv) > 1 else [10000, 100000]
+    obsolete = float(sys.argv[2]) if len(sys.argv) > 2 else 0.1
+    print("%d%% obsolete entries in the PO files" % (obsolete * 100))
+    columns = ('file', 'entries', 'parser', 'seconds', 'entries/s', 'peak MB', 'speedup')
+    print("%-5s %9s %-6s %10s %14s %12s %8s" % columns)
+    folder = tempfile.mkdtemp()
+    try:
+        for entries in sizes:
+            for kind in ('pot', 'po'):
+                path = os.path.join(folder, 'bench.' + kind)
+                write_po_file(path, entries, translated=kind == 'po', obsolete=obsolete if kind == 'po' else 0)
+                polib_elapsed = None
+                for parser in ('polib', 'lexer'):
+                    elapsed, memory = run_case(kind, path, parser)
+                    polib_elapsed = polib_elapsed or elapsed
+                    print("%-5s %9d %-6s %10.2f %14.0f %12.1f %7.1fx" % (
+                        kind, entries, parser, elapsed, entries / elapsed, memory / 1024.0, polib_elapsed / elapsed))
+                os.remove(path)
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+"""
+Time taken to write the po files of a document for many locales, as pull
+does it once the template and translations are retrieved: from the JSON of
+the template for every locale, and from a TemplateSkeleton read once for
+the document and shared by the locales.
+
+Usage: python benchmarks/bench_pull_locales.py [ENTRIES] [LOCALES] [TRANSLATED_SHARE]
+e.g. python benchmarks/bench_pull_locales.py 20000 35 0.2
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from zanataclient.publicanutil import PublicanUtility, TemplateSkeleton  # noqa
+from zanataclient.zanatalib.logger import Logger  # noqa
+
+
+def template_json(entries):
+    textflows = []
+    for i in range(entries):
+        extensions = [{'object-type': 'pot-entry-header', 'context': 'menu' if i % 20 == 5 else None,
+                       'references': ['src/module%d.c:%d src/other%d.c:%d' % (i % 40, i, i % 7, i * 3)],
+                       'flags': ['c-format'] if i % 9 == 0 else [], 'extractedComment': ''},
+                      {'object-type': 'comment', 'value': 'extracted comment %d' % i, 'space': 'preserve'}]
+        textflow = {'id': str(i), 'lang': 'en-US', 'content': u'Message number %d' % i, 'extensions': extensions}
+        if i % 20 == 0:
+            textflow['contents'] = [u'One item %d' % i, u'%%d items %d' % i]
+        textflows.append(textflow)
+    return {'name': 'bench', 'lang': 'en-US', 'contentType': 'application/x-gettext', 'textFlows': textflows,
+            'extensions': [{'object-type': 'po-header', 'comment': 'Generated for the benchmark',
+                            'entries': [{'key': 'Plural-Forms', 'value': 'nplurals=2; plural=(n != 1);'}]}]}
+
+
+def translations_json(publicanutil, template, share):
+    targets = []
+    for i, textflow in enumerate(template['textFlows']):
+        if i % 100 < share * 100:
+            resId = publicanutil.get_resId(ResIdEntry(textflow))
+            target = {'resId': resId, 'state': 'NeedReview' if i % 7 == 0 else 'Approved'}
+            if textflow.get('contents'):
+                target['contents'] = [u'Translated one %d' % i, u'Translated %d' % i]
+            else:
+                target['content'] = u'Translated %d' % i
+            targets.append(target)
+    return {'textFlowTargets': targets, 'extensions': []}
+
+
+class QuietLogger(Logger):
+    """
+    Logger of the timed loops, whose line for each po file written would bury the results
+    """
+    def _print(self, message):
+        pass
+
+
+class ResIdEntry(object):
+    """
+    msgid and msgctxt of a textflow, for its resId
+    """
+    def __init__(self, textflow):
+        self.msgid = textflow['contents'][0] if textflow.get('contents') else textflow['content']
+        self.msgctxt = textflow['extensions'][0]['context']
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    locales = int(sys.argv[2]) if len(sys.argv) > 2 else 35
+    share = float(sys.argv[3]) if len(sys.argv) > 3 else 0.2
+    publicanutil = PublicanUtility()
+    publicanutil.log = QuietLogger()
+    template = template_json(entries)
+    translations = translations_json(publicanutil, template, share)
+    print("%d entries, %d%% translated, %d locales" % (entries, share * 100, locales))
+    folder = tempfile.mkdtemp()
+    try:
+        json_elapsed = None
+        for name in ('json', 'skeleton'):
+            start = time.time()
+            pot = template if name == 'json' else TemplateSkeleton(template)
+            for locale in range(locales):
+                path = os.path.join(folder, '%s-%d.po' % (name, locale))
+                publicanutil.save_to_pofile(path, translations, pot, False, str(locale), 'bench')
+            elapsed = time.time() - start
+            json_elapsed = json_elapsed or elapsed
+            print("%-9s %8.2f s %8.1f ms/locale %6.1fx" % (
+                name, elapsed, elapsed * 1000 / locales, json_elapsed / elapsed))
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
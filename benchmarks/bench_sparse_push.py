@@ -0,0 +1,117 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+"""
+Translation push body size and latency, with every entry (the default)
+and with --sparse, for a generated document translated to a different
+extent in each locale. The bodies are pushed to a local stand-in server
+reading them at a simulated upload bandwidth.
+
+Usage: python benchmarks/bench_sparse_push.py [ENTRIES] [UPLOAD_MBIT]
+"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+import polib
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from standin import StandInHandler, StandInServer  # noqa
+
+from zanataclient.publicanutil import PublicanUtility  # noqa
+from zanataclient.zanatalib.resource import ZanataResource  # noqa
+
+
+# share of translated entries, roughly what a project sees across its locales
+LOCALES = (('de', 0.98), ('fr', 0.9), ('ja', 0.7), ('pt-BR', 0.45), ('hi', 0.2), ('ta', 0.05))
+WORDS = ('file', 'server', 'project', 'version', 'document', 'translation', 'cannot', 'open',
+         'the', 'a', 'of', 'is', 'not', 'was', 'found', 'please', 'select', 'settings', 'error')
+RUNS = 5
+
+
+def sentence(rand, words):
+    return ' '.join(rand.choice(WORDS) for i in range(words)).capitalize() + '.'
+
+
+def write_po(path, entries, translated, rand):
+    po = polib.POFile()
+    po.metadata = {'Content-Type': 'text/plain; charset=UTF-8', 'Plural-Forms': 'nplurals=2; plural=(n != 1);'}
+    for i in range(entries):
+        occurrences = [('src/module%d.c' % (i % 40), str(i))]
+        done = rand.random() < translated
+        if i % 20 == 0:
+            msgid = sentence(rand, 6) + ' %d'
+            msgstr_plural = {0: sentence(rand, 6), 1: sentence(rand, 6)} if done else {0: '', 1: ''}
+            entry = polib.POEntry(msgid=msgid, msgid_plural=msgid + 's', msgstr_plural=msgstr_plural,
+                                  occurrences=occurrences)
+        else:
+            msgid = sentence(rand, rand.randint(2, 25))
+            entry = polib.POEntry(msgid=msgid, msgstr=sentence(rand, 8) if done else '', occurrences=occurrences)
+        if done and rand.random() < 0.05:
+            entry.flags.append('fuzzy')
+        po.append(entry)
+    po.save(path)
+
+
+def push(documents, body):
+    timings = []
+    for i in range(RUNS):
+        start = time.time()
+        documents.commit_translation('bench', '1.0', 'doc', 'de', body, 'auto')
+        timings.append(time.time() - start)
+    return sorted(timings)[RUNS // 2]
+
+
+def main():
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    mbit = float(sys.argv[2]) if len(sys.argv) > 2 else 20.0
+    StandInHandler.read_rate = int(mbit * 1000 * 1000 / 8)
+    print("%d entries, upload %.1f Mbit/s, median of %d pushes" % (entries, mbit, RUNS))
+    print("%-6s %6s %11s %11s %7s %10s %10s" % ('locale', 'done', 'full KB', 'sparse KB', 'saved', 'full ms', 'sparse ms'))
+
+    folder = tempfile.mkdtemp()
+    server = StandInServer().start()
+    publicanutil = PublicanUtility()
+    resource = ZanataResource(server.url, {'Accept': 'application/json'})
+    documents = resource.documents
+    rand = random.Random(0)
+    try:
+        for locale, translated in LOCALES:
+            path = os.path.join(folder, locale + '.po')
+            write_po(path, entries, translated, rand)
+            full = publicanutil.pofile_to_json(path)
+            sparse = publicanutil.pofile_to_json(path, sparse=True)
+            full_time, sparse_time = push(documents, full), push(documents, sparse)
+            print("%-6s %5d%% %11.1f %11.1f %6.1f%% %10.1f %10.1f" % (
+                locale, translated * 100, len(full) / 1024.0, len(sparse) / 1024.0,
+                100 - 100.0 * len(sparse) / len(full), full_time * 1000, sparse_time * 1000
+            ))
+    finally:
+        resource.restclient.pool.clear()
+        server.stop()
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    main()
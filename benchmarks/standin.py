@@ -0,0 +1,115 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+"""
+Local stand-in for a Zanata server, used by the benchmarks.
+It speaks HTTP/1.1 with keep-alive, answers every GET with a small
+json document and accepts every PUT/POST body.
+"""
+
+import threading
+import time
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # answer with a single write, so small responses are not held back by nagle/delayed ack
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    # simulated cost of a new connection (TCP connect and TLS handshake)
+    connect_delay = 0.0
+    # simulated server time per request
+    request_delay = 0.0
+    # simulated upload bandwidth in bytes/s, 0 for no limit
+    read_rate = 0
+    response_body = b'{"versionNo": "4.0.0", "buildTimeStamp": "unknown", "scmDescribe": "unknown"}'
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        self.server.connections += 1
+        if self.connect_delay:
+            time.sleep(self.connect_delay)
+
+    def log_message(self, *args):
+        pass
+
+    def _respond(self, status, body):
+        if self.request_delay:
+            time.sleep(self.request_delay)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        chunks = []
+        while length > 0:
+            chunk = self.rfile.read(min(length, 65536))
+            if not chunk:
+                break
+            if self.read_rate:
+                time.sleep(float(len(chunk)) / self.read_rate)
+            chunks.append(chunk)
+            length -= len(chunk)
+        body = b''.join(chunks)
+        self.server.bytes_received += len(body)
+        return body
+
+    def do_GET(self):
+        self._respond(200, self.response_body)
+
+    def do_PUT(self):
+        self._read_body()
+        self._respond(200, b'')
+
+    def do_POST(self):
+        self._read_body()
+        self._respond(201, b'')
+
+
+class StandInServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+    def __init__(self, handler_class=StandInHandler):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), handler_class)
+        self.connections = 0
+        self.bytes_received = 0
+
+    @property
+    def url(self):
+        return 'http://127.0.0.1:%s/zanata' % self.server_address[1]
+
+    def start(self):
+        thread = threading.Thread(target=self.serve_forever)
+        thread.daemon = True
+        thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
@@ -20,6 +20,19 @@
 # Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
 # Boston, MA  02110-1301, USA.
 
-from .parseconfig import *
-from .publicanutil import *
 from .zanata import *
+from .zanatalib.lazy import lazy_package
+
+
+# imported when first used, see LazyPackage; the commands are those
+# zanata.py imported before loading them only to run them
+lazy_package(__name__, (
+    ('parseconfig', ("ZanataConfig",)),
+    ('publicanutil', ("PublicanUtility",)),
+    ('cmdbase', ("CreateProject", "CreateVersion", "GlossaryDelete", "GlossaryPush",
+                 "ListProjects", "ProjectInfo", "Stats", "VersionInfo")),
+    ('context', ("ContextData", "ProjectContext")),
+    ('initcmd', ("ZanataInit",)),
+    ('pullcmd', ("GenericPull",)),
+    ('pushcmd', ("GenericPush", "PoPush", "PublicanPush")),
+))
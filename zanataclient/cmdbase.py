@@ -24,10 +24,16 @@ import os
 import string
 import sys
 
+from .manifest import PushManifest, TranslationState, manifest_file_name
 from .publicanutil import PublicanUtility
 from .zanatacmd import ZanataCommand
 from .zanatalib.error import NoSuchFileException
+from .zanatalib.jobpool import cpu_count
 from .zanatalib.logger import Logger
+from .zanatalib.projectutils import ToolBox
+from .zanatalib.rest.cache import DEFAULT_CACHE_SIZE, HttpCache
+from .zanatalib.rest.client import DEFAULT_POOL_SIZE
+from .zanatalib.rest.memo import RequestMemo
 
 
 log = Logger()
@@ -35,6 +41,12 @@ log = Logger()
 
 class CommandsInit(object):
     _fields = ['args', 'context_data']
+    # whether the command checks that the project and version exist
+    verifies_project = False
+    # keys of the remote config the command reads, fetched before it runs,
+    # or when first read for the lazy ones
+    context_keys = ('server_version', 'locale_map', 'project_type')
+    lazy_context_keys = ()
 
     def __init__(self, *args, **kargs):
         for name, val in zip(self._fields, args):
@@ -71,10 +83,94 @@ class CommandsBase(CommandsInit):
             if not headers.get('X-Auth-User') and not headers.get('X-Auth-Token'):
                 log.error("Please specify username and apikey in zanata.ini or with '--username' and '--apikey' options")
                 sys.exit(1)
-        return ZanataCommand(url, headers)
+        return ZanataCommand(url, headers, **self.get_client_options())
+
+    def get_client_options(self):
+        """
+        Options for the RestClient shared by the commands services
+        """
+        # keep an idle connection around for every worker
+        client_options = {'pool_size': max(DEFAULT_POOL_SIZE, self.get_jobs())}
+        memo = self.context_data.get('request_memo')
+        client_options['memo'] = memo if memo is not None else RequestMemo()
+        if self.is_enabled('httpcache', 'http-cache'):
+            client_options['cache'] = self.get_http_cache()
+        if self.is_enabled('gzip', 'gzip'):
+            client_options['compress_requests'] = True
+        for name, server_option in (('retries', 'retries'), ('retry_budget', 'retry-budget')):
+            value = self.get_server_option(server_option)
+            if value is None:
+                continue
+            try:
+                client_options[name] = int(value)
+            except ValueError:
+                log.error("Please specify the %s as a number in zanata.ini" % server_option)
+                sys.exit(1)
+        return client_options
+
+    def get_server_option(self, name, default=None):
+        """
+        Returns the value of "server.name" in zanata.ini
+        """
+        return (self.context_data.get('server_options') or {}).get(name, default)
+
+    def is_enabled(self, option, server_option):
+        """
+        Tells whether a feature is switched on by the command option or in zanata.ini
+        """
+        if option in self.context_data:
+            return True
+        return self.get_server_option(server_option, '').lower() in ('1', 'yes', 'true', 'on')
+
+    def get_http_cache(self):
+        """
+        Persistent cache of the GET responses, one for each server and user
+        """
+        user_name = self.context_data.get('http_headers', {}).get('X-Auth-User') or ''
+        cache_dir = self.get_server_option('http-cache-dir') or \
+            ToolBox.get_cache_dir('http', self.context_data.get('url') or '', user_name)
+        cache_size = self.get_server_option('http-cache-size', DEFAULT_CACHE_SIZE)
+        try:
+            cache_size = float(cache_size)
+        except ValueError:
+            log.error("Please specify the http-cache-size in MB in zanata.ini")
+            sys.exit(1)
+        try:
+            return HttpCache(os.path.expanduser(cache_dir), cache_size)
+        except OSError as e:
+            log.warn("Can not use the http cache in %s: %s" % (cache_dir, e))
+
+    def get_jobs(self):
+        jobs = self.context_data.get('jobs') or 1
+        try:
+            jobs = int(jobs)
+        except ValueError:
+            jobs = 0
+        if jobs < 1:
+            log.error("Please specify a positive number of parallel jobs with '--jobs' option")
+            sys.exit(1)
+        return jobs
+
+    def get_convert_jobs(self):
+        """
+        Number of processes converting the files to JSON for push, the number of CPUs by default
+        """
+        jobs = self.context_data.get('convertjobs')
+        if jobs is None:
+            return cpu_count()
+        try:
+            jobs = int(jobs)
+        except ValueError:
+            jobs = 0
+        if jobs < 1:
+            log.error("Please specify a positive number of processes with '--convert-jobs' option")
+            sys.exit(1)
+        return jobs
 
 
 class ListProjects(CommandsBase):
+    context_keys = ()
+
     def __init__(self, *args, **kargs):
         super(ListProjects, self).__init__(*args, **kargs)
 
@@ -83,6 +179,8 @@ class ListProjects(CommandsBase):
 
 
 class ProjectInfo(CommandsBase):
+    context_keys = ()
+
     def __init__(self, *args, **kargs):
         super(ProjectInfo, self).__init__(*args, **kargs)
 
@@ -95,6 +193,8 @@ class ProjectInfo(CommandsBase):
 
 
 class VersionInfo(CommandsBase):
+    context_keys = ()
+
     def __init__(self, *args, **kargs):
         super(VersionInfo, self).__init__(*args, **kargs)
 
@@ -109,6 +209,8 @@ class VersionInfo(CommandsBase):
 
 
 class CreateProject(CommandsBase):
+    context_keys = ('project_type',)
+
     def __init__(self, *args, **kargs):
         super(CreateProject, self).__init__(*args, **kargs)
 
@@ -137,6 +239,8 @@ class CreateProject(CommandsBase):
 
 
 class CreateVersion(CommandsBase):
+    context_keys = ()
+
     def __init__(self, *args, **kargs):
         super(CreateVersion, self).__init__(*args, **kargs)
 
@@ -164,6 +268,8 @@ class CreateVersion(CommandsBase):
 
 
 class GlossaryPush(CommandsBase):
+    context_keys = ('locale_map',)
+
     def __init__(self, *args, **kargs):
         super(GlossaryPush, self).__init__(*args, **kargs)
 
@@ -206,6 +312,8 @@ class GlossaryPush(CommandsBase):
 
 
 class GlossaryDelete(CommandsBase):
+    context_keys = ()
+
     def __init__(self, *args, **kargs):
         super(GlossaryDelete, self).__init__(*args, **kargs)
 
@@ -220,6 +328,8 @@ class GlossaryDelete(CommandsBase):
 
 
 class Stats(CommandsBase):
+    context_keys = ('locale_map',)
+
     def __init__(self, *args, **kargs):
         super(Stats, self).__init__(*args, **kargs)
 
@@ -247,6 +357,8 @@ class PushPull(CommandsBase):
     """
     This is base class for push-pull commands
     """
+    verifies_project = True
+
     def __init__(self, *args, **kargs):
         super(PushPull, self).__init__(*args, **kargs)
 
@@ -275,6 +387,46 @@ class PushPull(CommandsBase):
             self.copytrans = False
         self.file_mapping_rules = self.context_data['file_mapping_rules'] \
             if 'file_mapping_rules' in self.context_data else None
+        self.jobs = self.get_jobs()
+        self.convert_jobs = self.get_convert_jobs()
+
+    def get_project_folder(self):
+        """
+        Folder of zanata.xml, or the current one
+        """
+        project_config = self.context_data.get('project_config')
+        return os.path.dirname(os.path.abspath(project_config)) if project_config else os.getcwd()
+
+    def get_translation_state(self, merge):
+        """
+        Digests of the translations pushed before, with --delta
+        """
+        if 'delta' not in self.context_data:
+            return None
+        if merge != 'auto':
+            log.warn("--delta only applies with merge option auto, pushing all the translations")
+            return None
+        return TranslationState(self.get_project_folder(), self.context_data.get('url'), self.project_id, self.version_id)
+
+    def get_sparse(self, merge):
+        """
+        Whether the untranslated entries are left out, with --sparse
+        """
+        if 'sparse' not in self.context_data:
+            return False
+        if merge != 'auto':
+            log.warn("--sparse only applies with merge option auto, pushing the untranslated entries")
+            return False
+        return True
+
+    def get_push_manifest(self):
+        """
+        Manifest of the templates pushed, kept next to zanata.xml once --incremental was used
+        """
+        path = os.path.join(self.get_project_folder(), manifest_file_name)
+        incremental = 'incremental' in self.context_data
+        if incremental or os.path.exists(path):
+            return PushManifest(path, self.context_data.get('url'), self.project_id, self.version_id, incremental)
 
     # Functions in PoPush and GenericPush get tmlfile,file list
     def get_files(self):
@@ -466,6 +618,8 @@ class PushPull(CommandsBase):
         import_param['lang_list'] = self.get_lang_list()
         import_param['locale_map'] = self.context_data.get('locale_map')
         import_param['project_type'] = project_type
+        import_param['state'] = self.get_translation_state(import_param['merge'])
+        import_param['sparse'] = self.get_sparse(import_param['merge'])
         return import_param
 
     def log_message(self, project_id, project_version, username):
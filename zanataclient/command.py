@@ -29,7 +29,12 @@ import os
 import os.path
 import subprocess
 import sys
-from distutils import spawn
+
+try:
+    # distutils takes longer to import than the rest of the client on python 3
+    from shutil import which as find_executable
+except ImportError:
+    from distutils.spawn import find_executable
 
 
 class OptionConfigurationError(Exception):
@@ -313,7 +318,7 @@ def handle_program(
         # otherwise, use VERSION-FILE
         version_number = ""
         git_config = os.path.join(os.path.dirname(sys.argv[0]), '.git', 'config')
-        git_executable = spawn.find_executable("git")
+        git_executable = find_executable("git")
         if os.path.isfile(git_config) and not (git_executable is None):
             proc = subprocess.Popen(["git", "describe"], stdout=subprocess.PIPE)
             (out, err) = proc.communicate()
@@ -21,21 +21,29 @@
 # Boston, MA  02110-1301, USA.
 
 __all__ = (
-    "ProjectContext",
+    "ContextData", "ProjectContext",
 )
 
+import atexit
+import copy
 import functools
 import os
 import re
 import sys
+import threading
+import time
 
+from .manifest import read_json, write_json
 from .parseconfig import ZanataConfig
 from .zanatalib.error import (
     UnAvaliableResourceException,
     UnavailableServiceError,
 )
+from .zanatalib.jobpool import JobPool
 from .zanatalib.logger import Logger
-from .zanatalib.projectservice import IterationService, LocaleService
+from .zanatalib.projectservice import IterationService, LocaleService, ProjectService
+from .zanatalib.projectutils import ToolBox
+from .zanatalib.rest.memo import RequestMemo
 from .zanatalib.versionservice import VersionService
 
 
@@ -44,6 +52,13 @@ log = Logger()
 project_config_file_tuple = ('zanata.xml', 'flies.xml')
 user_config_file_tuple = ('zanata.ini', 'flies.ini')
 client_version_file = 'VERSION-FILE'
+remote_config_file = 'remote-config.json'
+# in seconds, "server.context-ttl" in zanata.ini, 0 disables the cache
+DEFAULT_CONTEXT_TTL = 3600
+# an older remote config is fetched again before the command runs
+MAX_CONTEXT_AGE = 7 * 24 * 3600
+# at exit, a background revalidation is given that long to save its result
+REVALIDATE_TIMEOUT = 5
 
 
 class ContextBase(object):
@@ -53,8 +68,16 @@ class ContextBase(object):
     def __init__(self, command_options, *args, **kwargs):
         self.command_options = command_options
         self.mode = args[0] if len(args) > 0 and args[0] else 'default'
+        # the command checks that the project and version exist
+        self.prefetch_project = kwargs.get('prefetch_project', False)
+        # remote config keys the command reads, all of them by default, and
+        # those among them fetched only when it reads them
+        self.remote_keys = kwargs.get('remote_keys')
+        self.lazy_keys = kwargs.get('lazy_keys') or ()
         self.log = Logger()
         self.config = ZanataConfig()
+        # GET responses shared with the command, e.g. the project it checks
+        self.memo = RequestMemo()
 
         self.remote_config, self.local_config, \
             self.command_dict = [{} for i in range(3)]
@@ -79,6 +102,7 @@ class ContextBase(object):
             if os.path.exists(path):
                 log.info("Loading zanata project config from: %s" % path)
                 self.local_config.update(self.config.read_project_config(path))
+                self.local_config.update({'project_config': path})
                 break
 
     def _update_url(self):
@@ -137,6 +161,9 @@ class ContextBase(object):
                                      "current path or path in '--user-config' option")
                         else:
                             self.local_config.update({'user_name': user_name, 'key': apikey})
+                            self.local_config.update(
+                                {'server_options': self.config.get_server_options(server)}
+                            )
                             log.info("zanata server: %s" % self.get_url())
                             return True
                 except Exception as e:
@@ -186,7 +213,7 @@ class ContextBase(object):
         """
         This fetches and updates server version
         """
-        version = VersionService(self.get_url(), self.local_config.get('http_headers'))
+        version = VersionService(self.get_url(), self.local_config.get('http_headers'), memo=self.memo)
 
         if 'disablesslcert' in self.command_dict:
             version.disable_ssl_cert_validation()
@@ -195,14 +222,14 @@ class ContextBase(object):
             content = version.get_server_version()
             if content:
                 server_version = content.get('versionNo')
-                log.info("zanata python client version: %s, zanata server API version: %s" %
-                         (self.local_config.get('client_version'), server_version))
+                self.log.info("zanata python client version: %s, zanata server API version: %s" %
+                              (self.local_config.get('client_version'), server_version))
                 self.remote_config.update({'server_version': server_version})
         except UnAvaliableResourceException:
-            log.info("zanata python client version: %s" % self.local_config.get('client_version'))
-            log.error("Can not retrieve the server version, server may not support the version service")
+            self.log.info("zanata python client version: %s" % self.local_config.get('client_version'))
+            self.log.error("Can not retrieve the server version, server may not support the version service")
         except UnavailableServiceError:
-            log.error("Service Temporarily Unavailable, stop processing!")
+            self.log.error("Service Temporarily Unavailable, stop processing!")
             sys.exit(1)
 
     def _update_locale_mapping(self):
@@ -211,13 +238,13 @@ class ContextBase(object):
         """
         local_config_locale_map = self.local_config.get('locale_map')
         if local_config_locale_map and len(local_config_locale_map.keys()) > 0:
-            log.warn('Locale mappings are now handled using locale aliases on the server, '
-                     'so locale mappings in the project config file (zanata.xml) are now deprecated.'
-                     '\nPlease add a locale alias in the project language settings to replace each locale '
-                     'mapping in zanata.xml, then remove the <locales> section from zanata.xml.')
+            self.log.warn('Locale mappings are now handled using locale aliases on the server, '
+                          'so locale mappings in the project config file (zanata.xml) are now deprecated.'
+                          '\nPlease add a locale alias in the project language settings to replace each locale '
+                          'mapping in zanata.xml, then remove the <locales> section from zanata.xml.')
             return
         # Call locale service
-        locale_service = LocaleService(self.get_url(), self.local_config.get('http_headers'))
+        locale_service = LocaleService(self.get_url(), self.local_config.get('http_headers'), memo=self.memo)
         project, version = self.get_project_id_version()
         if project:
             locales = locale_service.get_locales(project, version)
@@ -232,12 +259,39 @@ class ContextBase(object):
             if self.local_config.get('http_headers').get('Content-Type'):
                 self.local_config['http_headers']['Content-Type'] = 'application/xml'
             project_config = \
-                IterationService(self.get_url(), self.local_config.get('http_headers')).config(
+                IterationService(self.get_url(), self.local_config.get('http_headers'), memo=self.memo).config(
                     self.local_config.get('project_id'), self.local_config.get('project_version')
                 )
             if project_config and project_config.get('project-type'):
                 self.remote_config.update({'project_type': project_config['project-type']})
 
+    def _get_project_service(self):
+        project_service = ProjectService(self.get_url(), self.local_config.get('http_headers'), memo=self.memo)
+        if 'disablesslcert' in self.command_dict:
+            project_service.disable_ssl_cert_validation()
+        return project_service
+
+    def _prefetch_project(self):
+        """
+        Fetches the project while the remote configs are fetched, the
+        response is kept by the request memo for the check of the command
+        """
+        project, version = self.get_project_id_version()
+        if project:
+            project_service = self._get_project_service()
+            project_service.restclient.process_request('list_project', project,
+                                                       headers=project_service.http_headers)
+
+    def _prefetch_iteration(self):
+        """
+        Fetches the project version, as _prefetch_project does the project
+        """
+        project, version = self.get_project_id_version()
+        if project and version:
+            iteration_service = self._get_project_service().iterations
+            iteration_service.restclient.process_request('get_iteration', project, version,
+                                                         headers=iteration_service.http_headers)
+
     def process_locales(self, locales):
         """
         process locales received from server
@@ -264,18 +318,83 @@ class ContextBase(object):
         }
         return context_local_configs[self.mode]
 
-    def get_remote_configs(self):
+    def get_remote_config_methods(self):
         """
         Selects methods for remote configs for a given mode
-        :return: methods_list
+        :return: (key, method) list
         """
         context_remote_configs = {
-            'default': [self._update_server_version, self._update_locale_mapping,
-                        self._update_project_type],
+            'default': [('server_version', self._update_server_version),
+                        ('locale_map', self._update_locale_mapping),
+                        ('project_type', self._update_project_type)],
             'init': [],
         }
         return context_remote_configs[self.mode]
 
+    def get_remote_keys(self):
+        """
+        Keys of the remote config built before the command runs
+        """
+        return [key for key, method in self.get_remote_config_methods()
+                if (self.remote_keys is None or key in self.remote_keys) and key not in self.lazy_keys]
+
+    def get_remote_configs(self):
+        """
+        Selects methods for the remote configs the command needs first
+        :return: methods_list
+        """
+        remote_keys = self.get_remote_keys()
+        return [method for key, method in self.get_remote_config_methods() if key in remote_keys]
+
+    def get_prefetches(self):
+        """
+        Selects methods fetching ahead what the command reads next
+        :return: methods_list
+        """
+        if self.mode != 'default' or not self.prefetch_project:
+            return []
+        return [self._prefetch_project, self._prefetch_iteration]
+
+
+class QuietLogger(Logger):
+    """
+    Logger of a background revalidation, which would interleave its messages with the command ones
+    """
+    def _print(self, message):
+        pass
+
+
+class ContextData(dict):
+    """
+    context_data whose lazy keys are fetched when the command first reads them
+    """
+    def __init__(self, data, lazy=None):
+        """
+        ContextData constructor
+        :param lazy: key: function returning its value, None when it has none
+        """
+        super(ContextData, self).__init__(data)
+        self.lazy = dict(lazy or {})
+
+    def _fetch(self, key):
+        fetch = self.lazy.pop(key, None)
+        if fetch is not None and not dict.__contains__(self, key):
+            value = fetch()
+            if value is not None:
+                self[key] = value
+
+    def __getitem__(self, key):
+        self._fetch(key)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        self._fetch(key)
+        return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        self._fetch(key)
+        return dict.get(self, key, default)
+
 
 class ProjectContext(ContextBase):
     """
@@ -295,7 +414,21 @@ class ProjectContext(ContextBase):
         context_data = functools.reduce(
             lambda option, value: dict(option.items() + value.items()), precedence
         )
-        return self.filter_context_data(context_data)
+        return ContextData(self.filter_context_data(context_data), self.get_lazy_fetches())
+
+    def get_lazy_fetches(self):
+        """
+        Functions fetching the lazy keys of the remote config
+        :return: dict of key: function
+        """
+        methods = dict(self.get_remote_config_methods())
+
+        def lazy_fetch(key):
+            def fetch():
+                methods[key]()
+                return self.remote_config.get(key)
+            return fetch
+        return dict((key, lazy_fetch(key)) for key in self.lazy_keys if key in methods)
 
     def filter_context_data(self, data):
         """
@@ -316,8 +449,96 @@ class ProjectContext(ContextBase):
 
     def build_remote_config(self):
         """
-        This builds remote configuration dict.
+        This builds remote configuration dict, from the context cache when
+        it has a recent enough one. A cached one older than context-ttl is
+        used, and fetched again in the background for the next commands.
+        The requests, which do not depend on each other, are made at once.
         """
         build_remote_config = self.get_remote_configs()
-        [method() for method in build_remote_config]
+        prefetches = self.get_prefetches()
+        cache_path = self.get_remote_config_cache() if build_remote_config else None
+        if not cache_path:
+            self.call_concurrently(build_remote_config + prefetches)
+            return self.remote_config
+
+        cached = read_json(cache_path)
+        age = time.time() - cached.get('fetched', 0)
+        # an entry saved by a command which needed fewer keys is fetched again
+        missing = set(self.get_remote_keys()) - set(cached.get('keys') or ())
+        if 'refreshcontext' in self.command_dict or 'remote_config' not in cached or missing or \
+                not 0 <= age < MAX_CONTEXT_AGE:
+            self.call_concurrently(build_remote_config + prefetches)
+            self.save_remote_config(cache_path)
+            return self.remote_config
+
+        self.call_concurrently(prefetches)
+        self.remote_config.update(cached['remote_config'])
+        if self.remote_config.get('server_version'):
+            self.log.info("zanata python client version: %s, zanata server API version: %s" %
+                          (self.local_config.get('client_version'), self.remote_config['server_version']))
+        if age >= self.get_context_ttl():
+            self.revalidate_remote_config(cache_path)
         return self.remote_config
+
+    def call_concurrently(self, methods):
+        """
+        Calls the methods at once, a thread each, and raises the error of the
+        first one which failed, e.g. the SystemExit of a service
+        """
+        pool = JobPool(len(methods))
+        for method in methods:
+            pool.submit(method)
+        pool.join()
+
+    def get_context_ttl(self):
+        ttl = (self.local_config.get('server_options') or {}).get('context-ttl', DEFAULT_CONTEXT_TTL)
+        try:
+            return float(ttl)
+        except ValueError:
+            self.log.error("Please specify the context-ttl in seconds in zanata.ini")
+            sys.exit(1)
+
+    def get_remote_config_cache(self):
+        """
+        Returns the context cache file of the server, user, project and version,
+        None when the cache is disabled
+        """
+        if self.get_context_ttl() <= 0:
+            return None
+        project, version = self.get_project_id_version()
+        user_name = (self.local_config.get('http_headers') or {}).get('X-Auth-User') or ''
+        return os.path.join(
+            ToolBox.get_cache_dir('context', self.get_url() or '', user_name, project or '', version or ''),
+            remote_config_file
+        )
+
+    def save_remote_config(self, cache_path):
+        try:
+            write_json(cache_path, {'fetched': time.time(), 'keys': self.get_remote_keys(),
+                                    'remote_config': self.remote_config})
+        except (IOError, OSError) as e:
+            self.log.warn("Can not save the context cache %s: %s" % (cache_path, e))
+
+    def revalidate_remote_config(self, cache_path):
+        """
+        Fetches the remote config on another thread, while the command goes on with the cached one
+        """
+        context = copy.copy(self)
+        context.log = QuietLogger()
+        context.remote_config = {}
+        context.local_config = dict(self.local_config)
+        context.local_config['http_headers'] = dict(self.local_config.get('http_headers') or {})
+
+        def revalidate():
+            try:
+                context.call_concurrently(context.get_remote_configs())
+            except BaseException:
+                # e.g. the server is down, the next command tries again
+                return
+            context.save_remote_config(cache_path)
+
+        thread = threading.Thread(target=revalidate)
+        # daemon, so that a hanging server does not hold the exit up
+        thread.daemon = True
+        thread.start()
+        atexit.register(thread.join, REVALIDATE_TIMEOUT)
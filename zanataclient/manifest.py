@@ -0,0 +1,176 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "PushManifest", "TranslationState",
+)
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from .zanatalib.logger import Logger
+
+
+log = Logger()
+
+manifest_file_name = '.zanata-manifest.json'
+state_folder_name = '.zanata-translations'
+
+
+def digest(data):
+    if not isinstance(data, bytes):
+        data = data.encode('utf-8')
+    return hashlib.sha1(data).hexdigest()
+
+
+def write_json(path, data):
+    """
+    Writes data to path, replacing the previous file at once
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(folder)
+    except OSError:
+        if not os.path.isdir(folder):
+            raise
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path), dir=folder)
+    try:
+        with os.fdopen(fd, 'w') as json_file:
+            json.dump(data, json_file, indent=2, sort_keys=True, separators=(',', ': '))
+        os.chmod(temp_path, 0o644)
+        os.rename(temp_path, path)
+    except:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def read_json(path):
+    try:
+        with open(path) as json_file:
+            data = json.load(json_file)
+    except IOError:
+        return {}
+    except ValueError:
+        log.warn("Ignoring invalid file %s" % path)
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+class PushManifest(object):
+    """
+    Hashes of the source documents last pushed, for each server, project
+    and version. It is kept next to zanata.xml, so that push --incremental
+    can skip the documents which did not change since.
+    """
+    def __init__(self, path, url, project_id, version_id, incremental=False):
+        """
+        PushManifest constructor
+        :param path: manifest file, read when it exists
+        :param incremental: whether unchanged documents are skipped
+        """
+        self.path = path
+        self.incremental = incremental
+        self.changed = False
+        self._lock = threading.Lock()
+        self._manifest = read_json(path)
+        self.documents = self._manifest.setdefault(' '.join((url, project_id, version_id)), {})
+
+    @staticmethod
+    def digest(body):
+        return digest(body)
+
+    def skips(self, name, digest):
+        """
+        Tells whether document name can be skipped, as it was pushed with this digest
+        """
+        return self.incremental and self.documents.get(name) == digest
+
+    def set_pushed(self, name, digest):
+        with self._lock:
+            self.documents[name] = digest
+            self.changed = True
+
+    def save(self):
+        """
+        Writes the manifest, replacing the previous one at once
+        """
+        with self._lock:
+            if not self.changed:
+                return
+            try:
+                write_json(self.path, self._manifest)
+            except (IOError, OSError) as e:
+                log.warn("Can not save push manifest %s: %s" % (self.path, e))
+                return
+            self.changed = False
+
+
+class TranslationState(object):
+    """
+    Digests of the translations last pushed, a file for each document and
+    locale keyed by resId, kept next to zanata.xml. Only the targets whose
+    content, state or comment changed since are pushed again, the server
+    merges them with the others when merge is auto.
+    """
+    def __init__(self, folder, url, project_id, version_id):
+        self.folder = os.path.join(folder, state_folder_name, digest(' '.join((url, project_id, version_id))))
+
+    def delta(self, document, locale):
+        """
+        Returns the TranslationDelta of document in locale
+        """
+        return TranslationDelta(os.path.join(self.folder, locale, document.replace('/', ',') + '.json'))
+
+
+class TranslationDelta(object):
+    """
+    Picks the textflowtargets of a document and locale changed since the last push
+    """
+    def __init__(self, path):
+        self.path = path
+        self.pushed = read_json(path)
+        self.digests = {}
+        self.changed = 0
+
+    def filter(self, textflowtargets):
+        """
+        Returns the textflowtargets which were not pushed as they are
+        """
+        changed = []
+        for textflowtarget in textflowtargets:
+            target_digest = digest(json.dumps(textflowtarget, sort_keys=True))
+            self.digests[textflowtarget['resId']] = target_digest
+            if self.pushed.get(textflowtarget['resId']) != target_digest:
+                changed.append(textflowtarget)
+        self.changed = len(changed)
+        return changed
+
+    def save(self):
+        """
+        Records the textflowtargets filtered, once the server accepted them
+        """
+        self.pushed.update(self.digests)
+        try:
+            write_json(self.path, self.pushed)
+        except (IOError, OSError) as e:
+            log.warn("Can not save translation state %s: %s" % (self.path, e))
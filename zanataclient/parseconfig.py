@@ -98,6 +98,22 @@ class ZanataConfig(object):
         else:
             return None
 
+    def get_server_options(self, server):
+        """
+        Returns the settings of server other than url, username and key,
+        e.g. "server.http-cache = true" as {'http-cache': 'true'}
+        """
+        if self._config:
+            options = {}
+            for name, value in self.configparser.items('servers'):
+                if name.startswith(server + '.'):
+                    name = name[len(server) + 1:]
+                    if name not in ('url', 'username', 'key'):
+                        options[name] = value
+            return options
+        else:
+            return None
+
     def read_project_config(self, filename):
         log = Logger()
 
@@ -0,0 +1,342 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "POStream", "UnsupportedPOFile",
+)
+
+import codecs
+import mmap
+import re
+
+# same rules as polib, which the stream has to match entry for entry
+CHARSET = re.compile(br'"?Content-Type:.+? charset=([\w_\-:\.]+)')
+# a carriage return not followed by a newline, a line break for polib
+LONE_CR = re.compile(br'\r(?!\n)')
+UNESCAPED_QUOTE = re.compile(r'([^\\]|^)"')
+ESCAPE = re.compile(r'\\(\\|n|t|r|v|b|f|")')
+ESCAPES = {'n': '\n', 't': '\t', 'r': '\r', 'v': '\v', 'b': '\b', 'f': '\f', '\\': '\\', '"': '"'}
+BOM = codecs.BOM_UTF8.decode('utf-8')
+# the encodings whose lines are the lines of the file split at the newlines
+ENCODINGS = ('utf-8', 'ascii')
+# bytes decoded at once, up to the end of a line
+CHUNK_SIZE = 1 << 20
+METADATA_ORDER = (
+    'Project-Id-Version', 'Report-Msgid-Bugs-To', 'POT-Creation-Date', 'PO-Revision-Date',
+    'Last-Translator', 'Language-Team', 'Language', 'MIME-Version', 'Content-Type',
+    'Content-Transfer-Encoding', 'Plural-Forms',
+)
+
+KEYWORDS = {'msgctxt': 'ct', 'msgid': 'mi', 'msgstr': 'ms', 'msgid_plural': 'mp'}
+PREVIOUS_KEYWORDS = {'msgid_plural': 'pp', 'msgid': 'pm', 'msgctxt': 'pc'}
+ALL_STATES = ('st', 'he', 'gc', 'oc', 'fl', 'ct', 'pc', 'pm', 'pp', 'tc', 'ms', 'mp', 'mx', 'mi')
+# (symbol, states it may follow, next state), as in polib
+TRANSITIONS = (
+    ('tc', ('st', 'he'), 'he'),
+    ('tc', ('gc', 'oc', 'fl', 'tc', 'pc', 'pm', 'pp', 'ms', 'mp', 'mx', 'mi'), 'tc'),
+    ('gc', ALL_STATES, 'gc'),
+    ('oc', ALL_STATES, 'oc'),
+    ('fl', ALL_STATES, 'fl'),
+    ('pc', ALL_STATES, 'pc'),
+    ('pm', ALL_STATES, 'pm'),
+    ('pp', ALL_STATES, 'pp'),
+    ('ct', ('st', 'he', 'gc', 'oc', 'fl', 'tc', 'pc', 'pm', 'pp', 'ms', 'mx'), 'ct'),
+    ('mi', ('st', 'he', 'gc', 'oc', 'fl', 'ct', 'tc', 'pc', 'pm', 'pp', 'ms', 'mx'), 'mi'),
+    ('mp', ('tc', 'gc', 'pc', 'pm', 'pp', 'mi'), 'mp'),
+    ('ms', ('mi', 'mp', 'tc'), 'ms'),
+    ('mx', ('mi', 'mx', 'mp', 'tc'), 'mx'),
+    ('mc', ('ct', 'mi', 'mp', 'ms', 'mx', 'pm', 'pp', 'pc'), 'mc'),
+)
+NEXT_STATE = dict(((symbol, state), next_state)
+                  for symbol, states, next_state in TRANSITIONS for state in states)
+# a symbol in these states starts a new entry
+ENTRY_END_STATES = ('mc', 'ms', 'mx')
+
+
+class UnsupportedPOFile(Exception):
+    """
+    The file has something the stream does not read as polib does, e.g.
+    another encoding or a syntax error, to be read by polib instead
+    """
+
+
+def unescape(string):
+    if '\\' not in string:
+        return string
+    return ESCAPE.sub(lambda match: ESCAPES[match.group(1)], string)
+
+
+def natural_key(key):
+    return [int(text) if text.isdigit() else text.lower() for text in re.split('([0-9]+)', key)]
+
+
+class POStreamEntry(object):
+    """
+    The fields of a polib POEntry read by the conversions to JSON
+    """
+    __slots__ = ('msgid', 'msgstr', 'msgid_plural', 'msgstr_plural', 'msgctxt', 'obsolete',
+                 'comment', 'tcomment', 'occurrences', 'flags')
+
+    def __init__(self):
+        self.msgid = ''
+        self.msgstr = ''
+        self.msgid_plural = ''
+        self.msgstr_plural = {}
+        self.msgctxt = None
+        self.obsolete = 0
+        self.comment = ''
+        self.tcomment = ''
+        self.occurrences = []
+        self.flags = []
+
+
+class POStream(object):
+    """
+    PO or POT file read through a memory map, whose entries are lexed again
+    for each iteration instead of being held, in place of the polib POFile
+    for the conversions to JSON. It gives the same entries, header and
+    metadata as polib, or raises UnsupportedPOFile: when opened, for an
+    encoding other than UTF-8 or ASCII, and while iterated, for a syntax
+    error or when polib would not take the first entry as the metadata.
+    """
+    def __init__(self, fpath):
+        """
+        POStream constructor, reads the header and the metadata
+        @param fpath: path of the po or pot file
+        """
+        self.fpath = fpath
+        with open(fpath, 'rb') as pofile:
+            try:
+                self._buffer = mmap.mmap(pofile.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty
+                raise UnsupportedPOFile(fpath)
+        self.encoding = self._detect_encoding()
+        if self.encoding not in ENCODINGS or LONE_CR.search(self._buffer):
+            self.close()
+            raise UnsupportedPOFile(fpath)
+        self.header = ''
+        self.metadata = {}
+        self.metadata_is_fuzzy = 0
+        self._metadata_entry = None
+        for entry in self._lex():
+            if not entry.obsolete and entry.msgid == '':
+                self._set_metadata(entry)
+            break
+
+    def _detect_encoding(self):
+        for match in CHARSET.finditer(self._buffer):
+            try:
+                return codecs.lookup(match.group(1).strip().decode('utf-8')).name
+            except LookupError:
+                pass
+        return 'utf-8'
+
+    def _set_metadata(self, entry):
+        self._metadata_entry = entry
+        self.metadata_is_fuzzy = entry.flags
+        key = None
+        for msg in entry.msgstr.splitlines():
+            try:
+                key, val = msg.split(':', 1)
+                self.metadata[key] = val.strip()
+            except (ValueError, KeyError):
+                if key is not None:
+                    self.metadata[key] += '\n' + msg.strip()
+
+    def ordered_metadata(self):
+        """
+        Same as POFile.ordered_metadata of polib
+        @return: list of (name, value)
+        """
+        metadata = self.metadata.copy()
+        ordered = [(name, metadata.pop(name)) for name in METADATA_ORDER if name in metadata]
+        return ordered + [(name, metadata[name]) for name in sorted(metadata, key=natural_key)]
+
+    def close(self):
+        self._buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        first = True
+        for entry in self._lex():
+            if entry.obsolete or entry.msgid != '':
+                yield entry
+            elif not (first and self._metadata_entry is not None):
+                # polib takes the metadata from another entry than the first
+                raise UnsupportedPOFile(self.fpath)
+            first = False
+
+    def _lines(self):
+        """
+        Yields the lines of the file, decoded a chunk at a time
+        """
+        buffer = self._buffer
+        size = buffer.size()
+        position = 0
+        while position < size:
+            end = buffer.find(b'\n', min(position + CHUNK_SIZE, size) - 1) + 1 or size
+            try:
+                chunk = buffer[position:end].decode(self.encoding)
+            except UnicodeDecodeError:
+                raise UnsupportedPOFile(self.fpath)
+            if position == 0 and chunk.startswith(BOM):
+                chunk = chunk[len(BOM):]
+            position = end
+            for line in chunk.split('\n'):
+                yield line
+
+    def _lex(self):
+        """
+        Yields the entries of the file, the metadata one first when it is
+        first, and sets the header, as the state machine of polib
+        """
+        header = ''
+        entry = POStreamEntry()
+        state = 'st'
+        tokens = []
+        msgstr_index = 0
+        for line in self._lines():
+            line = line.strip()
+            if not line:
+                continue
+
+            tokens = line.split(None, 2)
+            keyword = tokens[0]
+            if keyword == '#~|':
+                continue
+            obsolete = keyword == '#~' and len(tokens) > 1
+            if obsolete:
+                line = line[3:].strip()
+                tokens = tokens[1:]
+                keyword = tokens[0]
+
+            if keyword in KEYWORDS and len(tokens) > 1:
+                line = line[len(keyword):].lstrip()
+                if '"' in line[1:-1] and UNESCAPED_QUOTE.search(line[1:-1]):
+                    raise UnsupportedPOFile(self.fpath)
+                symbol = KEYWORDS[keyword]
+            elif keyword == '#:':
+                if len(tokens) <= 1:
+                    continue
+                symbol = 'oc'
+            elif line[:1] == '"':
+                if '"' in line[1:-1] and UNESCAPED_QUOTE.search(line[1:-1]):
+                    raise UnsupportedPOFile(self.fpath)
+                symbol = 'mc'
+            elif line[:7] == 'msgstr[':
+                symbol = 'mx'
+            elif keyword == '#,':
+                if len(tokens) <= 1:
+                    continue
+                symbol = 'fl'
+            elif keyword == '#' or keyword.startswith('##'):
+                if line == '#':
+                    line += ' '
+                symbol = 'tc'
+            elif keyword == '#.':
+                if len(tokens) <= 1:
+                    continue
+                symbol = 'gc'
+            elif keyword == '#|':
+                # previous msgctxt, msgid and msgid_plural, not converted
+                if len(tokens) <= 1:
+                    raise UnsupportedPOFile(self.fpath)
+                line = line[2:].lstrip()
+                if tokens[1].startswith('"'):
+                    symbol = 'mc'
+                elif len(tokens) == 2 or tokens[1] not in PREVIOUS_KEYWORDS:
+                    raise UnsupportedPOFile(self.fpath)
+                else:
+                    line = line[len(tokens[1]):].lstrip()
+                    symbol = PREVIOUS_KEYWORDS[tokens[1]]
+            else:
+                raise UnsupportedPOFile(self.fpath)
+
+            next_state = NEXT_STATE.get((symbol, state))
+            if next_state is None:
+                raise UnsupportedPOFile(self.fpath)
+
+            if symbol == 'mc':
+                # continues the string of the state, which stays the same
+                value = unescape(line[1:-1])
+                if state == 'ct':
+                    entry.msgctxt += value
+                elif state == 'mi':
+                    entry.msgid += value
+                elif state == 'mp':
+                    entry.msgid_plural += value
+                elif state == 'ms':
+                    entry.msgstr += value
+                elif state == 'mx':
+                    entry.msgstr_plural[msgstr_index] += value
+                continue
+            if next_state == 'he':
+                if header != '':
+                    header += '\n'
+                header += line[2:]
+                self.header = header
+                state = next_state
+                continue
+            if symbol not in ('mp', 'ms', 'mx') and state in ENTRY_END_STATES:
+                yield entry
+                entry = POStreamEntry()
+
+            if symbol == 'tc':
+                if entry.tcomment != '':
+                    entry.tcomment += '\n'
+                tcomment = line.lstrip('#')
+                entry.tcomment += tcomment[1:] if tcomment.startswith(' ') else tcomment
+            elif symbol == 'gc':
+                if entry.comment != '':
+                    entry.comment += '\n'
+                entry.comment += line[3:]
+            elif symbol == 'oc':
+                for occurrence in line[3:].split():
+                    fil, separator, number = occurrence.rpartition(':')
+                    if not separator or not number.isdigit():
+                        fil, number = occurrence, ''
+                    entry.occurrences.append((fil, number))
+            elif symbol == 'fl':
+                entry.flags += [flag.strip() for flag in line[3:].split(',')]
+            elif symbol == 'ct':
+                entry.msgctxt = unescape(line[1:-1])
+            elif symbol == 'mi':
+                entry.obsolete = int(obsolete)
+                entry.msgid = unescape(line[1:-1])
+            elif symbol == 'mp':
+                entry.msgid_plural = unescape(line[1:-1])
+            elif symbol == 'ms':
+                entry.msgstr = unescape(line[1:-1])
+            elif symbol == 'mx':
+                try:
+                    msgstr_index = int(line[7])
+                except (IndexError, ValueError):
+                    raise UnsupportedPOFile(self.fpath)
+                entry.msgstr_plural[msgstr_index] = unescape(line[line.find('"') + 1:-1])
+            state = next_state
+
+        if tokens and not tokens[0].startswith('#'):
+            # the last entry, when the file does not end with comments
+            yield entry
@@ -0,0 +1,198 @@
+# vim: set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "entry_text", "write_pofile",
+)
+
+import hashlib
+import io
+import os
+import shutil
+import textwrap
+import threading
+
+from .polexer import METADATA_ORDER, natural_key, unescape
+
+# the width of the lines of polib, 0 does not wrap them
+WRAPWIDTH = 78
+# bytes hashed at once
+CHUNK_SIZE = 1 << 20
+
+
+def escape(string):
+    return string.replace('\\', r'\\').replace('\t', r'\t').replace('\r', r'\r').replace('\n', r'\n') \
+        .replace('\v', r'\v').replace('\b', r'\b').replace('\f', r'\f').replace('"', r'\"')
+
+
+def _field(lines, fieldname, plural_index, field, wrapwidth):
+    """
+    Appends the lines of a msgid, msgstr... field, same as _str_field of polib
+    """
+    parts = field.splitlines(True)
+    if len(parts) > 1:
+        parts.insert(0, '')
+    else:
+        escaped = escape(field)
+        # an escaped character takes one more, a line the name, a space and the quotes
+        if wrapwidth > 0 and len(field) * 2 - len(escaped) > wrapwidth - len(fieldname) - len(plural_index) - 3:
+            parts = [''] + [unescape(part) for part in textwrap.wrap(
+                escaped, wrapwidth - 2, drop_whitespace=False, break_long_words=False
+            )]
+        else:
+            # most fields, a single line
+            lines.append(u'%s%s "%s"' % (fieldname, plural_index, escaped))
+            return
+    lines.append(u'%s%s "%s"' % (fieldname, plural_index, escape(parts[0])))
+    for part in parts[1:]:
+        lines.append(u'"%s"' % escape(part))
+
+
+def entry_text(entry, wrapwidth=WRAPWIDTH):
+    """
+    Text of an entry as polib saves it, ending with a newline
+    @param entry: polib POEntry or polexer POStreamEntry, neither obsolete nor
+                  with previous msgid, as pull writes them
+    @param wrapwidth: width of the lines, 0 does not wrap them
+    """
+    lines = []
+    for comment, prefix in ((entry.tcomment, u'# '), (entry.comment, u'#. ')):
+        if comment:
+            for line in comment.split('\n'):
+                if wrapwidth > 0 and len(line) + len(prefix) > wrapwidth:
+                    lines.extend(textwrap.wrap(line, wrapwidth, initial_indent=prefix, subsequent_indent=prefix,
+                                               break_long_words=False))
+                else:
+                    lines.append(prefix + line)
+
+    if entry.occurrences:
+        filelist = []
+        for fpath, lineno in entry.occurrences:
+            filelist.append(u'%s:%s' % (fpath, lineno) if lineno else fpath)
+        filestr = u' '.join(filelist)
+        if wrapwidth > 0 and len(filestr) + 3 > wrapwidth:
+            # as polib, the hyphens of the file names are not break points
+            lines.extend(line.replace('*', '-') for line in textwrap.wrap(
+                filestr.replace('-', '*'), wrapwidth, initial_indent=u'#: ', subsequent_indent=u'#: ',
+                break_long_words=False
+            ))
+        else:
+            lines.append(u'#: ' + filestr)
+
+    if entry.flags:
+        lines.append(u'#, ' + u', '.join(entry.flags))
+
+    if entry.msgctxt is not None:
+        _field(lines, 'msgctxt', '', entry.msgctxt, wrapwidth)
+    _field(lines, 'msgid', '', entry.msgid, wrapwidth)
+    if entry.msgid_plural:
+        _field(lines, 'msgid_plural', '', entry.msgid_plural, wrapwidth)
+    if entry.msgstr_plural:
+        for index in sorted(entry.msgstr_plural):
+            _field(lines, 'msgstr', '[%s]' % index, entry.msgstr_plural[index], wrapwidth)
+    else:
+        _field(lines, 'msgstr', '', entry.msgstr, wrapwidth)
+    lines.append(u'')
+    return u'\n'.join(lines)
+
+
+def _header_text(header, metadata, wrapwidth):
+    """
+    The header comment and the metadata entry, as polib saves them
+    """
+    lines = []
+    for line in header.split('\n'):
+        if not line:
+            lines.append(u'#\n')
+        elif line[:1] in (',', ':'):
+            lines.append(u'#%s\n' % line)
+        else:
+            lines.append(u'# %s\n' % line)
+    ordered = [name for name in METADATA_ORDER if name in metadata]
+    ordered += sorted((name for name in metadata if name not in METADATA_ORDER), key=natural_key)
+    msgstr = u''.join(u'%s: %s\n' % (name, metadata[name]) for name in ordered)
+    fields = []
+    _field(fields, 'msgid', '', u'', wrapwidth)
+    _field(fields, 'msgstr', '', msgstr, wrapwidth)
+    lines.append(u'\n'.join(fields) + u'\n')
+    return u''.join(lines)
+
+
+def _digest(path):
+    md5 = hashlib.md5()
+    with open(path, 'rb') as stream:
+        for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+            md5.update(chunk)
+    return md5.digest()
+
+
+def _same_content(path, other_path):
+    """
+    Tells whether the files have the same content, by their sizes then hashes
+    """
+    try:
+        if os.path.getsize(path) != os.path.getsize(other_path):
+            return False
+    except OSError:
+        return False
+    return _digest(path) == _digest(other_path)
+
+
+def write_pofile(path, header, metadata, entries, wrapwidth=WRAPWIDTH):
+    """
+    Writes a po file with the same content as the save of a polib POFile. It
+    is written to a temporary file in the same folder, which then replaces
+    path at once, so that an interrupted pull never leaves a truncated file.
+    A file with the same content is left untouched, with its modification
+    time, so that the builds depending on it do not run again.
+    @param header: header comment
+    @param metadata: dict of the metadata
+    @param entries: texts of the entries, from entry_text
+    @param wrapwidth: width of the lines, 0 does not wrap them
+    @return: True when the file is written, False when it was the same
+    """
+    folder, name = os.path.split(path)
+    # unique to the thread, the locales of a document may be written at once
+    temp_path = os.path.join(folder, '.%s.%d-%d.tmp' % (name, os.getpid(), threading.current_thread().ident))
+    try:
+        # created with the permissions of a new file, as polib does
+        with io.open(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666), 'w',
+                     encoding='utf-8') as pofile:
+            pofile.write(_header_text(header, metadata, wrapwidth))
+            for text in entries:
+                pofile.write(u'\n')
+                pofile.write(text)
+        if _same_content(path, temp_path):
+            os.remove(temp_path)
+            return False
+        if os.path.exists(path):
+            shutil.copymode(path, temp_path)
+        try:
+            os.rename(temp_path, path)
+        except OSError:
+            if not os.path.exists(path):
+                raise
+            # windows does not rename over an existing file
+            os.remove(path)
+            os.rename(temp_path, path)
+        return True
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -31,6 +31,8 @@ import sys
 
 import polib
 
+from .polexer import POStream, POStreamEntry, UnsupportedPOFile
+from .powriter import WRAPWIDTH, entry_text, write_pofile
 from .zanatalib.logger import Logger
 
 try:
@@ -39,16 +41,140 @@ except ImportError:
     import simplejson as json
 
 
+def dumps_with_array(obj, key, items):
+    """
+    Same as json.dumps(obj) with the items in the empty array under key,
+    which are encoded one at a time instead of being held as a list along
+    with their encoding
+    """
+    encoded = json.dumps(obj)
+    # a key, quotes in the strings are escaped
+    end = encoded.index(json.dumps(key) + ': []') + len(json.dumps(key)) + 3
+    return encoded[:end] + ', '.join(json.dumps(item) for item in items) + encoded[end:]
+
+
+class TemplateSkeleton(object):
+    """
+    The entries of a pot retrieved from server, read once for the po files of
+    all the locales: the references and flags are parsed and the resIds hashed
+    here, and the text of an untranslated entry is written once. Only the
+    translated entries are copied for a locale, the threads pulling the
+    locales share the skeleton.
+    """
+    def __init__(self, potcontent):
+        """
+        TemplateSkeleton constructor
+        @param potcontent: the json object of the pot retrieved from server
+        """
+        self.header = ''
+        self.metadata = {}
+        # untranslated POStreamEntry objects
+        self.entries = []
+        # resId: indexes of its entries
+        self.resIds = {}
+        # wrapwidth: texts of the untranslated entries, written when first read
+        self._texts = {}
+        publicanutil = PublicanUtility()
+
+        if potcontent.get('extensions'):
+            extensions = potcontent.get('extensions')[0]
+            self.header = extensions.get('comment')
+            for item in extensions.get('entries'):
+                self.metadata[item['key']] = item['value']
+            # specify Content-Type charset to UTF-8
+            pattern = r'charset=[^;]*'
+            if 'Content-Type' in self.metadata:
+                re.sub(pattern, "charset=UTF-8", self.metadata['Content-Type'])
+            else:
+                self.metadata['Content-Type'] = "text/plain; charset=UTF-8"
+
+        for textflow in potcontent.get('textFlows'):
+            poentry = POStreamEntry()
+            poentry.occurrences = None
+            poentry.msgid = textflow.get('content')
+            if textflow.get('extensions'):
+                entry_list = textflow.get('extensions')
+                for entry in entry_list:
+                    if entry.get('object-type') == 'pot-entry-header':
+                        # PotEntryHeader
+                        # Check the references is not empty
+                        if entry.get('references') != [u'']:
+                            ref_list = []
+                            for item in entry.get('references'):
+                                # in some cases, entry contains more than one reference
+                                if ' ' in item:
+                                    reference = item.split(' ')
+                                    for i in reference:
+                                        ref_list.append(tuple(i.rsplit(':', 1)))
+                                else:
+                                    ref_list.append(tuple(item.rsplit(':', 1)))
+                            poentry.occurrences = ref_list
+                        else:
+                            poentry.occurrences = None
+
+                        if entry.get('flags'):
+                            poentry.flags = entry.get('flags')
+
+                        if entry.get('context') is not None:
+                            poentry.msgctxt = entry.get('context')
+
+                    if entry.get('object-type') == 'comment':
+                        # SimpleComment
+                        poentry.comment = entry.get('value')
+
+            if textflow.get('contents'):
+                poentry.msgid = textflow.get('contents')[0]
+                poentry.msgid_plural = textflow.get('contents')[1]
+                poentry.msgstr_plural[0] = ''
+            self.resIds.setdefault(publicanutil.get_resId(poentry), []).append(len(self.entries))
+            self.entries.append(poentry)
+
+    def copy_entry(self, index):
+        """
+        A copy of an entry, for the translations of a locale
+        """
+        entry = self.entries[index]
+        poentry = POStreamEntry()
+        for name in POStreamEntry.__slots__:
+            setattr(poentry, name, getattr(entry, name))
+        # changed by the translations, the occurrences are not
+        poentry.flags = list(entry.flags)
+        poentry.msgstr_plural = dict(entry.msgstr_plural)
+        return poentry
+
+    def entry_text(self, index, wrapwidth):
+        """
+        Text of an untranslated entry in a po file
+        """
+        texts = self._texts.get(wrapwidth)
+        if texts is None:
+            texts = self._texts.setdefault(wrapwidth, [None] * len(self.entries))
+        if texts[index] is None:
+            texts[index] = entry_text(self.entries[index], wrapwidth)
+        return texts[index]
+
+
 class PublicanUtility:
-    def __init__(self):
+    def __init__(self, lexer=True):
+        """
+        PublicanUtility constructor
+        @param lexer: read the po files converted to JSON with the lexer of
+        polexer instead of polib when they suit it
+        """
         self.log = Logger()
+        self.lexer = lexer
 
     def create_txtflow(self, pofile):
         """
         Convert the content of the pot file to a list of text flow.
         @return: the dictionary object of textflow
         """
-        textflows = []
+        return list(self.iter_txtflows(pofile))
+
+    def iter_txtflows(self, pofile):
+        """
+        Yields the textflows of the pot file one at a time
+        """
         for entry in pofile:
             context = None
             reflist = []
@@ -94,8 +220,7 @@ class PublicanUtility:
             else:
                 textflow = {'id': textflowId, 'lang': 'en-US', 'content': content, 'plural': 'false', 'extensions': extensions}
 
-            textflows.append(textflow)
-        return textflows
+            yield textflow
 
     def check_empty(self, contents):
         for string in contents:
@@ -139,17 +264,28 @@ class PublicanUtility:
         else:
             return "New"
 
+    def is_untranslated(self, textflowtarget):
+        """
+        Tells whether textflowtarget is New with no content at all
+        """
+        contents = textflowtarget.get('contents') or [textflowtarget.get('content')]
+        return textflowtarget.get('state') == 'New' and self.check_empty(contents)
+
     def create_txtflowtarget(self, pofile):
         """
         Convert the content of the po file to a list of textflowtarget.
         @return: the dictionary object of textflow
         """
-        obs_list = pofile.obsolete_entries()
-        textflowtargets = []
+        return list(self.iter_txtflowtargets(pofile))
+
+    def iter_txtflowtargets(self, pofile):
+        """
+        Yields the textflowtargets of the po file one at a time
+        """
         content = ""
 
         for entry in pofile:
-            if entry in obs_list:
+            if entry.obsolete:
                 continue
 
             if entry.msgctxt is not None:
@@ -178,9 +314,7 @@ class PublicanUtility:
                 content = entry.msgstr
                 textflowtarget = {'resId': textflowId, 'state': state, 'content': content, 'extensions': extensions}
 
-            textflowtargets.append(textflowtarget)
-
-        return textflowtargets
+            yield textflowtarget
 
     def validate_content_type(self, content_type, object_type):
         PATTERN = r'.+? charset=([\w_\-:\.]+)'
@@ -228,6 +362,36 @@ class PublicanUtility:
 
         return po
 
+    def read_pofile(self, path):
+        """
+        Open the po file for the conversions to JSON, as a POStream when it
+        suits the lexer, else parsed by polib.
+        @return: POStream or pofile object, to close with close_pofile
+        """
+        if self.lexer:
+            try:
+                return POStream(path)
+            except (UnsupportedPOFile, EnvironmentError):
+                pass
+        return self.create_pofile(path)
+
+    def close_pofile(self, pofile):
+        """
+        Closes the memory map of a POStream, a polib pofile holds nothing open
+        """
+        if isinstance(pofile, POStream):
+            pofile.close()
+
+    def convert_pofile(self, pofile, convert):
+        """
+        Returns convert(pofile), or convert() of the file parsed by polib
+        when the lexer finds what it does not read as polib does
+        """
+        try:
+            return convert(pofile)
+        except UnsupportedPOFile:
+            return convert(self.create_pofile(pofile.fpath))
+
     def get_file_list(self, path, file_type):
         final_file_list = []
         root_list = os.listdir(path)
@@ -285,37 +449,62 @@ class PublicanUtility:
         return filename
 
     def check_plural(self, filepath):
-        pofile = self.create_pofile(filepath)
-        for entry in pofile:
-            if entry.msgid_plural:
-                return True
-        return False
+        pofile = self.read_pofile(filepath)
+        try:
+            return self.has_plural(pofile)
+        finally:
+            self.close_pofile(pofile)
+
+    def has_plural(self, pofile):
+        return self.convert_pofile(pofile, lambda pofile: any(entry.msgid_plural for entry in pofile))
 
-    def potfile_to_json(self, filepath, root_path):
+    def potfile_to_json(self, filepath, root_path, pofile=None):
         """
         Parse the pot file, create the request body
         @param filepath: the path of the pot file
+        @param pofile: the pot file parsed already, e.g. to check its plurals, left
+                       open for the caller to close
         """
         filename = self.strip_path(filepath, root_path, '.pot')
-        pofile = self.create_pofile(filepath)
-        textflows = self.create_txtflow(pofile)
-        extensions = self.create_extensions(pofile, "po-header")
-        items = {'name': filename, 'contentType': 'application/x-gettext', 'lang': 'en-US', 'extensions': extensions, 'textFlows': textflows}
 
-        return json.dumps(items), filename
+        def convert(pofile):
+            extensions = self.create_extensions(pofile, "po-header")
+            items = {'name': filename, 'contentType': 'application/x-gettext', 'lang': 'en-US', 'extensions': extensions, 'textFlows': []}
+            return dumps_with_array(items, 'textFlows', self.iter_txtflows(pofile))
+
+        if pofile is not None:
+            return self.convert_pofile(pofile, convert), filename
+        pofile = self.read_pofile(filepath)
+        try:
+            return self.convert_pofile(pofile, convert), filename
+        finally:
+            self.close_pofile(pofile)
 
-    def pofile_to_json(self, filepath):
+    def pofile_to_json(self, filepath, delta=None, sparse=False):
         """
         Parse the po file, create the request body
         @param filepath: the path of the po file
+        @param delta: TranslationDelta, to leave out the entries pushed before
+        @param sparse: leave out the untranslated entries
         """
-        pofile = self.create_pofile(filepath)
-        textflowtargets = self.create_txtflowtarget(pofile)
-        # the function for extensions have not implemented yet
-        extensions = self.create_extensions(pofile, "po-target-header")
-        items = {'links': [], 'extensions': extensions, 'textFlowTargets': textflowtargets}
-
-        return json.dumps(items)
+        def convert(pofile):
+            # the entries go through the filters one at a time
+            textflowtargets = self.iter_txtflowtargets(pofile)
+            if sparse:
+                textflowtargets = (textflowtarget for textflowtarget in textflowtargets
+                                   if not self.is_untranslated(textflowtarget))
+            if delta is not None:
+                textflowtargets = delta.filter(textflowtargets)
+            # the function for extensions have not implemented yet
+            extensions = self.create_extensions(pofile, "po-target-header")
+            items = {'links': [], 'extensions': extensions, 'textFlowTargets': []}
+            return dumps_with_array(items, 'textFlowTargets', textflowtargets)
+
+        pofile = self.read_pofile(filepath)
+        try:
+            return self.convert_pofile(pofile, convert)
+        finally:
+            self.close_pofile(pofile)
 
     def glossary_to_json(self, filepath, lang, sourcecomments):
         pofile = self.create_pofile(filepath)
@@ -365,70 +554,56 @@ class PublicanUtility:
 
         return jsons
 
-    def save_to_pofile(self, path, translations, potcontent, create_skeletons, locale, doc_name):
+    def apply_translation(self, poentry, translation):
+        if translation.get('extensions'):
+            extensions = translation.get('extensions')
+            for entry in extensions:
+                if entry.get('object-type') == 'comment':
+                    if entry.get('value'):
+                        poentry.tcomment = entry.get('value')
+
+        content = translation.get('content')
+        if poentry.msgid_plural:
+            contents = translation.get('contents')
+            if contents:
+                i = 0
+                for msg in contents:
+                    poentry.msgstr_plural[i] = msg
+                    i = i + 1
+            elif content:
+                poentry.msgstr_plural[0] = content
+        else:
+            if content:
+                poentry.msgstr = content
+
+        if translation.get('state') == 'NeedReview':
+            if poentry.flags == [u'']:
+                poentry.flags = ['fuzzy']
+            else:
+                poentry.flags.insert(0, 'fuzzy')
+        else:
+            if poentry.flags == [u'']:
+                poentry.flags = None
+
+    def save_to_pofile(self, path, translations, potcontent, create_skeletons, locale, doc_name,
+                       wrapwidth=WRAPWIDTH):
         """
         Save PO file to path, based on json objects of pot and translations
-        @param translations: the json object of the content retrieved from server
+        @param translations: the json object of the content retrieved from server, or
+                             a StreamedObject whose textFlowTargets are decoded one by one
         @param path: the po folder for output
-        @param pot: the json object of the pot retrieved from server
+        @param potcontent: the json object of the pot retrieved from server, or its
+                           TemplateSkeleton when the po files of several locales are saved
+        @param wrapwidth: width of the lines of the po file, 0 does not wrap them
+        @return: True when the po file is written, False when it had the same content
+                 already, None when it is skipped as there is no translation
         """
-        po = polib.POFile(fpath=path)
-        # potcontent = json.loads(pot)
-        # pylint: disable=E1103
-        textflows = potcontent.get('textFlows')
-
-        if potcontent.get('extensions'):
-            extensions = potcontent.get('extensions')[0]
-            po.header = extensions.get('comment')
-            for item in extensions.get('entries'):
-                po.metadata[item['key']] = item['value']
-            # specify Content-Type charset to UTF-8
-            pattern = r'charset=[^;]*'
-            if 'Content-Type' in po.metadata:
-                re.sub(pattern, "charset=UTF-8", po.metadata['Content-Type'])
-            else:
-                po.metadata['Content-Type'] = "text/plain; charset=UTF-8"
-
-        for textflow in textflows:
-            poentry = polib.POEntry(occurrences=None)
-            poentry.msgid = textflow.get('content')
-            if textflow.get('extensions'):
-                entry_list = textflow.get('extensions')
-                for entry in entry_list:
-                    if entry.get('object-type') == 'pot-entry-header':
-                        # PotEntryHeader
-                        # Check the references is not empty
-                        if entry.get('references') != [u'']:
-                            ref_list = []
-                            for item in entry.get('references'):
-                                # in some cases, entry contains more than one reference
-                                if ' ' in item:
-                                    reference = item.split(' ')
-                                    for i in reference:
-                                        ref_list.append(tuple(i.rsplit(':', 1)))
-                                else:
-                                    ref_list.append(tuple(item.rsplit(':', 1)))
-                            poentry.occurrences = ref_list
-                        else:
-                            poentry.occurrences = None
-
-                        if entry.get('flags'):
-                            poentry.flags = entry.get('flags')
-
-                        if entry.get('context') is not None:
-                            poentry.msgctxt = entry.get('context')
-
-                    if entry.get('object-type') == 'comment':
-                        # SimpleComment
-                        poentry.comment = entry.get('value')
-
-            if textflow.get('contents'):
-                poentry.msgid = textflow.get('contents')[0]
-                poentry.msgid_plural = textflow.get('contents')[1]
-                poentry.msgstr_plural[0] = ''
-            else:
-                poentry.msgstr = ''
-            po.append(poentry)
+        if not isinstance(potcontent, TemplateSkeleton):
+            potcontent = TemplateSkeleton(potcontent)
+        header = potcontent.header
+        metadata = dict(potcontent.metadata)
+        # index: copy of the entry for the translations, the others are written from the skeleton
+        translated = {}
 
         # If the translation is exist, read the content of the po file
         if translations:
@@ -440,59 +615,64 @@ class PublicanUtility:
                 ext = content.get('extensions')[0]
                 header_comment = ext.get('comment')
                 if header_comment:
-                    po.header = header_comment
+                    header = header_comment
                 for item in ext.get('entries'):
-                    po.metadata[item['key']] = item['value']
+                    metadata[item['key']] = item['value']
 
             targets = content.get('textFlowTargets')
 
             if not create_skeletons:
                 if not targets:
                     self.log.warn("No translations found in %s for document %s" % (locale, doc_name))
-                    return
-
-            translationsByResId = {}
-            for translation in targets:
-                resId = translation.get('resId')
-                translationsByResId[resId] = translation
+                    return None
 
+            # the targets are applied as they are decoded, a streamed document
+            # is never held as a whole
             # "extensions":[{"object-type":"comment","value":"testcomment","space":"preserve"}]
             # copy any other stuff you need to transfer
-            for poentry in po:
-                resId = self.get_resId(poentry)
-                translation = translationsByResId.get(resId)
-                if translation:
-                    if translation.get('extensions'):
-                        extensions = translation.get('extensions')
-                        for entry in extensions:
-                            if entry.get('object-type') == 'comment':
-                                if entry.get('value'):
-                                    poentry.tcomment = entry.get('value')
-
-                    content = translation.get('content')
-                    if poentry.msgid_plural:
-                        contents = translation.get('contents')
-                        if contents:
-                            i = 0
-                            for msg in contents:
-                                poentry.msgstr_plural[i] = msg
-                                i = i + 1
-                        elif content:
-                            poentry.msgstr_plural[0] = content
-                    else:
-                        if content:
-                            poentry.msgstr = content
-
-                    if translation.get('state') == 'NeedReview':
-                        if poentry.flags == [u'']:
-                            poentry.flags = ['fuzzy']
-                        else:
-                            poentry.flags.insert(0, 'fuzzy')
-                    else:
-                        if poentry.flags == [u'']:
-                            poentry.flags = None
+            for translation in targets or []:
+                for index in potcontent.resIds.get(translation.get('resId'), ()):
+                    if index not in translated:
+                        translated[index] = potcontent.copy_entry(index)
+                    self.apply_translation(translated[index], translation)
 
         # finally save resulting po to outpath as lang/myfile.po
-        po.save()
+        written = write_pofile(path, header, metadata, (
+            entry_text(translated[index], wrapwidth) if index in translated else potcontent.entry_text(index, wrapwidth)
+            for index in range(len(potcontent.entries))
+        ), wrapwidth)
         # pylint: disable=E1103
-        self.log.info("Writing po file to %s" % (path))
+        if written:
+            self.log.info("Writing po file to %s" % (path))
+        else:
+            self.log.info("Po file %s is unchanged" % (path))
+        return written
+
+
+def convert_template(filepath, root_path, plural_support):
+    """
+    Converts the pot file for push, in a process of a ProcessPool
+    @return: (plural_exist, body, filename), no body when the plural is not supported
+    """
+    publicanutil = PublicanUtility()
+    # read once for the plural check and the body
+    pofile = publicanutil.read_pofile(filepath)
+    try:
+        plural_exist = publicanutil.has_plural(pofile)
+        if plural_exist and not plural_support:
+            return plural_exist, None, None
+        body, filename = publicanutil.potfile_to_json(filepath, root_path, pofile)
+        return plural_exist, body, filename
+    finally:
+        publicanutil.close_pofile(pofile)
+
+
+def convert_translation(filepath, delta, sparse):
+    """
+    Converts the po file for push, in a process of a ProcessPool
+    @return: (body, delta), the delta with the digests of the targets, no
+             body when the file does not exist
+    """
+    if not filepath or not os.path.isfile(filepath):
+        return None, delta
+    return PublicanUtility().pofile_to_json(filepath, delta, sparse), delta
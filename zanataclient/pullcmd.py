@@ -77,4 +77,5 @@ class GenericPull(PushPull):
         ) if self.context_data.get('mindocpercent') else dict((file, lang_list) for file in filelist)
 
         self.zanatacmd.pull_command(locale_map, self.project_id, self.version_id,
-                                    filedict, outpath, command_type, skeletons, self.file_mapping_rules)
+                                    filedict, outpath, command_type, skeletons, self.file_mapping_rules,
+                                    jobs=self.jobs, no_wrap='nowrap' in self.context_data)
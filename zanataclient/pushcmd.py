@@ -31,6 +31,8 @@ log = Logger()
 
 
 class GenericPush(PushPull):
+    # read only when translations are pushed
+    lazy_context_keys = ('locale_map',)
 
     def __init__(self, *args, **kargs):
         super(GenericPush, self).__init__(*args, **kargs)
@@ -40,6 +42,7 @@ class GenericPush(PushPull):
         push_trans_only = False
         force = False
         project_type, deletefiles, tmlfolder, filelist = self.get_files()
+        manifest = self.get_push_manifest()
         # Disable dir option for generic push command
         if 'dir' in self.context_data:
             log.warn("dir option is disabled in push command, please use --srcdir and --transdir, or specify value in zanata.xml")
@@ -66,7 +69,9 @@ class GenericPush(PushPull):
             lang_list = self.get_lang_list()
             locale_map = self.context_data.get('locale_map')
             self.zanatacmd.push_trans_command(transfolder, self.project_id, self.version_id, lang_list, locale_map,
-                                              project_type, merge, self.file_mapping_rules)
+                                              project_type, merge, self.file_mapping_rules, jobs=self.jobs,
+                                              state=self.get_translation_state(merge), sparse=self.get_sparse(merge),
+                                              convert_jobs=self.convert_jobs)
             sys.exit(0)
 
         if not os.path.isdir(tmlfolder):
@@ -93,13 +98,18 @@ class GenericPush(PushPull):
             log.info("Send local translation: True")
             import_param = self.get_importparam(project_type, folder)
             self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans,
-                                        self.plural_support, import_param, self.file_mapping_rules)
+                                        self.plural_support, import_param, self.file_mapping_rules, jobs=self.jobs,
+                                        manifest=manifest, convert_jobs=self.convert_jobs)
         else:
             log.info("Send local translation: False")
-            self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans, self.plural_support)
+            self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans,
+                                        self.plural_support, jobs=self.jobs, manifest=manifest,
+                                        convert_jobs=self.convert_jobs)
 
 
 class PublicanPush(PushPull):
+    lazy_context_keys = ('locale_map',)
+
     def __init__(self, *args, **kargs):
         super(PublicanPush, self).__init__(*args, **kargs)
 
@@ -107,6 +117,7 @@ class PublicanPush(PushPull):
         importpo = False
         force = False
         project_type, deletefiles, tmlfolder, filelist = self.get_files()
+        manifest = self.get_push_manifest()
 
         log.info("Reuse previous translation on server:%s" % self.copytrans)
 
@@ -123,13 +134,18 @@ class PublicanPush(PushPull):
         if importpo:
             import_param = self.get_importparam("podir", tmlfolder)
             self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans,
-                                        self.plural_support, import_param, self.file_mapping_rules)
+                                        self.plural_support, import_param, self.file_mapping_rules, jobs=self.jobs,
+                                        manifest=manifest, convert_jobs=self.convert_jobs)
         else:
             log.info("Importing source documents only")
-            self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans, self.plural_support)
+            self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans,
+                                        self.plural_support, jobs=self.jobs, manifest=manifest,
+                                        convert_jobs=self.convert_jobs)
 
 
 class PoPush(PushPull):
+    lazy_context_keys = ('locale_map',)
+
     def __init__(self, *args, **kargs):
         super(PoPush, self).__init__(*args, **kargs)
 
@@ -138,6 +154,7 @@ class PoPush(PushPull):
         importpo = False
         import_param = None
         project_type, deletefiles, tmlfolder, filelist = self.get_files()
+        manifest = self.get_push_manifest()
         log.info("Reuse previous translation on server: %s" % self.copytrans)
         importpo = self.get_importpo()
 
@@ -154,6 +171,9 @@ class PoPush(PushPull):
 
         if importpo:
             self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans,
-                                        self.plural_support, import_param, self.file_mapping_rules)
+                                        self.plural_support, import_param, self.file_mapping_rules, jobs=self.jobs,
+                                        manifest=manifest, convert_jobs=self.convert_jobs)
         else:
-            self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans, self.plural_support)
+            self.zanatacmd.push_command(filelist, tmlfolder, self.project_id, self.version_id, self.copytrans,
+                                        self.plural_support, jobs=self.jobs, manifest=manifest,
+                                        convert_jobs=self.convert_jobs)
@@ -21,12 +21,27 @@
 
 import unittest
 
-from test_client import RestHandleTest
+from test_asyncresource import AsyncZanataResourceTest
+
+from test_client import HttpCacheTest, HttpPoolTest, RequestMemoTest, RestClientTest, RestHandleTest, \
+    RetryPolicyTest, TransferTest
 
 from test_context import ProjectContextTest
 
+from test_jobpool import JobPoolTest, ProcessPoolTest
+
+from test_jsonstream import StreamedObjectTest
+
+from test_lazy import LazyPackageTest
+
+from test_manifest import PushManifestTest, TranslationStateTest
+
 from test_parseconfig import ConfigTest
 
+from test_polexer import POStreamTest
+
+from test_powriter import POWriterTest
+
 from test_publicanutil import PublicanUtilityTest
 
 from test_service import ServiceTest
@@ -43,4 +58,19 @@ suite.addTest(unittest.makeSuite(PublicanUtilityTest))
 suite.addTest(unittest.makeSuite(ServiceTest))
 suite.addTest(unittest.makeSuite(ProjectContextTest))
 suite.addTest(unittest.makeSuite(RestHandleTest))
+suite.addTest(unittest.makeSuite(RestClientTest))
+suite.addTest(unittest.makeSuite(HttpPoolTest))
+suite.addTest(unittest.makeSuite(HttpCacheTest))
+suite.addTest(unittest.makeSuite(TransferTest))
+suite.addTest(unittest.makeSuite(RetryPolicyTest))
+suite.addTest(unittest.makeSuite(RequestMemoTest))
+suite.addTest(unittest.makeSuite(JobPoolTest))
+suite.addTest(unittest.makeSuite(ProcessPoolTest))
+suite.addTest(unittest.makeSuite(PushManifestTest))
+suite.addTest(unittest.makeSuite(TranslationStateTest))
+suite.addTest(unittest.makeSuite(StreamedObjectTest))
+suite.addTest(unittest.makeSuite(AsyncZanataResourceTest))
+suite.addTest(unittest.makeSuite(LazyPackageTest))
+suite.addTest(unittest.makeSuite(POStreamTest))
+suite.addTest(unittest.makeSuite(POWriterTest))
 results = unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,74 @@
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+all__ = (
+    "AsyncZanataResourceTest",
+)
+
+import os
+import sys
+import threading
+import unittest
+
+import mock
+
+from zanataclient.zanatalib.asyncresource import AsyncZanataResource
+from zanataclient.zanatalib.jobpool import FutureTimeoutError
+from zanataclient.zanatalib.rest.memo import RequestMemo
+
+sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
+
+
+class AsyncZanataResourceTest(unittest.TestCase):
+    def setUp(self):
+        self.resource = AsyncZanataResource('http://localhost', {'Accept': 'application/json'}, workers=4,
+                                            memo=RequestMemo())
+
+    def tearDown(self):
+        self.resource.shutdown()
+
+    @mock.patch('zanataclient.zanatalib.rest.client.RestClient.process_request')
+    def test_calls_in_flight(self, process_request):
+        release = threading.Event()
+
+        def request(service_name, *args, **kwargs):
+            release.wait(5)
+            return {'status': '200'}, u'{"id": "1.0"}'
+
+        process_request.side_effect = request
+        futures = [self.resource.projects.iterations.get('project', str(i)) for i in range(4)]
+        self.assertFalse(any(future.done() for future in futures), 'calls should not block the caller')
+        self.assertRaises(FutureTimeoutError, futures[0].result, 0.1)
+        done = []
+        futures[0].add_done_callback(done.append)
+        release.set()
+        self.assertEqual([future.result(5).id for future in futures], ['1.0'] * 4)
+        self.assertEqual(done, [futures[0]])
+        self.assertEqual(len(self.resource._pool._threads), 4)
+
+    @mock.patch('zanataclient.zanatalib.rest.client.RestClient.process_request')
+    def test_error_status(self, process_request):
+        process_request.return_value = {'status': '401'}, u''
+        future = self.resource.projects.iterations.get('project', '1.0')
+        self.assertRaises(SystemExit, future.result, 5)
+        self.assertTrue(isinstance(future.exception(), SystemExit), 'a service error should not stop the workers')
+        process_request.return_value = {'status': '200'}, u'{"id": "1.0"}'
+        self.assertEqual(self.resource.projects.iterations.get('project', '1.0').result(5).id, '1.0')
+
+if __name__ == '__main__':
+    unittest.main()
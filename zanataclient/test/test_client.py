@@ -20,15 +20,27 @@
 # Boston, MA  02110-1301, USA.
 
 all__ = (
-    "RestHandleTest",
+    "RestHandleTest", "RestClientTest", "HttpPoolTest", "HttpCacheTest", "TransferTest",
+    "RetryPolicyTest", "RequestMemoTest",
 )
 
+import errno
+import io
 import os
+import shutil
+import socket
 import sys
+import tempfile
+import threading
+import zlib
 
 import mock
 
-from zanataclient.zanatalib.rest.client import RestHandle
+from zanataclient.zanatalib.rest.cache import HttpCache
+from zanataclient.zanatalib.rest.client import HttpPool, RestClient, RestHandle, gzip_body
+from zanataclient.zanatalib.rest.memo import RequestMemo
+from zanataclient.zanatalib.rest.retry import RetryPolicy
+from zanataclient.zanatalib.rest.transfer import DecodingResponse, TransferStats
 
 
 if sys.version_info < (2, 7):
@@ -98,5 +110,228 @@ class RestHandleTest(unittest.TestCase):
         self.assertTrue('links' in response_content[1], 'links should be in content')
         self.assertTrue('status' in response_content[1], 'project status should be in content')
 
+    def test_body_sent_as_bytes(self):
+        http = mock.Mock()
+        http.request.return_value = response, b'{}'
+        headers = dict(HEADERS)
+        RestHandle(URL, RESOURCE, 'PUT', body=u'{"content": "\u00e9"}', headers=headers, http=http).get_response_content()
+        body = http.request.call_args[1]['body']
+        self.assertEqual(body, u'{"content": "\u00e9"}'.encode('utf-8'), 'body should not be wrapped or copied')
+        self.assertEqual(http.request.call_args[1]['headers']['Content-Length'], str(len(body)),
+                         'length in bytes, not characters')
+
+
+class RestClientTest(unittest.TestCase):
+    @mock.patch('zanataclient.zanatalib.rest.client.RestHandle')
+    def test_compressed_body_fallback(self, rest_handle):
+        requests = []
+
+        def handle(*args, **kwargs):
+            requests.append(kwargs)
+            status = '415' if 'Content-Encoding' in kwargs['headers'] else '201'
+            handle = mock.Mock()
+            handle.get_response_content.return_value = ({'status': status}, u'')
+            return handle
+
+        rest_handle.side_effect = handle
+        client = RestClient('http://localhost', compress_requests=True)
+        headers = {'Accept': 'application/json'}
+        body = u'{"textFlows": []}' * 100
+        response, content = client.process_request('commit_template', 'project', '1.0', body=body, headers=headers)
+        self.assertEqual(response['status'], '201')
+        self.assertEqual(zlib.decompress(requests[0]['body'], 31).decode('utf-8'), body)
+        self.assertEqual(requests[1]['body'], body, 'rejected request is sent again uncompressed')
+        self.assertFalse(client.compress_requests)
+        self.assertEqual(headers, {'Accept': 'application/json'}, 'caller headers should not change')
+
+    @mock.patch('zanataclient.zanatalib.rest.client.time.sleep')
+    @mock.patch('zanataclient.zanatalib.rest.client.RestHandle')
+    def test_retry_idempotent_requests(self, rest_handle, sleep):
+        results = [socket.error(errno.ECONNRESET, 'Connection reset by peer'),
+                   ({'status': '503', 'retry-after': '7'}, u''), ({'status': '200'}, u'{}')]
+
+        def handle(*args, **kwargs):
+            handle = mock.Mock()
+            result = results.pop(0)
+            if isinstance(result, Exception):
+                handle.get_response_content.side_effect = result
+            else:
+                handle.get_response_content.return_value = result
+            return handle
+
+        rest_handle.side_effect = handle
+        client = RestClient('http://localhost', retries=2, memo=None)
+        response, content = client.process_request('list_projects', headers={})
+        self.assertEqual(response['status'], '200')
+        self.assertEqual(sleep.call_args_list[1], mock.call(7.0), 'Retry-After should be honoured')
+        self.assertEqual(client.transfer.requests, 3)
+
+    @mock.patch('zanataclient.zanatalib.rest.client.time.sleep')
+    @mock.patch('zanataclient.zanatalib.rest.client.RestHandle')
+    def test_no_retry_of_post(self, rest_handle, sleep):
+        rest_handle.return_value.get_response_content.return_value = ({'status': '503'}, u'')
+        client = RestClient('http://localhost')
+        response, content = client.process_request('commit_template', 'project', '1.0', body=u'{}', headers={})
+        self.assertEqual(response['status'], '503')
+        self.assertEqual(rest_handle.call_count, 1)
+        self.assertFalse(sleep.called)
+
+
+class HttpPoolTest(unittest.TestCase):
+    def setUp(self):
+        self.pool = HttpPool(pool_size=2, idle_timeout=60)
+
+    def test_reuse_released_http(self):
+        http = self.pool.acquire()
+        self.pool.release(http)
+        self.assertTrue(self.pool.acquire() is http, 'idle http object should be reused')
+        self.assertFalse(self.pool.acquire() is http, 'http object is handed out once')
+
+    def test_pool_size(self):
+        http_objects = [self.pool.acquire() for i in range(3)]
+        [self.pool.release(http) for http in http_objects]
+        self.assertEqual(len(self.pool._idle), 2, 'pool keeps pool_size idle http objects')
+        no_pool = HttpPool(pool_size=0)
+        http = no_pool.acquire()
+        no_pool.release(http)
+        self.assertFalse(no_pool.acquire() is http, 'pool_size 0 disables reuse')
+
+    def test_idle_timeout(self):
+        http = self.pool.acquire()
+        self.pool.release(http)
+        self.pool.idle_timeout = -1
+        self.assertFalse(self.pool.acquire() is http, 'stale http object should be dropped')
+        self.assertEqual(len(self.pool._idle), 0)
+
+    def test_cache_is_shared(self):
+        cache = mock.Mock()
+        http = HttpPool(cache=cache).acquire()
+        self.assertTrue(http.cache is cache)
+        self.assertEqual(http.optimistic_concurrency_methods, [], 'cached etag must not be sent with PUT')
+
+
+class HttpCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        # 3 entries of 400 bytes fit
+        self.cache = HttpCache(self.cache_dir, max_size=1300 / 1024.0 / 1024.0)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_set_get_delete(self):
+        self.cache.set('http://localhost/r/doc', b'content')
+        self.assertEqual(self.cache.get('http://localhost/r/doc'), b'content')
+        self.cache.delete('http://localhost/r/doc')
+        self.assertEqual(self.cache.get('http://localhost/r/doc'), None)
+        self.cache.delete('http://localhost/r/doc')
+
+    def test_lru_eviction(self):
+        for i in range(3):
+            self.cache.set('http://localhost/r/doc%s' % i, b'x' * 400)
+            os.utime(self.cache._path('http://localhost/r/doc%s' % i), (i, i))
+        self.cache.get('http://localhost/r/doc0')
+        self.cache.set('http://localhost/r/doc3', b'x' * 400)
+        self.assertEqual(self.cache.get('http://localhost/r/doc1'), None, 'least recently used is evicted')
+        for i in (0, 2, 3):
+            self.assertTrue(self.cache.get('http://localhost/r/doc%s' % i))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 3, 'no temp file left behind')
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_backoff(self):
+        policy = RetryPolicy(retries=3, backoff=1.0, max_delay=3.0)
+        delays = [policy.next_delay('GET', attempt, response={'status': '502'}) for attempt in range(4)]
+        self.assertTrue(0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0 and 1.5 <= delays[2] <= 3.0)
+        self.assertEqual(delays[3], None, 'retries are exhausted')
+        self.assertEqual(policy.next_delay('GET', 0, response={'status': '500'}), None)
+        self.assertEqual(policy.next_delay('POST', 0, response={'status': '503'}), None)
+        self.assertEqual(policy.next_delay('PUT', 0, error=socket.error(errno.ENOENT, 'No such file')), None)
+
+    def test_budget(self):
+        policy = RetryPolicy(retries=5, budget=2, backoff=0)
+        delays = [policy.next_delay('PUT', 0, error=socket.timeout()) for i in range(3)]
+        self.assertEqual(delays, [0, 0, None], 'budget is shared by all the requests')
+
+
+class RequestMemoTest(unittest.TestCase):
+    def test_single_flight(self):
+        memo = RequestMemo()
+        release = threading.Event()
+        requests = []
+
+        def request():
+            requests.append(1)
+            release.wait(5)
+            return {'status': '200'}, u'[]'
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(memo.fetch('key', '/r', request))) for i in range(3)]
+        [thread.start() for thread in threads]
+        release.set()
+        [thread.join(5) for thread in threads]
+        self.assertEqual(len(requests), 1, 'concurrent identical requests should be sent once')
+        self.assertEqual(results, [({'status': '200'}, u'[]')] * 3)
+        memo.fetch('key', '/r', request)
+        self.assertEqual(len(requests), 1)
+
+    @mock.patch('zanataclient.zanatalib.rest.client.RestClient._request')
+    def test_write_invalidates(self, request):
+        request.return_value = {'status': '200'}, u'[]'
+        client = RestClient('http://localhost', memo=RequestMemo())
+        for i in range(2):
+            client.process_request('list_files', 'project', '1.0', headers={})
+            client.process_request('get_iteration', 'project', '1.0', headers={})
+            client.process_request('server_version', headers={})
+        self.assertEqual(request.call_count, 3)
+        client.process_request('update_template', 'project', '1.0', 'doc', body=u'{}', headers={})
+        client.process_request('list_files', 'project', '1.0', headers={})
+        client.process_request('get_iteration', 'project', '1.0', headers={})
+        client.process_request('server_version', headers={})
+        self.assertEqual(request.call_count, 6, 'document list and version are read again, not the server version')
+        client.process_request('retrieve_template', 'project', '1.0', 'doc', headers={})
+        client.process_request('retrieve_template', 'project', '1.0', 'doc', headers={})
+        self.assertEqual(request.call_count, 8, 'documents are not memoized')
+
+
+class FakeSocket(object):
+    def __init__(self, data):
+        self.data = data
+
+    def makefile(self, *args, **kwargs):
+        return io.BytesIO(self.data)
+
+
+class TransferTest(unittest.TestCase):
+    def get_response(self, body, encoding):
+        data = b'HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n'
+        data += b'Content-Encoding: ' + encoding + b'\r\nContent-Length: ' + str(len(body)).encode('ascii')
+        response = DecodingResponse(FakeSocket(data + b'\r\n\r\n' + body))
+        response.stats = TransferStats()
+        response.begin()
+        return response
+
+    def test_gzip_response(self):
+        content = b'{"textFlows": []}' * 500
+        response = self.get_response(gzip_body(content), b'gzip')
+        self.assertEqual(response.read(), content)
+        self.assertEqual(response.getheader('content-encoding'), None, 'httplib2 should not decode it again')
+        self.assertEqual(response.getheader('content-length'), str(len(content)))
+        self.assertEqual(response.stats.bytes_received, len(gzip_body(content)))
+        self.assertEqual(response.stats.bytes_received_decoded, len(content))
+
+    def test_raw_deflate_response(self):
+        content = b'{"textFlowTargets": []}' * 500
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -zlib.MAX_WBITS)
+        response = self.get_response(compressor.compress(content) + compressor.flush(), b'deflate')
+        self.assertEqual(response.read(), content)
+
+    def test_connection_type(self):
+        stats = TransferStats()
+        connection_type = stats.connection_type('https://localhost/zanata')
+        self.assertTrue(issubclass(connection_type.response_class, DecodingResponse))
+        self.assertTrue(connection_type.response_class.stats is stats)
+        self.assertTrue(connection_type('localhost', timeout=None).response_class.stats is stats)
+
 if __name__ == '__main__':
     unittest.main()
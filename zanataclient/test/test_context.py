@@ -24,7 +24,11 @@ all__ = (
 )
 
 import os
+import shutil
 import sys
+import tempfile
+import threading
+import time
 import unittest
 
 import mock
@@ -70,9 +74,17 @@ mock_project_remote_config = {'url': 'http://localhost/zanata/', 'project': 'id'
 
 class ProjectContextTest(unittest.TestCase):
     def setUp(self):
+        # an empty context cache for each test
+        self.cache_home = tempfile.mkdtemp()
+        self.environ = mock.patch.dict(os.environ, {'XDG_CACHE_HOME': self.cache_home})
+        self.environ.start()
         self.context = ProjectContext(command_options)
         self.init_context = ProjectContext(command_options, 'init')
 
+    def tearDown(self):
+        self.environ.stop()
+        shutil.rmtree(self.cache_home)
+
     def test_command_options(self):
         command_options_keys = ['project_type', 'project_config', 'comment_cols', 'user_config']
         self.assertTrue(list(self.context.command_options.keys())[0] in command_options_keys)
@@ -162,6 +174,107 @@ class ProjectContextTest(unittest.TestCase):
             'context_data should contain locale_map fetched from server'
         )
 
+    @mock.patch('zanataclient.parseconfig.ZanataConfig.read_project_config')
+    @mock.patch('zanataclient.zanatalib.projectservice.LocaleService.get_locales')
+    @mock.patch('zanataclient.zanatalib.versionservice.VersionService.get_server_version')
+    @mock.patch('zanataclient.zanatalib.projectservice.IterationService.config')
+    def test_context_keys(self, mock_config, mock_get_server_version, mock_get_locales, mock_read_project_config):
+        mock_config.return_value = mock_project_remote_config
+        mock_get_server_version.return_value = version_service_return_content
+        mock_get_locales.return_value = project_locales_return_content
+        mock_read_project_config.return_value = project_config_without_locale_map
+        context_data = ProjectContext(command_options, remote_keys=()).get_context_data()
+        self.assertFalse('server_version' in context_data)
+        self.assertFalse(mock_get_server_version.called or mock_get_locales.called or mock_config.called)
+
+        context_data = ProjectContext(command_options, lazy_keys=('locale_map',)).get_context_data()
+        self.assertEqual(context_data['server_version'], '3.7.3')
+        self.assertFalse(mock_get_locales.called, 'locale_map is fetched once read')
+        self.assertTrue('locale_map' in context_data)
+        self.assertEqual(context_data.get('locale_map')['zh-Hant-TW'], 'zh-Hant-TW')
+        self.assertEqual(mock_get_locales.call_count, 1)
+
+        # the context cache of that command lacks the locale_map
+        ProjectContext(command_options).get_context_data()
+        self.assertEqual(mock_get_server_version.call_count, 2)
+        self.assertEqual(mock_get_locales.call_count, 2)
+
+    @mock.patch('zanataclient.context.ProjectContext.revalidate_remote_config')
+    @mock.patch('zanataclient.zanatalib.projectservice.LocaleService.get_locales')
+    @mock.patch('zanataclient.zanatalib.versionservice.VersionService.get_server_version')
+    @mock.patch('zanataclient.zanatalib.projectservice.IterationService.config')
+    def test_remote_config_cache(self, mock_config, mock_get_server_version, mock_get_locales, mock_revalidate):
+        mock_config.return_value = mock_project_remote_config
+        mock_get_server_version.return_value = version_service_return_content
+        mock_get_locales.return_value = iteration_locales_return_content
+        self.context.build_local_config()
+        self.context.build_remote_config()
+        context = ProjectContext(command_options)
+        context.build_local_config()
+        self.assertEqual(context.build_remote_config(), self.context.remote_config)
+        self.assertEqual(mock_get_server_version.call_count, 1, 'remote config should come from the cache')
+        self.assertFalse(mock_revalidate.called)
+
+        cache_path = context.get_remote_config_cache()
+        with mock.patch('zanataclient.context.time.time', return_value=time.time() + 7200):
+            context = ProjectContext(command_options)
+            context.build_local_config()
+            context.build_remote_config()
+        self.assertEqual(context.remote_config['server_version'], '3.7.3')
+        self.assertEqual(mock_get_server_version.call_count, 1, 'stale remote config is used meanwhile')
+        self.assertEqual(mock_revalidate.call_args, mock.call(cache_path))
+
+        refresh_options = dict(command_options, refreshcontext=[{'value': None}])
+        context = ProjectContext(refresh_options)
+        context.build_local_config()
+        context.build_remote_config()
+        self.assertEqual(mock_get_server_version.call_count, 2, '--refresh-context fetches it again')
+
+    @mock.patch('zanataclient.zanatalib.rest.client.RestClient.process_request')
+    @mock.patch('zanataclient.zanatalib.versionservice.VersionService.get_server_version')
+    @mock.patch('zanataclient.zanatalib.projectservice.IterationService.config')
+    def test_remote_configs_run_concurrently(self, mock_config, mock_get_server_version, mock_process_request):
+        lock = threading.Lock()
+        started = []
+        all_started = threading.Event()
+
+        def wait_for_others(value):
+            def side_effect(*args, **kwargs):
+                with lock:
+                    started.append(value)
+                    # the locales are mapped in zanata.xml
+                    if len(started) == 4:
+                        all_started.set()
+                # each request waits for the others, made at the same time
+                all_started.wait(5)
+                return value
+            return side_effect
+        mock_config.side_effect = wait_for_others(mock_project_remote_config)
+        mock_get_server_version.side_effect = wait_for_others(version_service_return_content)
+        mock_process_request.side_effect = wait_for_others(({'status': '200'}, '{}'))
+        context = ProjectContext(command_options, prefetch_project=True)
+        context.build_local_config()
+        context.build_remote_config()
+        self.assertTrue(all_started.is_set())
+        self.assertEqual(context.remote_config['server_version'], '3.7.3')
+        self.assertEqual(context.remote_config['project_type'], 'podir')
+        self.assertEqual([call[0][0] for call in mock_process_request.call_args_list].count('get_iteration'), 1)
+
+    def test_call_concurrently_error(self):
+        done = []
+
+        def fail():
+            sys.exit(1)
+        self.assertRaises(SystemExit, self.context.call_concurrently, [fail, lambda: done.append(True)])
+        self.context.call_concurrently([lambda: done.append(True)])
+        self.assertTrue(done)
+
+    def test_request_memo(self):
+        project_service = self.context._get_project_service()
+        self.assertTrue(project_service.restclient.memo is self.context.memo)
+        self.assertTrue(project_service.iterations.restclient.memo is self.context.memo)
+        self.assertFalse(ProjectContext(command_options).memo is self.context.memo, 'a memo for each run')
+
     def test_process_locales(self):
         locale_map = self.context.process_locales(iteration_locales_return_content)
         self.assertEqual(locale_map, {'bn-IN': 'bn-IN', 'pa-IN': 'pa', 'en-US': 'en-US',
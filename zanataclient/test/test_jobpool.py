@@ -0,0 +1,194 @@
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+all__ = (
+    "JobPoolTest", "ProcessPoolTest",
+)
+
+import imp
+import os
+import sys
+import threading
+import time
+
+from zanataclient.zanatalib.jobpool import FutureTimeoutError, JobPool, ProcessPool, wait_interruptibly
+
+
+sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
+if sys.version_info < (2, 7):
+    import unittest2 as unittest
+else:
+    import unittest
+
+
+def square(n):
+    return n * n, os.getpid()
+
+
+def exit_on(n, code):
+    if n == code:
+        sys.exit(code)
+    return n
+
+
+class JobPoolTest(unittest.TestCase):
+    def test_runs_all_jobs(self):
+        done = []
+        pool = JobPool(4)
+        for i in range(20):
+            pool.submit(done.append, i)
+        pool.join()
+        self.assertEqual(sorted(done), list(range(20)))
+
+    def test_single_worker_runs_inline(self):
+        threads = []
+        pool = JobPool(1)
+        pool.submit(lambda: threads.append(threading.current_thread()))
+        self.assertEqual(threads, [threading.current_thread()], 'job should run in calling thread')
+
+    def test_jobs_submit_jobs(self):
+        done = []
+        pool = JobPool(2)
+        for i in range(3):
+            pool.submit(lambda n: [pool.submit(done.append, (n, m)) for m in range(3)], i)
+        pool.join()
+        self.assertEqual(len(done), 9)
+
+    def test_submit_next_goes_first(self):
+        started = threading.Event()
+        release = threading.Event()
+        done = []
+
+        def block():
+            started.set()
+            release.wait()
+
+        pool = JobPool(2)
+        pool.submit(block)
+        pool.submit(block)
+        started.wait()
+        for i in range(3):
+            pool.submit(done.append, ('later', i))
+        pool.submit_next(done.append, ('next', 0))
+        release.set()
+        pool.join()
+        self.assertEqual(done[0], ('next', 0))
+        self.assertEqual(len(done), 4)
+
+    @unittest.skipIf(
+        sys.version_info < (2, 7),
+        'https://docs.python.org/2/library/unittest.html#unittest.TestCase.assertRaises'
+    )
+    def test_exit_stops_pool(self):
+        done = []
+
+        def job(n):
+            if n == 0:
+                sys.exit(1)
+            time.sleep(0.01)
+            done.append(n)
+
+        pool = JobPool(2)
+        for i in range(50):
+            pool.submit(job, i)
+        with self.assertRaises(SystemExit) as ex:
+            pool.join()
+        self.assertEqual(ex.exception.code, 1)
+        self.assertTrue(pool.stopped)
+        self.assertTrue(len(done) < 49, 'pending jobs should be dropped')
+
+    def test_wait_interruptibly(self):
+        event = threading.Event()
+        self.assertFalse(wait_interruptibly(event, 0.1))
+        timer = threading.Timer(0.1, event.set)
+        timer.start()
+        self.assertTrue(wait_interruptibly(event))
+        self.assertTrue(wait_interruptibly(timer, 1))
+        self.assertFalse(timer.is_alive())
+        self.assertFalse(wait_interruptibly(lambda: False, 0.1))
+        self.assertTrue(wait_interruptibly(event.is_set, 0))
+
+    def test_futures(self):
+        pool = JobPool(2)
+        release = threading.Event()
+        waiting = pool.submit_future(release.wait, 5)
+        failed = pool.submit_future(sys.exit, 1)
+        self.assertRaises(FutureTimeoutError, waiting.result, 0.1)
+        self.assertRaises(SystemExit, failed.result, 5)
+        self.assertFalse(pool.stopped, 'the error should go to the future only')
+        release.set()
+        self.assertTrue(waiting.result(5))
+        pool.join()
+
+
+class ProcessPoolTest(unittest.TestCase):
+    def needs_processes(self):
+        if imp.lock_held():
+            self.skipTest('the pool runs in the calling process while a module is imported')
+
+    def test_results_in_order(self):
+        self.needs_processes()
+        pool = ProcessPool(2)
+        try:
+            results = [result.get() for result in pool.imap(square, ((n,) for n in range(20)), 2)]
+        finally:
+            pool.close()
+        self.assertEqual([value for value, pid in results], [n * n for n in range(20)])
+        self.assertFalse(os.getpid() in [pid for value, pid in results], 'should run in the processes')
+
+    def test_single_process_runs_inline(self):
+        done = []
+        pool = ProcessPool(1)
+        result = pool.submit(done.append, 1)
+        self.assertEqual(done, [], 'should run when the result is read')
+        result.get()
+        self.assertEqual(done, [1])
+
+    def test_imap_ahead(self):
+        self.needs_processes()
+        pool = ProcessPool(2)
+        try:
+            results = pool.imap(square, ((n,) for n in range(10)), 3)
+            first = next(results)
+            # started ahead of the results read, up to 3
+            self.assertEqual(pool._unread, 3)
+            first.get()
+            for result in results:
+                result.get()
+        finally:
+            pool.close()
+        self.assertEqual(pool._unread, 0)
+
+    @unittest.skipIf(
+        sys.version_info < (2, 7),
+        'https://docs.python.org/2/library/unittest.html#unittest.TestCase.assertRaises'
+    )
+    def test_exit(self):
+        pool = ProcessPool(2)
+        try:
+            results = [pool.submit(exit_on, n, 3) for n in range(5)]
+            self.assertEqual(results[2].get(), 2)
+            with self.assertRaises(SystemExit) as ex:
+                results[3].get()
+            self.assertEqual(ex.exception.code, 3)
+            self.assertEqual(results[4].get(), 4)
+        finally:
+            pool.terminate()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+all__ = (
+    "StreamedObjectTest",
+)
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from zanataclient.publicanutil import PublicanUtility
+from zanataclient.zanatalib.jsonstream import StreamedObject
+
+sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
+
+TARGETS = [
+    {'resId': 'a', 'state': 'Approved', 'content': u'[{"not": "json"}], \u00e9'},
+    {'resId': 'b', 'state': 'NeedReview', 'contents': [u'b', u'bs'], 'extensions': []},
+]
+EXTENSIONS = [{'object-type': 'po-target-header', 'comment': u'header', 'entries': []}]
+
+
+class StreamedObjectTest(unittest.TestCase):
+    def test_members_around_the_array(self):
+        for content in ('{"extensions": %s, "textFlowTargets": %s, "links": []}',
+                        '{ "textFlowTargets" : %s ,\n "extensions":%s }'):
+            if content.index('extensions') < content.index('textFlowTargets'):
+                content = content % (json.dumps(EXTENSIONS), json.dumps(TARGETS))
+            else:
+                content = content % (json.dumps(TARGETS), json.dumps(EXTENSIONS))
+            streamed = StreamedObject(content.encode('utf-8'), 'textFlowTargets')
+            self.assertEqual(streamed.get('extensions'), EXTENSIONS)
+            self.assertEqual(list(streamed.get('textFlowTargets')), TARGETS)
+            self.assertEqual(list(streamed.get('textFlowTargets')), TARGETS, 'array can be iterated again')
+            self.assertEqual(streamed.get('missing', 1), 1)
+
+    def test_empty_array(self):
+        for content in ('{"textFlowTargets": [ ]}', '{"textFlowTargets": null}'):
+            targets = StreamedObject(content, 'textFlowTargets').get('textFlowTargets')
+            self.assertFalse(targets)
+            self.assertEqual(list(targets), [])
+        self.assertEqual(StreamedObject('{}', 'textFlowTargets').get('textFlowTargets'), None)
+        self.assertTrue(StreamedObject(json.dumps({'textFlowTargets': TARGETS}), 'textFlowTargets').get('textFlowTargets'))
+
+    def test_invalid_content(self):
+        self.assertRaises(ValueError, StreamedObject, '', 'textFlowTargets')
+        self.assertRaises(ValueError, StreamedObject, '[]', 'textFlowTargets')
+        streamed = StreamedObject('{"textFlowTargets": [{}, {} {}]}', 'textFlowTargets')
+        self.assertRaises(ValueError, list, streamed.get('textFlowTargets'))
+
+    def test_save_to_pofile(self):
+        publican = PublicanUtility()
+        folder = tempfile.mkdtemp()
+        try:
+            template = json.loads(publican.potfile_to_json("./testfiles/pot/test.pot", "./testfiles/pot")[0])
+            translations = publican.pofile_to_json("./testfiles/po/test.po")
+            paths = [os.path.join(folder, name) for name in ('loaded.po', 'streamed.po')]
+            publican.save_to_pofile(paths[0], json.loads(translations), template, False, 'fr', 'test')
+            publican.save_to_pofile(paths[1], StreamedObject(translations.encode('utf-8'), 'textFlowTargets'),
+                                    template, False, 'fr', 'test')
+            with open(paths[0]) as loaded, open(paths[1]) as streamed:
+                self.assertEqual(loaded.read(), streamed.read())
+        finally:
+            shutil.rmtree(folder)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+all__ = (
+    "LazyPackageTest",
+)
+
+import importlib
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
+
+import zanataclient
+import zanataclient.zanatalib
+
+# loaded by the commands only, not by zanata help
+HEAVY_MODULES = ('httplib2', 'lxml', 'polib', 'zanataclient.zanatalib.rest.client',
+                 'zanataclient.context', 'zanataclient.cmdbase', 'zanataclient.publicanutil')
+
+
+class LazyPackageTest(unittest.TestCase):
+    def test_cli_import(self):
+        code = ("import sys; from zanataclient import zanata; "
+                "print(' '.join(name for name in %r if name in sys.modules))" % (HEAVY_MODULES,))
+        env = dict(os.environ, PYTHONPATH=os.path.abspath(__file__ + "/../../.."))
+        process = subprocess.Popen([sys.executable, '-c', code], stdout=subprocess.PIPE, env=env)
+        output = process.communicate()[0].decode('utf-8').strip()
+        self.assertEqual(process.returncode, 0)
+        self.assertEqual(output, '', 'imported by zanata.py: %s' % output)
+
+    def test_exports(self):
+        for package in (zanataclient, zanataclient.zanatalib):
+            modules = set(package._exports.values())
+            for module_name in modules:
+                module = importlib.import_module('.' + module_name, package.__name__)
+                names = [name for name, exporter in package._exports.items() if exporter == module_name]
+                if hasattr(module, '__all__'):
+                    self.assertEqual(sorted(names), sorted(module.__all__))
+                for name in names:
+                    self.assertTrue(getattr(package, name) is getattr(module, name))
+        self.assertTrue(zanataclient.run is zanataclient.zanata.run)
+        self.assertRaises(AttributeError, getattr, zanataclient.zanatalib, 'NoSuchName')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+all__ = (
+    "PushManifestTest", "TranslationStateTest",
+)
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from zanataclient.manifest import PushManifest, TranslationState
+
+sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
+
+
+class PushManifestTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.path = os.path.join(self.folder, '.zanata-manifest.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_skips_pushed_documents(self):
+        digest = PushManifest.digest(u'{"name": "doc"}')
+        manifest = PushManifest(self.path, 'http://localhost', 'project', '1.0')
+        manifest.set_pushed('doc', digest)
+        manifest.save()
+        self.assertEqual(os.listdir(self.folder), ['.zanata-manifest.json'])
+
+        manifest = PushManifest(self.path, 'http://localhost', 'project', '1.0', incremental=True)
+        self.assertTrue(manifest.skips('doc', digest))
+        self.assertFalse(manifest.skips('doc', PushManifest.digest('{"name": "changed"}')))
+        self.assertFalse(manifest.skips('other', digest))
+        self.assertFalse(PushManifest(self.path, 'http://localhost', 'project', '1.0').skips('doc', digest),
+                         'only --incremental skips documents')
+        self.assertFalse(PushManifest(self.path, 'http://localhost', 'project', '2.0', True).skips('doc', digest),
+                         'versions are tracked separately')
+
+    def test_invalid_manifest(self):
+        with open(self.path, 'w') as manifest_file:
+            manifest_file.write('{')
+        manifest = PushManifest(self.path, 'http://localhost', 'project', '1.0', incremental=True)
+        self.assertFalse(manifest.skips('doc', PushManifest.digest('')))
+
+
+class TranslationStateTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.state = TranslationState(self.folder, 'http://localhost', 'project', '1.0')
+        self.targets = [
+            {'resId': 'a', 'state': 'Approved', 'content': 'A', 'extensions': []},
+            {'resId': 'b', 'state': 'NeedReview', 'content': 'B', 'extensions': []},
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_only_changed_targets(self):
+        delta = self.state.delta('sub/doc', 'de')
+        self.assertEqual(delta.filter(self.targets), self.targets)
+        delta.save()
+
+        self.targets[1] = dict(self.targets[1], state='Approved')
+        delta = self.state.delta('sub/doc', 'de')
+        self.assertEqual(delta.filter(self.targets), [self.targets[1]])
+        self.assertEqual(delta.changed, 1)
+        self.assertEqual(self.state.delta('sub/doc', 'fr').filter(self.targets), self.targets,
+                         'locales are tracked separately')
+
+    def test_unsaved_delta(self):
+        self.state.delta('doc', 'de').filter(self.targets)
+        self.assertEqual(self.state.delta('doc', 'de').filter(self.targets), self.targets,
+                         'targets are recorded only once pushed')
+
+if __name__ == '__main__':
+    unittest.main()
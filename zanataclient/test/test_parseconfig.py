@@ -46,6 +46,7 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(server, "local")
         self.assertEqual(user_name, "username")
         self.assertEqual(apikey, "key")
+        self.assertEqual(self.config.get_server_options(server), {'http-cache': 'true'})
 
     def test_project_config(self):
         project_config = self.config.read_project_config("./testfiles/zanata.xml")
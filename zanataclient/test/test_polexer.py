@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+all__ = (
+    "POStreamTest",
+)
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
+
+from zanataclient.polexer import POStream, UnsupportedPOFile
+from zanataclient.publicanutil import PublicanUtility
+
+TESTFILES = os.path.abspath(__file__ + "/../testfiles")
+HEADER = u'''# Translation of the test project.
+#
+## Copyright
+#, fuzzy
+msgid ""
+msgstr ""
+"Project-Id-Version: test 1.0\\n"
+"Content-Type: text/plain; charset=UTF-8\\n"
+"X-Generator: x10\\n"
+"X-Generator-2: x2\\n"
+"X-Note: first line\\n"
+"second line\\n"
+"Plural-Forms: nplurals=2; plural=(n != 1);\\n"
+'''
+ENTRIES = u'''
+# translator comment
+#  indented
+#
+#. extracted
+#. second extracted
+#: src/a.c:10 src/b.c docs/c.txt:intro
+#, c-format, fuzzy
+#| msgid "Old %s"
+msgid "Open %s"
+msgstr "Öffnen %s"
+
+msgctxt "menu"
+msgid ""
+"Long "
+"message\\twith \\"escapes\\" and \\\\ backslash\\n"
+msgstr ""
+"Translated "
+"message\\n"
+
+#, fuzzy
+msgid "One file"
+msgid_plural "%d files"
+msgstr[0] "Eine Datei"
+msgstr[1] ""
+"%d Dateien"
+
+msgid "Untranslated"
+msgstr ""
+
+#| msgctxt "old"
+#| msgid "previous"
+#| ""
+#| "continued"
+msgid "With previous"
+msgstr "Mit"
+
+#~ msgid "Obsolete"
+#~ msgstr "Veraltet"
+
+#~| msgid "ignored"
+#~ msgctxt "old"
+#~ msgid "Obsolete plural"
+#~ msgid_plural "Obsolete plurals"
+#~ msgstr[0] "a"
+#~ msgstr[1] "b"
+'''
+# read by the lexer, as by polib
+SAMPLES = {
+    'entries.po': HEADER + ENTRIES,
+    'trailing-comment.po': HEADER + ENTRIES + u'\n# trailing comment\n',
+    'no-final-newline.po': HEADER + ENTRIES.rstrip(u'\n'),
+    'bom.po': u'﻿' + HEADER + ENTRIES,
+    'crlf.po': (HEADER + ENTRIES).replace(u'\n', u'\r\n'),
+    'spaces.po': (HEADER + ENTRIES).replace(u'\nmsgid "', u'\n  msgid\t "').replace(u'"\n', u'"  \n'),
+    'no-header.po': ENTRIES,
+    'header-comment-only.po': u'#\n# comment\n' + ENTRIES,
+    'template.pot': HEADER.replace(u'#, fuzzy\n', u'').replace(u'UTF-8', u'CHARSET') +
+    ENTRIES.replace(u'Öffnen %s', u''),
+}
+# read by polib, as the lexer does not
+FALLBACK_SAMPLES = {
+    'lone-cr.po': (HEADER + ENTRIES).replace(u'msgid "Untranslated"\n', u'msgid "Untranslated"\r'),
+    'two-headers.po': HEADER + ENTRIES + u'\nmsgid ""\nmsgstr "Project-Id-Version: other\\n"\n',
+    'late-header.po': ENTRIES + u'\n' + HEADER,
+}
+
+
+class POStreamTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, name, content):
+        path = os.path.join(self.folder, name)
+        with io.open(path, 'w', encoding='utf-8', newline='') as pofile:
+            pofile.write(content)
+        return path
+
+    def convert(self, path, lexer):
+        publicanutil = PublicanUtility(lexer=lexer)
+        pofile = publicanutil.read_pofile(path)
+        try:
+            if path.endswith('.pot'):
+                return publicanutil.has_plural(pofile), publicanutil.potfile_to_json(path, self.folder, pofile)
+            return (publicanutil.has_plural(pofile), publicanutil.potfile_to_json(path, self.folder, pofile),
+                    publicanutil.pofile_to_json(path), publicanutil.pofile_to_json(path, sparse=True))
+        finally:
+            publicanutil.close_pofile(pofile)
+
+    def assertSameJson(self, path):
+        self.assertEqual(self.convert(path, True), self.convert(path, False), os.path.basename(path))
+
+    def test_samples(self):
+        for name, content in SAMPLES.items():
+            path = self.write(name, content)
+            # read through without falling back to polib
+            entries = list(POStream(path))
+            self.assertTrue(entries, name)
+            self.assertSameJson(path)
+
+    def test_testfiles(self):
+        for folder, dirs, files in os.walk(TESTFILES):
+            for name in files:
+                if name.endswith('.po') or name.endswith('.pot'):
+                    path = os.path.join(folder, name)
+                    list(POStream(path))
+                    self.assertSameJson(path)
+
+    def test_fields(self):
+        with POStream(self.write('entries.po', HEADER + ENTRIES)) as pofile:
+            self.assertEqual(pofile.header, u'Translation of the test project.\n\n Copyright')
+            self.assertEqual(pofile.metadata['X-Note'], u'first line\nsecond line')
+            self.assertEqual([key for key, value in pofile.ordered_metadata()],
+                             ['Project-Id-Version', 'Content-Type', 'Plural-Forms', 'X-Generator',
+                              'X-Generator-2', 'X-Note'])
+            entries = list(pofile)
+            self.assertEqual(len(entries), 7)
+            self.assertEqual(entries[0].tcomment, u'translator comment\n indented\n')
+            self.assertEqual(entries[0].occurrences, [('src/a.c', '10'), ('src/b.c', ''), ('docs/c.txt:intro', '')])
+            self.assertEqual(entries[0].flags, ['c-format', 'fuzzy'])
+            self.assertEqual(entries[1].msgid, u'Long message\twith "escapes" and \\ backslash\n')
+            self.assertEqual(entries[2].msgstr_plural, {0: u'Eine Datei', 1: u'%d Dateien'})
+            self.assertEqual([entry.obsolete for entry in entries], [0, 0, 0, 0, 0, 1, 1])
+            self.assertEqual(entries[6].msgctxt, u'old')
+        # the memory map is closed
+        self.assertRaises(ValueError, list, pofile)
+
+    def test_fallback(self):
+        for name, content in FALLBACK_SAMPLES.items():
+            path = self.write(name, content)
+            self.assertRaises(UnsupportedPOFile, lambda: list(POStream(path)))
+            self.assertSameJson(path)
+        path = self.write('latin1.po', HEADER.replace(u'UTF-8', u'ISO-8859-1'))
+        self.assertRaises(UnsupportedPOFile, POStream, path)
+        self.assertTrue(isinstance(PublicanUtility().read_pofile(path), list))
+
+    def test_syntax_error(self):
+        path = self.write('error.po', HEADER + u'msgid "a"\nmsgstr "unescaped " quote"\n')
+        self.assertRaises(UnsupportedPOFile, lambda: list(POStream(path)))
+        # polib gives the error
+        self.assertRaises(SystemExit, PublicanUtility().pofile_to_json, path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+all__ = (
+    "POWriterTest",
+)
+
+import os
+import shutil
+import stat
+import sys
+import tempfile
+import unittest
+
+import polib
+
+sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
+
+from zanataclient.powriter import entry_text, write_pofile
+
+LONG = u'A message long enough to be wrapped by polib, with "quotes", a\ttab and accents: éèà ' * 2
+REFERENCES = [(u'src/some-folder/file-name-%d.c' % i, str(i * 10)) for i in range(8)]
+
+
+def sample_pofile():
+    po = polib.POFile()
+    po.header = u'Translation of the test project.\n\n, flagged\n: colon'
+    po.metadata = {'Project-Id-Version': u'test 1.0', 'X-Generator': u'x', 'Plural-Forms': u'nplurals=2; plural=(n != 1);',
+                   'Content-Type': u'text/plain; charset=UTF-8', 'X-2': u'two', 'X-10': u'ten'}
+    po.append(polib.POEntry(msgid=u'Short', msgstr=u'Kurz', occurrences=[(u'a.c', u'1'), (u'b.c', u'')]))
+    po.append(polib.POEntry(msgid=LONG, msgstr=LONG, comment=LONG, tcomment=u'first\n' + LONG, flags=[u'fuzzy', u'c-format'],
+                            occurrences=REFERENCES, msgctxt=LONG))
+    po.append(polib.POEntry(msgid=u'Lines\nand\r\nbreaks\n', msgstr=u'', flags=[u'']))
+    po.append(polib.POEntry(msgid=u'One file', msgid_plural=LONG, msgstr_plural={1: u'%d Dateien', 0: u'Eine Datei'}))
+    po.append(polib.POEntry(msgid=u'Empty context', msgctxt=u'', occurrences=None, flags=None))
+    return po
+
+
+class POWriterTest(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def write(self, path, po, wrapwidth=78):
+        write_pofile(path, po.header, po.metadata, (entry_text(entry, wrapwidth) for entry in po), wrapwidth)
+
+    def test_same_as_polib(self):
+        po = sample_pofile()
+        for wrapwidth in (78, 0, 30):
+            paths = [os.path.join(self.folder, name) for name in ('polib.po', 'writer.po')]
+            po.wrapwidth = wrapwidth
+            po.save(paths[0])
+            self.write(paths[1], po, wrapwidth)
+            with open(paths[0], 'rb') as saved, open(paths[1], 'rb') as written:
+                self.assertEqual(saved.read(), written.read(), 'wrapwidth %d' % wrapwidth)
+
+    def test_replace(self):
+        path = os.path.join(self.folder, 'test.po')
+        with open(path, 'w') as pofile:
+            pofile.write('previous content')
+        os.chmod(path, stat.S_IRUSR | stat.S_IWUSR)
+        self.write(path, sample_pofile())
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), stat.S_IRUSR | stat.S_IWUSR)
+        self.assertEqual(os.listdir(self.folder), ['test.po'])
+
+        def entries():
+            yield entry_text(polib.POEntry(msgid=u'written'))
+            raise KeyboardInterrupt()
+
+        with open(path, 'rb') as pofile:
+            written = pofile.read()
+        self.assertRaises(KeyboardInterrupt, write_pofile, path, u'', {}, entries())
+        # left as it was, without the temporary file
+        with open(path, 'rb') as pofile:
+            self.assertEqual(pofile.read(), written)
+        self.assertEqual(os.listdir(self.folder), ['test.po'])
+
+    def test_unchanged(self):
+        path = os.path.join(self.folder, 'test.po')
+        po = sample_pofile()
+        self.assertTrue(write_pofile(path, po.header, po.metadata, (entry_text(entry) for entry in po)))
+        os.utime(path, (1000, 1000))
+        self.assertFalse(write_pofile(path, po.header, po.metadata, (entry_text(entry) for entry in po)))
+        # left untouched for the builds depending on it
+        self.assertEqual(os.stat(path).st_mtime, 1000)
+        self.assertEqual(os.listdir(self.folder), ['test.po'])
+        po[0].msgstr = u'Kürzer'
+        self.assertTrue(write_pofile(path, po.header, po.metadata, (entry_text(entry) for entry in po)))
+        self.assertNotEqual(os.stat(path).st_mtime, 1000)
+
+if __name__ == '__main__':
+    unittest.main()
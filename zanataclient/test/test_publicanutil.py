@@ -25,10 +25,12 @@ all__ = (
 
 import json
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 
-from zanataclient.publicanutil import PublicanUtility
+from zanataclient.publicanutil import PublicanUtility, TemplateSkeleton, dumps_with_array
 
 sys.path.insert(0, os.path.abspath(__file__ + "/../../.."))
 
@@ -41,6 +43,54 @@ class PublicanUtilityTest(unittest.TestCase):
         filename = self.publican.strip_path("./testfiles/pot/test.pot", "./testfiles/pot", '.pot')
         self.assertEqual(filename, "test")
 
+    def test_untranslated(self):
+        self.assertTrue(self.publican.is_untranslated({'resId': 'a', 'state': 'New', 'content': u''}))
+        self.assertTrue(self.publican.is_untranslated({'resId': 'b', 'state': 'New', 'contents': [u'', u'']}))
+        self.assertFalse(self.publican.is_untranslated({'resId': 'c', 'state': 'New', 'contents': [u'c', u'']}),
+                         'partly translated plural is pushed')
+        self.assertFalse(self.publican.is_untranslated({'resId': 'd', 'state': 'Approved', 'content': u'd'}))
+
+    def test_obsolete_entries(self):
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'test.po')
+            with open(path, 'w') as po:
+                po.write('msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n\n'
+                         'msgid "a"\nmsgstr "A"\n\n#~ msgid "a"\n#~ msgstr "old A"\n\n#~ msgid "b"\n#~ msgstr "B"\n')
+            targets = json.loads(self.publican.pofile_to_json(path))['textFlowTargets']
+            self.assertEqual([target['content'] for target in targets], ['A'])
+        finally:
+            shutil.rmtree(folder)
+
+    def test_dumps_with_array(self):
+        items = [{'resId': 'a', 'content': u'"textFlowTargets": []'}, {'resId': 'b', 'contents': [u'b', u'\u00e9']}]
+        obj = {'links': [], 'extensions': [{'comment': '"textFlowTargets": []'}], 'textFlowTargets': []}
+        expected = json.dumps(dict(obj, textFlowTargets=items))
+        self.assertEqual(dumps_with_array(obj, 'textFlowTargets', iter(items)), expected)
+        self.assertEqual(dumps_with_array(obj, 'textFlowTargets', []), json.dumps(obj))
+
+    def test_template_skeleton(self):
+        template = json.loads(self.publican.potfile_to_json("./testfiles/test_plural.po", "./testfiles")[0])
+        translations = json.loads(self.publican.pofile_to_json("./testfiles/test_plural.po"))
+        for target in translations['textFlowTargets']:
+            target['state'] = 'NeedReview'
+        skeleton = TemplateSkeleton(template)
+        folder = tempfile.mkdtemp()
+        try:
+            # a locale with fuzzy translations, then one without any, from the same skeleton
+            for locale, content in (('pl', translations), ('de', {})):
+                paths = [os.path.join(folder, locale + name) for name in ('-json.po', '-skeleton.po')]
+                self.publican.save_to_pofile(paths[0], content, template, True, locale, 'test')
+                self.publican.save_to_pofile(paths[1], content, skeleton, True, locale, 'test')
+                with open(paths[0]) as loaded, open(paths[1]) as shared:
+                    self.assertEqual(loaded.read(), shared.read(), locale)
+                self.assertFalse(self.publican.save_to_pofile(paths[1], content, skeleton, True, locale, 'test'),
+                                 'unchanged')
+            with open(os.path.join(folder, 'de-skeleton.po')) as untranslated:
+                self.assertFalse('fuzzy' in untranslated.read())
+        finally:
+            shutil.rmtree(folder)
+
     """
     def test_potfiletojson(self):
         body, filename = self.publican.potfile_to_json("./testfiles/pot/test.pot", "./testfiles/pot")
@@ -21,6 +21,7 @@
 # Boston, MA  02110-1301, USA.
 
 import getopt
+import importlib
 import os
 import signal
 import string
@@ -28,26 +29,12 @@ import subprocess
 import sys
 from functools import wraps
 
-from .cmdbase import (
-    CreateProject,
-    CreateVersion,
-    GlossaryDelete,
-    GlossaryPush,
-    ListProjects,
-    ProjectInfo,
-    Stats,
-    VersionInfo,
-)
 from .command import (
     handle_program,
     makeHandler,
     parse_command_line,
     strip_docstring,
 )
-from .context import ProjectContext
-from .initcmd import ZanataInit
-from .pullcmd import GenericPull
-from .pushcmd import GenericPush, PoPush, PublicanPush
 from .zanatalib.logger import Logger
 
 
@@ -258,6 +245,12 @@ option_sets = {
             long=['--noskeletons'],
         ),
     ],
+    'nowrap': [
+        dict(
+            type='command',
+            long=['--no-wrap'],
+        ),
+    ],
     'pushtransonly': [
         dict(
             type='command',
@@ -302,7 +295,57 @@ option_sets = {
             long=['--docid'],
             metavar='DOCID',
         ),
-    ]
+    ],
+    'jobs': [
+        dict(
+            type='command',
+            long=['--jobs'],
+            metavar='JOBS',
+        ),
+    ],
+    'convertjobs': [
+        dict(
+            type='command',
+            long=['--convert-jobs'],
+            metavar='CONVERT_JOBS',
+        ),
+    ],
+    'delta': [
+        dict(
+            type='command',
+            long=['--delta'],
+        ),
+    ],
+    'incremental': [
+        dict(
+            type='command',
+            long=['--incremental'],
+        ),
+    ],
+    'sparse': [
+        dict(
+            type='command',
+            long=['--sparse'],
+        ),
+    ],
+    'gzip': [
+        dict(
+            type='command',
+            long=['--gzip'],
+        ),
+    ],
+    'httpcache': [
+        dict(
+            type='command',
+            long=['--http-cache'],
+        ),
+    ],
+    'refreshcontext': [
+        dict(
+            type='command',
+            long=['--refresh-context'],
+        ),
+    ],
 }
 
 subcmds = {
@@ -388,16 +431,36 @@ def process_command(args):
 #################################
 
 
+def load_class(path):
+    """
+    Imports a class of the client, e.g. pushcmd.PoPush, once it is used,
+    so that e.g. zanata help does not load the modules of every command
+    """
+    module_name, class_name = path.rsplit('.', 1)
+    module = importlib.import_module('.' + module_name, __name__.rpartition('.')[0])
+    return getattr(module, class_name)
+
+
 def command(cmd, auth_req, mode=None):
+    """
+    :param cmd: class of the command, as module.Class
+    """
     def command_decorator(func):
         @wraps(func)
         def run_func(command_options, args, project_type=None):
-            context_data = ProjectContext(command_options, mode).get_context_data()
+            command_class = load_class(cmd)
+            context = load_class('context.ProjectContext')(
+                command_options, mode, prefetch_project=command_class.verifies_project,
+                remote_keys=command_class.context_keys, lazy_keys=command_class.lazy_context_keys
+            )
+            context_data = context.get_context_data()
             context_data['auth_req'] = auth_req
+            # the command reuses the responses read for the context
+            context_data['request_memo'] = context.memo
             if project_type:
                 context_data['project_type'] = project_type
                 context_data['publican_po'] = True
-            command = cmd(args, context_data)
+            command = command_class(args, context_data)
             command.run()
         return run_func
     return command_decorator
@@ -410,7 +473,7 @@ def help_info(command_options, args):
         print(usage)
 
 
-@command(ListProjects, False)
+@command('cmdbase.ListProjects', False)
 def list_project(command_options, args):
     """
     Usage: zanata list [OPTIONS]
@@ -424,7 +487,7 @@ def list_project(command_options, args):
     pass
 
 
-@command(ProjectInfo, False)
+@command('cmdbase.ProjectInfo', False)
 def project_info(command_options, args):
     """
     Usage: zanata project info [OPTIONS]
@@ -438,7 +501,7 @@ def project_info(command_options, args):
     pass
 
 
-@command(VersionInfo, False)
+@command('cmdbase.VersionInfo', False)
 def version_info(command_options, args):
     """
     Usage: zanata version info [OPTIONS]
@@ -453,7 +516,7 @@ def version_info(command_options, args):
     pass
 
 
-@command(CreateProject, True)
+@command('cmdbase.CreateProject', True)
 def create_project(command_options, args):
     """
     Usage: zanata project create [PROJECT_ID] [OPTIONS]
@@ -471,7 +534,7 @@ def create_project(command_options, args):
     pass
 
 
-@command(CreateVersion, True)
+@command('cmdbase.CreateVersion', True)
 def create_version(command_options, args):
     """
     Usage: zanata version create [VERSION_ID] [OPTIONS]
@@ -500,17 +563,21 @@ def po_pull(command_options, args):
         --dir               : output folder for po files (same as --transdir)
         --disable-ssl-cert  : disable ssl certificate validation
         --dstdir            : output folder (same as --transdir option)
+        --http-cache        : revalidate the files pulled before instead of downloading them again
+        --jobs              : number of files to pull in parallel (default 1)
         --lang              : language list
+        --no-wrap           : do not wrap the long lines of the po files
         --noskeleton        : omit po files when translations not found
         --project-id        : id of the project (defaults to zanata.xml value)
         --project-version   : id of the version (defaults to zanata.xml value)
+        --refresh-context   : fetch the project context from the server again instead of the cached one
         --transdir          : output folder for po files
         --username          : user name (defaults to zanata.ini value)
     """
     pull(command_options, args, "gettext")
 
 
-@command(PoPush, True)
+@command('pushcmd.PoPush', True)
 def po_push(command_options, args):
     """
     Usage: zanata po push [OPTIONS] {documents}
@@ -519,17 +586,24 @@ def po_push(command_options, args):
 
     Options:
         --apikey            : api key of user (defaults to zanata.ini value)
+        --convert-jobs      : number of processes converting the files to JSON (default: number of CPUs)
         --copytrans         : ask server to copy translations from other versions
+        --delta             : push only the translations changed since the last push (merge auto)
         --dir               : the path of the folder that contains pot files and po files,
                                 no need to specify --srcdir and --transdir if --dir option specified
         --disable-ssl-cert  : disable ssl certificate validation
+        --gzip              : send the documents gzip compressed
         --import-po         : push local translations to server
+        --incremental       : skip the source documents unchanged since the last push
+        --jobs              : number of files to push in parallel (default 1)
         --lang              : language list
         --merge             : override merge algorithm: auto (default) or import
         --no-copytrans      : no effect (kept for backward compatibility). Incompatible
                                 with --copytrans option.
         --project-id        : id of the project (defaults to zanata.xml value)
         --project-version   : id of the version (defaults to zanata.xml value)
+        --refresh-context   : fetch the project context from the server again instead of the cached one
+        --sparse            : leave out the untranslated entries (merge auto)
         --srcdir            : the path of the po folder (e.g. ./po)
         --srcfile           : the path of the source file
         --transdir          : the path of the folder that contains po files (e.g. ./po)
@@ -550,17 +624,21 @@ def publican_pull(command_options, args):
         --dir               : output folder (same as --transdir option)
         --disable-ssl-cert  : disable ssl certificate validation
         --dstdir            : output folder (same as --transdir option)
+        --http-cache        : revalidate the files pulled before instead of downloading them again
+        --jobs              : number of files to pull in parallel (default 1)
         --lang              : language list
+        --no-wrap           : do not wrap the long lines of the po files
         --noskeleton        : omit po files when translations not found
         --project-id        : id of the project (defaults to zanata.xml value)
         --project-version   : id of the version (defaults to zanata.xml value)
+        --refresh-context   : fetch the project context from the server again instead of the cached one
         --transdir          : translations will be written to this folder (one sub-folder per locale)
         --username          : user name (defaults to zanata.ini value)
     """
     pull(command_options, args, "podir")
 
 
-@command(PublicanPush, True)
+@command('pushcmd.PublicanPush', True)
 def publican_push(command_options, args):
     """
     Usage: zanata publican push OPTIONS {documents}
@@ -571,17 +649,24 @@ def publican_push(command_options, args):
 
     Options:
         --apikey            : api key of user (defaults to zanata.ini value)
+        --convert-jobs      : number of processes converting the files to JSON (default: number of CPUs)
         --copytrans         : ask server to copy translations from other versions
+        --delta             : push only the translations changed since the last push (merge auto)
         --dir               : the path of the folder that contains pot folder and locale folders,
                                 no need to specify --srcdir and --transdir if --dir option specified
         --disable-ssl-cert  : disable ssl certificate validation
+        --gzip              : send the documents gzip compressed
         --import-po         : push local translations to server
+        --incremental       : skip the source documents unchanged since the last push
+        --jobs              : number of files to push in parallel (default 1)
         --lang              : language list
         --merge             : override merge algorithm: auto (default) or import
         --no-copytrans      : no effect (kept for backward compatibility).
                                 Incompatible with --copytrans option.
         --project-id        : id of the project (defaults to zanata.xml value)
         --project-version   : id of the version (defaults to zanata.xml value)
+        --refresh-context   : fetch the project context from the server again instead of the cached one
+        --sparse            : leave out the untranslated entries (merge auto)
         --srcdir            : the path of the pot folder (e.g. ./pot)
         --transdir          : the path of the folder that contain locale folders (e.g. ./myproject)
         --username          : user name (defaults to zanata.ini value)
@@ -590,7 +675,7 @@ def publican_push(command_options, args):
     pass
 
 
-@command(GenericPush, True)
+@command('pushcmd.GenericPush', True)
 def push(command_options, args):
     """
     Usage: zanata push OPTIONS {documents}
@@ -601,7 +686,12 @@ def push(command_options, args):
 
     Options:
         --apikey            : api key of user (defaults to zanata.ini value)
+        --convert-jobs      : number of processes converting the files to JSON (default: number of CPUs)
+        --delta             : push only the translations changed since the last push (merge auto)
         --disable-ssl-cert  : disable ssl certificate validation
+        --gzip              : send the documents gzip compressed
+        --incremental       : skip the source documents unchanged since the last push
+        --jobs              : number of files to push in parallel (default 1)
         --lang              : language list (defaults to zanata.xml locales)
         --merge             : override merge algorithm: auto (default) or import
         --no-copytrans      : prevent server from copying translations from other versions
@@ -613,6 +703,8 @@ def push(command_options, args):
         --push-type         : source: push source document only,
                                 target: push translations only, same as push-trans-only
                                 both: push source and translations together, same as push-trans
+        --refresh-context   : fetch the project context from the server again instead of the cached one
+        --sparse            : leave out the untranslated entries (merge auto)
         --srcdir            : the path of the pot folder (e.g. ./pot)
         --srcfile           : the path of the pot file (gettext project only)
         --transdir          : the path of the folder that contain locale folders (e.g. ./myproject)
@@ -622,7 +714,7 @@ def push(command_options, args):
     pass
 
 
-@command(GenericPull, False)
+@command('pullcmd.GenericPull', False)
 def pull(command_options, args, project_type=None):
     """
     Usage: zanata pull [OPTIONS] {documents} {lang}
@@ -632,20 +724,24 @@ def pull(command_options, args, project_type=None):
     Options:
         --apikey            : api key of user (defaults to zanata.ini value)
         --disable-ssl-cert  : disable ssl certificate validation
+        --http-cache        : revalidate the files pulled before instead of downloading them again
+        --jobs              : number of files to pull in parallel (default 1)
         --lang              : language list (defaults to zanata.xml locales)
         --min-doc-percent   : Only pull translation documents that have at least this percentage of messages translated.
                                 Accepts an integer from 0 to 100.
+        --no-wrap           : do not wrap the long lines of the po files
         --noskeletons       : omit po files when translations not found
         --project-id        : id of the project (defaults to zanata.xml value)
         --project-type      : project type (gettext or podir)
         --project-version   : id of the version (defaults to zanata.xml value)
+        --refresh-context   : fetch the project context from the server again instead of the cached one
         --transdir          : translations will be written to this folder
         --username          : user name (defaults to zanata.ini value)
     """
     pass
 
 
-@command(GlossaryPush, True)
+@command('cmdbase.GlossaryPush', True)
 def glossary_push(command_options, args):
     """
     Usage: zanata glossary push [OPTIONS] GLOSSARY_POFILE
@@ -665,7 +761,7 @@ def glossary_push(command_options, args):
     pass
 
 
-@command(GlossaryDelete, True)
+@command('cmdbase.GlossaryDelete', True)
 def glossary_delete(command_options, args):
     """
     Usage: zanata glossary delete [OPTIONS]
@@ -682,7 +778,7 @@ def glossary_delete(command_options, args):
     pass
 
 
-@command(Stats, False)
+@command('cmdbase.Stats', False)
 def stats(command_options, args):
     """
     Usage: zanata stats [OPTIONS]
@@ -706,7 +802,7 @@ def stats(command_options, args):
     pass
 
 
-@command(ZanataInit, False, 'init')
+@command('initcmd.ZanataInit', False, 'init')
 def init(command_options, args):
     """
     Usage: zanata init [OPTIONS]
@@ -22,9 +22,11 @@
 
 import os
 import sys
+import threading
 
 from .csvconverter import CSVConverter
-from .publicanutil import PublicanUtility
+from .powriter import WRAPWIDTH
+from .publicanutil import PublicanUtility, TemplateSkeleton, convert_template, convert_translation
 from .zanatalib.error import (
     BadRequestBodyException,
     InternalServerError,
@@ -37,6 +39,7 @@ from .zanatalib.error import (
     UnexpectedStatusException,
     ZanataException,
 )
+from .zanatalib.jobpool import JobPool, ProcessPool, wait_interruptibly
 from .zanatalib.logger import Logger
 from .zanatalib.projectutils import FileMappingRule, Iteration, Project, Stats
 from .zanatalib.resource import ZanataResource
@@ -49,13 +52,16 @@ except NameError:
 
 
 class ZanataCommand:
-    def __init__(self, url, http_headers):
+    def __init__(self, url, http_headers, **client_options):
         self.log = Logger()
-        self.zanata_resource = ZanataResource(url, http_headers)
+        self.zanata_resource = ZanataResource(url, http_headers, **client_options)
 
     def disable_ssl_cert_validation(self):
         self.zanata_resource.disable_ssl_cert_validation()
 
+    def log_transfer(self):
+        self.log.info("Transferred: %s" % self.zanata_resource.restclient.transfer.summary())
+
     ##############################################
     #
     # Commands for interaction with zanata server
@@ -130,8 +136,10 @@ class ZanataCommand:
             result = self.zanata_resource.documents.update_template(project_id, iteration_id, request_name, body, copytrans)
             if result:
                 self.log.info("Successfully updated template %s on the server" % filename)
+            return True
         except ZanataException as e:
             self.log.error(str(e))
+            return False
 
     def commit_translation(self, project_id, iteration_id, request_name, pofile, lang, body, merge):
         try:
@@ -139,8 +147,20 @@ class ZanataCommand:
             if result:
                 self.log.warn(result)
             self.log.info("Successfully pushed translation %s to the Zanata server" % pofile)
+            return True
         except ZanataException as e:
             self.log.error(str(e))
+            return False
+
+    def commit_delta(self, project_id, iteration_id, request_name, pofile, lang, body, merge, delta=None):
+        """
+        Pushes the translations left in body by delta, and records them once accepted
+        """
+        if delta and not delta.changed:
+            self.log.info("No translation changed in %s since the last push" % pofile)
+            return
+        if self.commit_translation(project_id, iteration_id, request_name, pofile, lang, body, merge) and delta:
+            delta.save()
 
     def del_server_content(self, tmlfolder, project_id, iteration_id, push_files, force, project_type):
         # Get the file list of this version of project
@@ -300,11 +320,19 @@ class ZanataCommand:
         except ZanataException as e:
             self.log.error(str(e))
 
-    def import_po(self, potfile, trans_folder, project_id, iteration_id, lang_list, locale_map,
-                  merge, project_type, file_mapping_rules):
+    def translation_files(self, potfile, trans_folder, lang_list, locale_map, project_type, file_mapping_rules):
+        """
+        The po files of the translations of one document
+        @return: list of (local_lang, remote_lang, pofile)
+        """
         sub_dir = ""
-        publicanutil = PublicanUtility()
+        if '/' in potfile:
+            name = potfile.split('/')[-1]
+            sub_dir = potfile[0:potfile.rfind('/')]
+        else:
+            name = potfile
 
+        translations = []
         for local_lang in lang_list:
             if not locale_map:
                 remote_lang = local_lang
@@ -314,37 +342,42 @@ class ZanataCommand:
                 else:
                     remote_lang = local_lang
 
-            if '/' in potfile:
-                name = potfile.split('/')[-1]
-                request_name = potfile.replace('/', ',')
-                sub_dir = potfile[0:potfile.rfind('/')]
-            else:
-                name = request_name = potfile
-
-            self.log.info("Pushing %s translation for %s to server:" % (local_lang, potfile))
-
             pofile = FileMappingRule(
                 project_type, local_lang, 'po', file_mapping_rules, **{
                     'trans_folder': trans_folder, 'path': sub_dir, 'filename': name, 'remote_filepath': potfile,
                 }
             ).translation_path
+            translations.append((local_lang, remote_lang, pofile))
+        return translations
 
-            if not os.path.isfile(pofile):
-                self.log.error("Can not find the %s translation for %s" % (local_lang, potfile))
-                continue
+    def push_trans_command(self, transfolder, project_id, iteration_id, lang_list, locale_map,
+                           project_type, merge, file_mapping_rules, jobs=1, state=None, sparse=False,
+                           convert_jobs=1):
+        """
+        Push the translations of all the documents on the server
+        @param jobs: number of translations pushed in parallel
+        @param state: TranslationState, to push only the translations changed since the last push
+        @param sparse: leave out the untranslated entries
+        @param convert_jobs: number of processes converting the po files to JSON, they
+                             convert ahead of the uploads up to that many bodies
+        """
+        filelist = ""
+        pool = JobPool(jobs)
 
-            body = publicanutil.pofile_to_json(pofile)
+        def push_translation(filename, local_lang, remote_lang, pofile, converted):
+            body, delta = converted.get()
+            if not pofile or not os.path.isfile(pofile):
+                self.log.error("Can not find the %s translation for %s" % (local_lang, filename))
+                return
+            else:
+                self.log.info("Pushing the %s translation of %s to server:" % (local_lang, filename))
 
             if not body:
-                self.log.error("No content or all entries are obsolete in %s" % pofile)
+                self.log.error("No content or all entries are obsolete in %s" % os.path.dirname(filename))
                 sys.exit(1)
 
-            self.commit_translation(project_id, iteration_id, request_name, pofile, remote_lang, body, merge)
-
-    def push_trans_command(self, transfolder, project_id, iteration_id, lang_list, locale_map,
-                           project_type, merge, file_mapping_rules):
-        filelist = ""
-        publicanutil = PublicanUtility()
+            self.commit_delta(project_id, iteration_id, filename.replace('/', ','), pofile, remote_lang, body,
+                              merge, delta)
 
         try:
             filelist = self.zanata_resource.documents.get_file_list(project_id, iteration_id)
@@ -355,6 +388,7 @@ class ZanataCommand:
             self.log.error("There is no source files on the server, please push source files first")
             sys.exit(1)
 
+        translations = []
         for local_lang in lang_list:
             if not locale_map:
                 remote_lang = local_lang
@@ -364,8 +398,6 @@ class ZanataCommand:
                 else:
                     remote_lang = local_lang
 
-            self.log.info("Pushing %s translation for %s to server:" % (local_lang, project_id))
-
             for filename in filelist:
                 sub_dir = ''
                 if '/' in filename:
@@ -379,77 +411,208 @@ class ZanataCommand:
                         'trans_folder': transfolder, 'path': sub_dir, 'filename': name, 'remote_filepath': filename,
                     }
                 ).translation_path
+                translations.append((filename, local_lang, remote_lang, pofile))
 
-                if not pofile or not os.path.isfile(pofile):
-                    self.log.error("Can not find the %s translation for %s" % (local_lang, filename))
-                    continue
-                else:
-                    self.log.info("Pushing the %s translation of %s to server:" % (local_lang, filename))
-
-                request_name = filename.replace('/', ',')
-
-                body = publicanutil.pofile_to_json(pofile)
-
-                if not body:
-                    self.log.error("No content or all entries are obsolete in %s" % sub_dir)
-                    sys.exit(1)
-
-                self.commit_translation(project_id, iteration_id, request_name, pofile, remote_lang, body, merge)
+        # forked before the threads of the pool start
+        converter = ProcessPool(min(convert_jobs, len(translations)))
+        try:
+            conversions = converter.imap(convert_translation, (
+                (pofile, state and state.delta(filename.replace('/', ','), remote_lang), sparse)
+                for filename, local_lang, remote_lang, pofile in translations
+            ), converter.processes, pool)
+            previous_lang = None
+            for filename, local_lang, remote_lang, pofile in translations:
+                converted = next(conversions, None)
+                if converted is None:
+                    # the pool stopped
+                    break
+                if local_lang != previous_lang:
+                    self.log.info("Pushing %s translation for %s to server:" % (local_lang, project_id))
+                    previous_lang = local_lang
+                pool.submit(push_translation, filename, local_lang, remote_lang, pofile, converted)
+            pool.join()
+        finally:
+            converter.terminate()
+        self.log_transfer()
 
     def push_command(self, file_list, srcfolder, project_id, iteration_id, copytrans, plural_support=False,
-                     import_param=None, file_mapping_rules=None):
+                     import_param=None, file_mapping_rules=None, jobs=1, manifest=None, convert_jobs=1):
         """
         Push the content of publican files to a Project version on Zanata server
         @param args: name of the publican file
+        @param jobs: number of files pushed in parallel, for templates and translations
+        @param manifest: PushManifest recording the templates pushed, and skipping the unchanged ones
+        @param convert_jobs: number of processes converting the pot and po files to JSON, they
+                             convert ahead of the uploads up to that many templates
         """
-        publicanutil = PublicanUtility()
+        pool = JobPool(jobs)
+        files = len(file_list) * (1 + len(import_param['lang_list']) if import_param else 1)
+        # forked before the threads of the pool start
+        converter = ProcessPool(min(convert_jobs, files))
 
-        for filepath in file_list:
+        # the template pushes after which the translations of the document follow
+        pushed = set()
+
+        def push_source(filepath, converted):
             self.log.info("Pushing the content of %s to server:" % filepath)
-            plural_exist = publicanutil.check_plural(filepath)
+            plural_exist, body, filename = converted.get()
             if plural_exist and not plural_support:
                 self.log.error("The plural is only supported in zanata server >= 1.6, this file will be ignored")
-                break
-            body, filename = publicanutil.potfile_to_json(filepath, srcfolder)
+                pool.stop()
+                return False
+            digest = manifest and manifest.digest(body)
             try:
-                result = self.update_template(project_id, iteration_id, filename, body, copytrans)
-                if result:
-                    self.log.info("Successfully pushed %s to the server" % filepath)
+                if manifest and manifest.skips(filename, digest):
+                    self.log.info("Skipping %s, unchanged since the last push" % filepath)
+                elif self.update_template(project_id, iteration_id, filename, body, copytrans) and manifest:
+                    manifest.set_pushed(filename, digest)
             except UnAuthorizedException as e:
                 self.log.error(str(e))
-                break
+                pool.stop()
+                return False
             except BadRequestBodyException as e:
                 self.log.error(str(e))
-                continue
+                return False
             except UnexpectedStatusException as e:
                 self.log.error(str(e))
-                continue
+                return False
             except InternalServerError as e:
                 self.log.error(str(e))
                 sys.exit(1)
+            return True
+
+        def push_template(filepath, template_done, converted):
+            try:
+                if push_source(filepath, converted):
+                    pushed.add(template_done)
+            finally:
+                template_done.set()
+
+        def push_translation(filename, local_lang, remote_lang, pofile, template_done, converted):
+            # the template job was queued before, it is running or over
+            wait_interruptibly(template_done)
+            if template_done not in pushed:
+                converted.discard()
+                return
+
+            self.log.info("Pushing %s translation for %s to server:" % (local_lang, filename))
+            body, delta = converted.get()
 
-            if import_param:
-                merge = import_param['merge']
-                lang_list = import_param['lang_list']
-                project_type = import_param['project_type']
-                transdir = import_param['transdir']
-                locale_map = import_param['locale_map']
+            if not os.path.isfile(pofile):
+                self.log.error("Can not find the %s translation for %s" % (local_lang, filename))
+                return
+
+            if not body:
+                self.log.error("No content or all entries are obsolete in %s" % pofile)
+                sys.exit(1)
 
-                self.import_po(filename, transdir, project_id, iteration_id, lang_list, locale_map,
-                               merge, project_type, file_mapping_rules)
+            self.commit_delta(project_id, iteration_id, filename.replace('/', ','), pofile, remote_lang, body,
+                              import_param['merge'], delta)
 
-    def pull_command(self, locale_map, project_id, iteration_id, filedict, output, project_type, skeletons, mapping_rules):
+        # each template followed by its translations, converted in that order
+        pushes = []
+        publicanutil = PublicanUtility()
+        for filepath in file_list:
+            template_done = threading.Event()
+            pushes.append((push_template, (filepath, template_done),
+                           convert_template, (filepath, srcfolder, plural_support)))
+            if not import_param:
+                continue
+            filename = publicanutil.strip_path(filepath, srcfolder, '.pot')
+            for local_lang, remote_lang, pofile in self.translation_files(
+                    filename, import_param['transdir'], import_param['lang_list'], import_param['locale_map'],
+                    import_param['project_type'], file_mapping_rules):
+                pushes.append((push_translation, (filename, local_lang, remote_lang, pofile, template_done),
+                               convert_translation, (pofile, remote_lang, filename)))
+
+        def conversion_calls():
+            state = import_param and import_param.get('state')
+            sparse = import_param and import_param.get('sparse')
+            for push, args, convert, convert_args in pushes:
+                if convert is convert_translation:
+                    pofile, remote_lang, filename = convert_args
+                    # the delta reads its file, only when converted
+                    convert_args = (pofile, state and state.delta(filename.replace('/', ','), remote_lang), sparse)
+                yield convert, convert_args
+
+        try:
+            conversions = converter.imap_calls(conversion_calls(), converter.processes, pool)
+            for push, args, convert, convert_args in pushes:
+                converted = next(conversions, None)
+                if converted is None:
+                    # the pool stopped
+                    break
+                pool.submit(push, *(args + (converted,)))
+            pool.join()
+        finally:
+            converter.terminate()
+            if manifest:
+                manifest.save()
+        self.log_transfer()
+
+    def pull_command(self, locale_map, project_id, iteration_id, filedict, output, project_type, skeletons, mapping_rules,
+                     jobs=1, no_wrap=False):
         """
         Retrieve the content of documents in a Project version from Zanata server. If the name of publican
         file is specified, the content of that file will be pulled from server. Otherwise, all the document of that
         Project iteration will be pulled from server.
         @param args: the name of publican file
+        @param jobs: number of files pulled in parallel, the locales of a document are fetched
+                     before the templates of the next documents
+        @param no_wrap: do not wrap the long lines of the po files
         """
         publicanutil = PublicanUtility()
-        # if file no specified, retrieve all the files of project
-        for file_item, lang_list in filedict.items():
+        wrapwidth = 0 if no_wrap else WRAPWIDTH
+        pool = JobPool(jobs)
+        # documents whose remaining locales are skipped
+        cancelled = set()
+        # 'written', 'unchanged' or 'skipped' for each po file
+        outcomes = []
+
+        def pull_translation(file_item, name, folder, request_name, pot, local_lang):
+            if file_item in cancelled:
+                outcomes.append('skipped')
+                return
+
+            if not locale_map:
+                remote_lang = local_lang
+            else:
+                if local_lang in locale_map:
+                    remote_lang = locale_map[local_lang]
+                else:
+                    remote_lang = local_lang
+
+            file_mapped_path = FileMappingRule(
+                project_type, local_lang, 'po', mapping_rules, **{
+                    'trans_folder': output, 'path': folder, 'filename': name, 'remote_filepath': file_item,
+                }
+            ).translation_path
+
+            self.log.info("Retrieving %s translation from server: " % local_lang)
+
+            outcome = 'skipped'
+            try:
+                result = self.zanata_resource.documents.retrieve_translation(remote_lang, project_id, iteration_id, request_name, skeletons)
+                written = publicanutil.save_to_pofile(file_mapped_path, result, pot, skeletons, local_lang, name, wrapwidth)
+                if written is not None:
+                    outcome = 'written' if written else 'unchanged'
+            except UnAuthorizedException as e:
+                self.log.error(str(e))
+                cancelled.add(file_item)
+            except UnAvaliableResourceException as e:
+                self.log.info("There is no %s translation for %s" % (local_lang, name))
+            except BadRequestBodyException as e:
+                self.log.error(str(e))
+            except UnexpectedStatusException as e:
+                self.log.error(str(e))
+            except InternalServerError as e:
+                self.log.error(str(e))
+                sys.exit(1)
+            finally:
+                outcomes.append(outcome)
+
+        def pull_document(file_item, lang_list):
             pot = ""
-            result = ""
             folder = ""
 
             if '/' in file_item:
@@ -465,50 +628,35 @@ class ZanataCommand:
                 pot = self.zanata_resource.documents.retrieve_template(project_id, iteration_id, request_name)
             except UnAuthorizedException as e:
                 self.log.error(str(e))
-                break
+                pool.stop()
+                return
             except UnAvaliableResourceException as e:
                 self.log.error("Can't find pot file for %s on server" % name)
-                break
+                pool.stop()
+                return
             except UnexpectedStatusException as e:
                 self.log.error(str(e))
-                break
+                pool.stop()
+                return
             except InternalServerError as e:
                 self.log.error(str(e))
                 sys.exit(1)
 
+            # read once for the po files of all the locales
+            pot = TemplateSkeleton(pot)
+            # the locales go ahead of the templates still queued, those are
+            # fetched by the workers which have no locale left to pull
             for local_lang in lang_list:
-                if not locale_map:
-                    remote_lang = local_lang
-                else:
-                    if local_lang in locale_map:
-                        remote_lang = locale_map[local_lang]
-                    else:
-                        remote_lang = local_lang
+                pool.submit_next(pull_translation, file_item, name, folder, request_name, pot, local_lang)
 
-                file_mapped_path = FileMappingRule(
-                    project_type, local_lang, 'po', mapping_rules, **{
-                        'trans_folder': output, 'path': folder, 'filename': name, 'remote_filepath': file_item,
-                    }
-                ).translation_path
-
-                self.log.info("Retrieving %s translation from server: " % local_lang)
-
-                try:
-                    result = self.zanata_resource.documents.retrieve_translation(remote_lang, project_id, iteration_id, request_name, skeletons)
-                    publicanutil.save_to_pofile(file_mapped_path, result, pot, skeletons, local_lang, name)
-                except UnAuthorizedException as e:
-                    self.log.error(str(e))
-                    break
-                except UnAvaliableResourceException as e:
-                    self.log.info("There is no %s translation for %s" % (local_lang, name))
-                except BadRequestBodyException as e:
-                    self.log.error(str(e))
-                    continue
-                except UnexpectedStatusException as e:
-                    self.log.error(str(e))
-                except InternalServerError as e:
-                    self.log.error(str(e))
-                    sys.exit(1)
+        # if file no specified, retrieve all the files of project
+        for file_item, lang_list in filedict.items():
+            pool.submit(pull_document, file_item, lang_list)
+        pool.join()
+        self.log.info("Po files: %d written, %d unchanged, %d skipped" % tuple(
+            outcomes.count(outcome) for outcome in ('written', 'unchanged', 'skipped')
+        ))
+        self.log_transfer()
 
     def poglossary_push(self, path, lang, sourcecomments):
         i = 0
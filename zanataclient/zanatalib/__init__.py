@@ -20,10 +20,22 @@
 # Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
 # Boston, MA  02110-1301, USA.
 
-from .docservice import *
-from .error import *
-from .logger import *
-from .projectservice import *
-from .projectutils import *
-from .resource import *
-from .versionservice import *
+from .lazy import lazy_package
+
+
+# imported when first used, see LazyPackage
+lazy_package(__name__, (
+    ('asyncresource', ("AsyncZanataResource",)),
+    ('docservice', ("DocumentService",)),
+    ('error', ("NoSuchProjectException", "InvalidOptionException", "NoSuchFileException",
+               "UnAuthorizedException", "BadRequestException", "ProjectExistException",
+               "UnAvaliableResourceException", "UnAvaliablePOTException", "BadRequestBodyException",
+               "SameNameDocumentException", "InternalServerError", "NotAllowedException",
+               "UnavailableServiceError", "ForbiddenException", "UnexpectedStatusException")),
+    ('jobpool', ("Future", "FutureTimeoutError", "JobPool", "ProcessPool")),
+    ('logger', ("Logger",)),
+    ('projectservice', ("ProjectService",)),
+    ('projectutils', ("Project", "Iteration", "Stats", "ToolBox", "FileMappingRule")),
+    ('resource', ("ZanataResource",)),
+    ('versionservice', ("VersionService",)),
+))
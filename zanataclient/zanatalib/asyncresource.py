@@ -0,0 +1,99 @@
+# vim: set et sts=4 sw=4:
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+
+__all__ = (
+    "AsyncZanataResource",
+)
+
+from .jobpool import JobPool
+from .resource import ZanataResource
+from .service import Service
+
+
+DEFAULT_WORKERS = 16
+
+
+class AsyncService(object):
+    """
+    Service whose methods return a Future instead of waiting for the server
+    """
+    def __init__(self, resource, service):
+        self.resource = resource
+        self.service = service
+
+    def __getattr__(self, name):
+        attribute = getattr(self.service, name)
+        if isinstance(attribute, Service):
+            # e.g. the iterations of the projects
+            return AsyncService(self.resource, attribute)
+        if name.startswith('_') or not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            return self.resource.submit(attribute, *args, **kwargs)
+        call.__name__ = name
+        call.__doc__ = attribute.__doc__
+        return call
+
+
+class AsyncZanataResource(object):
+    """
+    ZanataResource whose service calls run on a pool of worker threads and
+    return a Future, so that a caller can keep many requests in flight
+    without blocking on each. The services, their routes and the RestClient
+    with its connection pool are those of ZanataResource.
+    """
+    def __init__(self, base_url, http_headers, workers=DEFAULT_WORKERS, **client_options):
+        """
+        AsyncZanataResource constructor
+        :param workers: number of requests in flight at once, with 1 the calls run in submit
+        :param client_options: options of the shared RestClient, as for ZanataResource
+        """
+        self.workers = max(int(workers), 1)
+        # an idle connection for every worker
+        client_options.setdefault('pool_size', self.workers)
+        self.resource = ZanataResource(base_url, http_headers, **client_options)
+        self._pool = JobPool(self.workers)
+        for name in ('projects', 'documents', 'version', 'glossary', 'stats'):
+            setattr(self, name, AsyncService(self, getattr(self.resource, name)))
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Runs func(*args, **kwargs) on a worker, returns its Future
+        """
+        return self._pool.submit_future(func, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        """
+        Stops the workers once the calls submitted are done
+        """
+        if wait:
+            self._pool.join()
+        else:
+            self._pool.close()
+        self.resource.restclient.pool.clear()
+
+    def disable_ssl_cert_validation(self):
+        self.resource.disable_ssl_cert_validation()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
@@ -45,7 +45,7 @@ class DocumentService(Service):
     def update_template(self, projectid, iterationid, file_id, resources, copytrans):
         ext = "?ext=gettext&ext=comment&copyTrans=%s" % copytrans
         res, content = self.projects.restclient.process_request(
-            'update_template', projectid, iterationid, file_id, body=self._to_unicode(resources),
+            'update_template', projectid, iterationid, file_id, body=self._to_bytes(resources),
             headers=self.http_headers, extension=ext
         )
         return self.messages(res, content)
@@ -63,7 +63,7 @@ class DocumentService(Service):
         """
         ext = "?ext=gettext&ext=comment&copyTrans=%s" % copytrans
         res, content = self.projects.restclient.process_request(
-            'commit_template', projectid, iterationid, body=self._to_unicode(resources),
+            'commit_template', projectid, iterationid, body=self._to_bytes(resources),
             headers=self.http_headers, extension=ext
         )
         return self.messages(res, content)
@@ -99,14 +99,14 @@ class DocumentService(Service):
             ext = ext + "&skeletons=true"
         res, content = self.projects.restclient.process_request(
             'retrieve_translation', projectid, iterationid, file_id, lang,
-            headers=self.http_headers, extension=ext
+            headers=self.http_headers, extension=ext, raw=True
         )
-        return self.messages(res, content)
+        return self.messages(res, content, stream_key='textFlowTargets')
 
     def commit_translation(self, projectid, iterationid, fileid, localeid, resources, merge):
         ext = "?ext=gettext&ext=comment&merge=%s" % merge
         res, content = self.projects.restclient.process_request(
-            'commit_translation', projectid, iterationid, fileid, localeid, body=self._to_unicode(resources),
+            'commit_translation', projectid, iterationid, fileid, localeid, body=self._to_bytes(resources),
             headers=self.http_headers, extension=ext
         )
         return self.messages(res, content)
@@ -37,7 +37,7 @@ class GlossaryService(Service):
 
     def commit_glossary(self, resources):
         res, content = self.restclient.process_request(
-            'commit_glossary', body=self._to_unicode(resources),
+            'commit_glossary', body=self._to_bytes(resources),
             headers=self.http_headers
         )
         return self.messages(res, content)
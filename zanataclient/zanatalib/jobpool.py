@@ -0,0 +1,411 @@
+# vim:set et sts=4 sw=4:
+#
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+
+__all__ = (
+    "Future", "FutureTimeoutError", "JobPool", "ProcessPool",
+)
+
+import collections
+import imp
+import itertools
+import signal
+import sys
+import threading
+import time
+
+from . import logger
+
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+
+# seconds between the checks of a wait, long enough to be idle, short enough for Ctrl+C
+POLL_INTERVAL = 0.05
+
+
+def wait_interruptibly(waitable, timeout=None):
+    """
+    Waits for a threading Event or Thread, a multiprocessing AsyncResult, or
+    a function to return true. It polls, a blocking wait would not let Ctrl+C
+    through on python 2.
+    @param timeout: seconds, None waits as long as it takes
+    @return: True when done, False once timeout is over
+    """
+    if isinstance(waitable, threading.Thread):
+        wait, done = waitable.join, lambda: not waitable.is_alive()
+    elif hasattr(waitable, 'is_set'):
+        wait, done = waitable.wait, waitable.is_set
+    elif hasattr(waitable, 'ready'):
+        wait, done = waitable.wait, waitable.ready
+    else:
+        wait, done = time.sleep, waitable
+    expiry = None if timeout is None else time.time() + timeout
+    while not done():
+        if expiry is None:
+            wait(POLL_INTERVAL)
+            continue
+        remaining = expiry - time.time()
+        if remaining <= 0:
+            return False
+        wait(min(POLL_INTERVAL, remaining))
+    return True
+
+
+class FutureTimeoutError(Exception):
+    pass
+
+
+class Future(object):
+    """
+    Result of a job submitted with JobPool.submit_future
+    """
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def _run(self, func, args, kwargs):
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            self._set(exception=sys.exc_info()[1])
+        else:
+            self._set(result)
+
+    def _set(self, result=None, exception=None):
+        with self._lock:
+            self._result = result
+            self._exception = exception
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def _wait(self, timeout):
+        if not wait_interruptibly(self._done, timeout):
+            raise FutureTimeoutError("The call is not done after %ss" % timeout)
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """
+        Returns what the call returned, or raises what it raised, including
+        the SystemExit of a service on an error status
+        """
+        self._wait(timeout)
+        if self._exception is not None:
+            raise self._exception
+        return self._result
+
+    def exception(self, timeout=None):
+        self._wait(timeout)
+        return self._exception
+
+    def add_done_callback(self, callback):
+        """
+        Calls callback(future) once the call is done, on the worker thread,
+        e.g. to hand the result over to an event loop
+        """
+        with self._lock:
+            if not self._done.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+
+class JobPool(object):
+    """
+    Runs jobs on a bounded number of worker threads.
+
+    An exception, or sys.exit(), raised by a job stops the pool: jobs which
+    have not started yet are dropped and join() raises it in the calling thread.
+    With a single worker the jobs run right away in the calling thread, in the
+    order they are submitted.
+
+    Jobs queued with submit_next() are started before the ones queued with submit().
+    The jobs queued with submit_future() hand what they raise to their Future
+    instead, and do not stop the pool.
+    """
+    def __init__(self, workers=1):
+        self.workers = max(int(workers), 1)
+        self.stopped = False
+        self._error = None
+        self._lock = threading.Lock()
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._threads = []
+
+    def _start(self):
+        # jobs may submit from several threads at once
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work)
+                # daemon, so that Ctrl+C is not held up by running jobs
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+
+    def _work(self):
+        while True:
+            priority, sequence, job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                if not self.stopped:
+                    func, args, kwargs = job
+                    func(*args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    if self._error is None:
+                        self._error = sys.exc_info()[1]
+                self.stopped = True
+            finally:
+                self._queue.task_done()
+
+    def _put(self, priority, job):
+        self._queue.put((priority, next(self._sequence), job))
+
+    def _submit(self, priority, func, args, kwargs):
+        if self.stopped:
+            return
+        if self.workers == 1:
+            func(*args, **kwargs)
+            return
+        self._start()
+        self._put(priority, (func, args, kwargs))
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Schedules func(*args, **kwargs), jobs may submit further jobs
+        """
+        self._submit(1, func, args, kwargs)
+
+    def submit_next(self, func, *args, **kwargs):
+        """
+        Schedules func(*args, **kwargs) ahead of the jobs queued by submit()
+        """
+        self._submit(0, func, args, kwargs)
+
+    def submit_future(self, func, *args, **kwargs):
+        """
+        Schedules func(*args, **kwargs) and returns its Future
+        """
+        future = Future()
+        self._submit(1, future._run, (func, args, kwargs), {})
+        return future
+
+    def stop(self):
+        """
+        Drops the jobs which have not started yet
+        """
+        self.stopped = True
+
+    def join(self):
+        """
+        Waits until all the jobs are done
+        """
+        if not self._threads:
+            return
+        wait_interruptibly(lambda: not self._queue.unfinished_tasks)
+        for thread in self.close():
+            thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        """
+        Ends the workers once the jobs queued are done, without waiting for them
+        @return: the threads of the workers
+        """
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for thread in threads:
+            self._put(2, None)
+        return threads
+
+
+def cpu_count():
+    try:
+        import multiprocessing
+        return multiprocessing.cpu_count()
+    except (ImportError, NotImplementedError):
+        return 1
+
+
+def _init_process():
+    # Ctrl+C is for the parent, which terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # the lock may have been held by a thread of the parent when it forked
+    logger._print_lock = threading.Lock()
+
+
+def _call(func, args):
+    # sys.exit() would end the process and its task would never be done
+    try:
+        return True, func(*args)
+    except SystemExit as e:
+        return False, e.code
+    finally:
+        # before the pool terminates the process
+        sys.stdout.flush()
+
+
+class ProcessResult(object):
+    """
+    Result of a function submitted to a ProcessPool
+    """
+    def __init__(self, pool, func, args, async_result=None):
+        self._pool = pool
+        self._func = func
+        self._args = args
+        self._async_result = async_result
+        self._read = False
+
+    def get(self):
+        """
+        Waits for the result and returns it, raises what the function raised
+        """
+        try:
+            if self._async_result is None:
+                return self._func(*self._args)
+            wait_interruptibly(self._async_result)
+            done, value = self._async_result.get()
+            if not done:
+                sys.exit(value)
+            return value
+        finally:
+            self._set_read()
+
+    def discard(self):
+        """
+        Gives up the result, a function left to run when read does not run at all
+        """
+        self._set_read()
+
+    def _set_read(self):
+        if not self._read:
+            self._read = True
+            self._pool._result_read()
+
+
+class ProcessPool(object):
+    """
+    Runs functions in worker processes, for the CPU bound work which the
+    threads of a JobPool would do one at a time, e.g. converting files to
+    JSON while the threads upload them. The functions and their arguments
+    are pickled, so the functions are module level ones.
+
+    With a single process, or where processes are not available, a function
+    runs in the calling thread when its result is read.
+    """
+    def __init__(self, processes=None):
+        """
+        ProcessPool constructor, the processes start right away, before the
+        threads of the caller if possible, as they are forked
+        @param processes: number of worker processes, defaults to the number of CPUs
+        """
+        self.processes = max(int(cpu_count() if processes is None else processes), 1)
+        self._pool = None
+        self._lock = threading.Lock()
+        # submitted and not read yet
+        self._unread = 0
+        # the pool of python 2 deadlocks while a module is being imported,
+        # as its threads and processes wait for the import lock
+        if self.processes > 1 and imp.lock_held():
+            self.processes = 1
+        if self.processes > 1:
+            try:
+                import multiprocessing
+                # or the processes would print the output buffered so far again
+                sys.stdout.flush()
+                self._pool = multiprocessing.Pool(self.processes, _init_process)
+            except (ImportError, OSError):
+                self.processes = 1
+
+    def _result_read(self):
+        with self._lock:
+            self._unread -= 1
+
+    def submit(self, func, *args):
+        """
+        Starts func(*args)
+        @return: ProcessResult
+        """
+        with self._lock:
+            self._unread += 1
+        if self._pool is None:
+            return ProcessResult(self, func, args)
+        return ProcessResult(self, func, args, self._pool.apply_async(_call, (func, args)))
+
+    def imap(self, func, iterable, ahead=None, jobs=None):
+        """
+        Yields the ProcessResults of func(*args) for the args in iterable, in
+        order, the functions being started ahead of the results read
+        @param ahead: at most that many results are computed and not read yet,
+                      none for no limit
+        @param jobs: JobPool reading the results, no function is started
+                     any more once it is stopped
+        """
+        return self.imap_calls(((func, args) for args in iterable), ahead, jobs)
+
+    def imap_calls(self, calls, ahead=None, jobs=None):
+        """
+        Same as imap, for the (func, args) in calls
+        """
+        pending = collections.deque()
+        for func, args in calls:
+            if self._pool is None:
+                yield self.submit(func, *args)
+                continue
+            while ahead and self._unread >= ahead and not (jobs and jobs.stopped):
+                if pending:
+                    yield pending.popleft()
+                else:
+                    # results read by the other threads of jobs
+                    wait_interruptibly(lambda: self._unread < ahead or (jobs and jobs.stopped))
+            if jobs and jobs.stopped:
+                break
+            pending.append(self.submit(func, *args))
+        while pending:
+            yield pending.popleft()
+
+    def close(self):
+        """
+        Waits for the functions started and ends the processes
+        """
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def terminate(self):
+        """
+        Ends the processes, without waiting for the functions started
+        """
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
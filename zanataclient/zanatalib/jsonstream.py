@@ -0,0 +1,155 @@
+# vim: set et sts=4 sw=4:
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "StreamedObject",
+)
+
+import json
+import re
+
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+class StreamedItems(object):
+    """
+    Items of the streamed array, decoded each time they are iterated
+    """
+    def __init__(self, streamed):
+        self.streamed = streamed
+
+    def __iter__(self):
+        return self.streamed.items()
+
+    def __nonzero__(self):
+        return not self.streamed.is_empty()
+
+    __bool__ = __nonzero__
+
+
+class StreamedObject(object):
+    """
+    JSON object whose array under key, e.g. the textFlowTargets of a large
+    document, is decoded item by item as it is iterated, instead of being
+    decoded as a whole along with the rest of the object. The other members
+    are decoded as usual, and read through get() like those of a dict.
+    """
+    def __init__(self, content, key):
+        """
+        StreamedObject constructor
+        :param content: JSON text, UTF-8 bytes need not be decoded first
+        :param key: member holding the array streamed
+        :raise ValueError: content is not a JSON object
+        """
+        if not isinstance(content, str) and isinstance(content, bytes):
+            content = content.decode('utf-8')
+        self.content = content
+        self.key = key
+        self.fields = {}
+        self._decoder = json.JSONDecoder()
+        # offset of the array value, once the members before it are read
+        self._array = None
+        # offset of the next member, None while the array is not skipped
+        # and once the object is read to the end
+        self._pos = self._expect('{', 0)
+        self._done = False
+        self._scan()
+
+    def _skip(self, pos):
+        return WHITESPACE.match(self.content, pos).end()
+
+    def _expect(self, char, pos):
+        pos = self._skip(pos)
+        if self.content[pos:pos + 1] != char:
+            raise ValueError("Expecting %r at char %d" % (char, pos))
+        return pos + 1
+
+    def _decode(self, pos):
+        return self._decoder.raw_decode(self.content, self._skip(pos))
+
+    def _scan(self):
+        """
+        Reads the members up to the array, or to the end of the object
+        """
+        while self._pos is not None:
+            pos = self._skip(self._pos)
+            if self.content[pos:pos + 1] == '}':
+                self._pos = None
+                self._done = True
+                break
+            if self.fields or self._array is not None:
+                pos = self._expect(',', pos)
+            name, pos = self._decode(pos)
+            pos = self._skip(self._expect(':', pos))
+            if name == self.key:
+                self._array = pos
+                self._pos = None
+                break
+            self.fields[name], self._pos = self._decode(pos)
+
+    def _read_rest(self, pos):
+        if not self._done and self._pos is None:
+            self._pos = pos
+            self._scan()
+
+    def is_empty(self):
+        if self._array is None:
+            return True
+        if self.content[self._array:self._array + 1] != '[':
+            return not self._decode(self._array)[0]
+        pos = self._skip(self._array + 1)
+        return self.content[pos:pos + 1] == ']'
+
+    def items(self):
+        """
+        Yields the items of the array, decoding one at a time
+        """
+        if self._array is None:
+            return
+        if self.content[self._array:self._array + 1] != '[':
+            # null, or any other value
+            value, pos = self._decode(self._array)
+            for item in value or []:
+                yield item
+            self._read_rest(pos)
+            return
+        pos = self._skip(self._array + 1)
+        if self.content[pos:pos + 1] == ']':
+            pos += 1
+        else:
+            while True:
+                item, pos = self._decode(pos)
+                yield item
+                pos = self._skip(pos)
+                char = self.content[pos:pos + 1]
+                pos += 1
+                if char == ']':
+                    break
+                if char != ',':
+                    raise ValueError("Expecting ',' delimiter at char %d" % (pos - 1))
+        self._read_rest(pos)
+
+    def get(self, name, default=None):
+        if name == self.key:
+            return StreamedItems(self) if self._array is not None else default
+        if name not in self.fields and not self._done and self._array is not None:
+            # the members after the array, which is gone through to reach them
+            for item in self.items():
+                pass
+        return self.fields.get(name, default)
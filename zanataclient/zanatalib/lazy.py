@@ -0,0 +1,68 @@
+# vim: set et sts=4 sw=4:
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "lazy_package",
+)
+
+import importlib
+import sys
+import types
+
+
+class LazyPackage(types.ModuleType):
+    """
+    Package whose names are imported from their modules when first read,
+    so that importing it, as the zanata command does for every run, does
+    not load httplib2, lxml and polib before a command needs them
+    """
+    def __init__(self, package, exports):
+        """
+        LazyPackage constructor
+        :param package: module of the package, replaced by this one
+        :param exports: (module, names) pairs, modules relative to the package
+        """
+        super(LazyPackage, self).__init__(package.__name__, package.__doc__)
+        self.__dict__.update(package.__dict__)
+        # the globals of the package module are cleared once it is gone
+        self._package = package
+        self._exports = dict((name, module) for module, names in exports for name in names)
+        self.__all__ = sorted(
+            set(self._exports) | set(name for name in package.__dict__ if not name.startswith('_'))
+        )
+
+    def __getattr__(self, name):
+        # only called for the names not set yet
+        module = self.__dict__.get('_exports', {}).get(name)
+        if module is None:
+            raise AttributeError("'module' object has no attribute '%s'" % name)
+        value = getattr(importlib.import_module('.' + module, self.__name__), name)
+        setattr(self, name, value)
+        return value
+
+    def __dir__(self):
+        return sorted(set(self.__dict__) | set(self._exports))
+
+
+def lazy_package(name, exports):
+    """
+    Replaces the package in sys.modules with a LazyPackage of it, called at
+    the end of its __init__
+    :param exports: (module, names) pairs
+    """
+    sys.modules[name] = LazyPackage(sys.modules[name], exports)
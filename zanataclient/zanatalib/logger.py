@@ -23,6 +23,12 @@ __all__ = (
     "Logger",
 )
 
+import threading
+
+
+# one message at a time, when logging from worker threads
+_print_lock = threading.Lock()
+
 
 class TextColour:
     HEADER = '\033[95m'
@@ -44,20 +50,24 @@ class Logger:
         self.error_prefix = '[ERROR] '
         self.info_prefix = '[INFO] '
 
+    def _print(self, message):
+        with _print_lock:
+            print(message)
+
     def info(self, message):
         if self.enable_infoprefix:
-            print(self.info_prefix + message)
+            self._print(self.info_prefix + message)
         else:
-            print(message)
+            self._print(message)
 
     def warn(self, message):
         if self.enable_warnprefix:
-            print(self.warn_prefix + message)
+            self._print(self.warn_prefix + message)
         else:
-            print(message)
+            self._print(message)
 
     def error(self, message):
         if self.enable_errprefix:
-            print(self.error_prefix + message)
+            self._print(self.error_prefix + message)
         else:
-            print(message)
+            self._print(message)
@@ -38,7 +38,7 @@ class ProjectService(Service):
     def __init__(self, *args, **kargs):
         super(ProjectService, self).__init__(*args, **kargs)
         self.iterations = IterationService(
-            self.base_url, self.http_headers
+            self.base_url, self.http_headers, restclient=self.restclient
         )
 
     def disable_ssl_cert_validation(self):
@@ -87,7 +87,7 @@ class ProjectService(Service):
             project.name, project.id, project.desc, project.type
         )
         res, content = self.restclient.process_request(
-            'create_project', project.id, body=self._to_unicode(body), headers=self.http_headers
+            'create_project', project.id, body=self._to_bytes(body), headers=self.http_headers
         )
         return self.messages(res, content, "The project is already exist on server")
 
@@ -139,7 +139,7 @@ class IterationService(Service):
         """
         body = '''{"name":"%s","id":"%s","description":"%s"}''' % (iteration.name, iteration.id, iteration.desc)
         res, content = self.restclient.process_request(
-            'create_iteration', projectid, iteration.id, body=self._to_unicode(body), headers=self.http_headers
+            'create_iteration', projectid, iteration.id, body=self._to_bytes(body), headers=self.http_headers
         )
         return self.messages(res, content, "The Version is already exist on server")
 
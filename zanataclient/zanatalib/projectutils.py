@@ -26,6 +26,7 @@ __all__ = (
 )
 
 import fnmatch
+import hashlib
 import os
 import sys
 from xml.etree import cElementTree as ET
@@ -150,6 +151,18 @@ class ToolBox(object):
                 # set attribute
                 element.set(k, unicode(v))
 
+    @staticmethod
+    def get_cache_dir(name, *keys):
+        """
+        Returns a folder under $XDG_CACHE_HOME/zanata/name, one for each keys
+        :param name: kind of cached data, e.g. http
+        :param keys: e.g. server url and user name
+        :return: path
+        """
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        digest = hashlib.sha1('\n'.join(keys).encode('utf-8')).hexdigest()
+        return os.path.join(cache_home, 'zanata', name, digest)
+
     @staticmethod
     def dict2xml(root_elem, dict_object):
         """
@@ -198,7 +211,12 @@ class FileMappingRule(object):
             map_path = os.path.join(self.translation_folder, map_path)
         subdirectory = map_path[:map_path.rfind('/')]
         if subdirectory and not os.path.isdir(subdirectory):
-            os.makedirs(subdirectory)
+            try:
+                os.makedirs(subdirectory)
+            except OSError:
+                # created meanwhile by a parallel job
+                if not os.path.isdir(subdirectory):
+                    raise
         if '//' in map_path:
             map_path = map_path.replace('//', '/')
         return map_path
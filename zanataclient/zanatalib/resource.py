@@ -28,19 +28,25 @@ __all__ = (
 from .docservice import DocumentService
 from .glossaryservice import GlossaryService
 from .projectservice import ProjectService
+from .rest.client import RestClient
 from .statservice import StatService
 from .versionservice import VersionService
 
 
 class ZanataResource:
-    def __init__(self, base_url, http_headers):
+    def __init__(self, base_url, http_headers, **client_options):
+        """
+        ZanataResource constructor
+        :param client_options: pool_size, idle_timeout, cache, compress_requests for the shared RestClient
+        """
         self.base_url = base_url
-        self.projects = ProjectService(base_url, http_headers)
-        self.documents = DocumentService(self.projects, base_url, http_headers)
-        self.version = VersionService(base_url, http_headers)
-        self.glossary = GlossaryService(base_url, http_headers)
-        self.stats = StatService(base_url, http_headers)
+        # one RestClient, and so one connection pool, for all the services
+        self.restclient = RestClient(base_url, **client_options)
+        self.projects = ProjectService(base_url, http_headers, restclient=self.restclient)
+        self.documents = DocumentService(self.projects, base_url, http_headers, restclient=self.restclient)
+        self.version = VersionService(base_url, http_headers, restclient=self.restclient)
+        self.glossary = GlossaryService(base_url, http_headers, restclient=self.restclient)
+        self.stats = StatService(base_url, http_headers, restclient=self.restclient)
 
     def disable_ssl_cert_validation(self):
-        self.projects.disable_ssl_cert_validation()
-        self.version.disable_ssl_cert_validation()
+        self.restclient.disable_ssl_cert_validation()
@@ -20,4 +20,8 @@
 # Boston, MA  02110-1301, USA.
 
 
+from .cache import HttpCache
 from .client import RestClient
+from .memo import RequestMemo
+from .retry import RetryPolicy
+from .transfer import TransferStats
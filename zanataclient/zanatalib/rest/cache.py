@@ -0,0 +1,124 @@
+# vim: set et sts=4 sw=4:
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "HttpCache",
+)
+
+import os
+import tempfile
+import threading
+
+import httplib2
+
+
+# in MB
+DEFAULT_CACHE_SIZE = 100
+TEMP_PREFIX = '.tmp'
+
+
+class HttpCache(httplib2.FileCache):
+    """
+    Persistent httplib2 cache, responses carrying an ETag or Last-Modified
+    header are revalidated with a conditional GET and a 304 reuses the body
+    stored here. Entries are written atomically, so the cache can be shared
+    by parallel jobs, and the least recently used ones are evicted once the
+    cache grows over max_size.
+    """
+    def __init__(self, cache_dir, max_size=DEFAULT_CACHE_SIZE):
+        """
+        HttpCache constructor
+        :param cache_dir: folder of the cache, created when missing
+        :param max_size: size cap in MB
+        """
+        httplib2.FileCache.__init__(self, cache_dir)
+        self.max_size = int(max_size * 1024 * 1024)
+        # estimated, recounted when eviction runs
+        self._size = None
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.cache, self.safe(key))
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.cache):
+            if name.startswith(TEMP_PREFIX):
+                continue
+            path = os.path.join(self.cache, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _evict(self):
+        entries = self._entries()
+        size = sum(entry[1] for entry in entries)
+        # oldest first, get() touches the entries it reads
+        for mtime, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+        return size
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as cached:
+                value = cached.read()
+        except (IOError, OSError):
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key, value):
+        try:
+            fd, temp_path = tempfile.mkstemp(prefix=TEMP_PREFIX, dir=self.cache)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'wb') as cached:
+                cached.write(value)
+            os.rename(temp_path, self._path(key))
+        except (IOError, OSError):
+            # a response which can not be cached is fetched again next time
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        with self._lock:
+            if self._size is None:
+                self._size = sum(entry[1] for entry in self._entries())
+            else:
+                self._size += len(value)
+            if self._size > self.max_size:
+                self._size = self._evict()
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
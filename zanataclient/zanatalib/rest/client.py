@@ -20,32 +20,124 @@
 # Boston, MA  02110-1301, USA.
 
 __all__ = (
-    "RestHandle", "RestClient"
+    "RestHandle", "RestClient", "HttpPool"
 )
 
 try:
     from urllib.parse import urlparse
 except ImportError:
     from urlparse import urlparse
-import os
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+import socket
 import sys
+import threading
+import time
 import warnings
+import zlib
 
 import httplib2
 
-from .config import ServiceConfig
+from .config import ServiceConfig, memoized_services
+from .retry import DEFAULT_RETRIES, DEFAULT_RETRY_BUDGET, RetryPolicy
+from .transfer import TransferStats
 from ..logger import Logger
 
-try:
-    from StringIO import StringIO
-except ImportError:
-    from io import StringIO
 warnings.simplefilter("ignore", DeprecationWarning)
 
 
-CACHE_DIR_NAME = ".cache"
 NO_CERT_VALIDATION = True
 DEFAULT_MAX_REDIRECTS = 10
+DEFAULT_POOL_SIZE = 8
+DEFAULT_IDLE_TIMEOUT = 60
+# smaller bodies are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+COMPRESS_LEVEL = 6
+# statuses of a server which can not read compressed bodies
+COMPRESS_REJECTED = ('400', '415')
+
+
+def gzip_body(body):
+    """
+    Returns body encoded to UTF-8 and gzip compressed
+    """
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8')
+    # wbits 31 writes the gzip header and trailer
+    compressor = zlib.compressobj(COMPRESS_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class HttpPool(object):
+    """
+    Pool of httplib2.Http objects for one server, an Http object keeps its
+    connections open, so handing it over to the next request reuses the
+    keep-alive connection instead of paying a new TCP connect and TLS handshake
+    """
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 disable_ssl_certificate_validation=NO_CERT_VALIDATION, cache=None):
+        """
+        HttpPool constructor
+        :param pool_size: max number of idle Http objects kept, 0 disables reuse
+        :param idle_timeout: seconds after which an idle Http object is closed
+        :param cache: httplib2 cache shared by the Http objects, e.g. HttpCache
+        """
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.disable_ssl_certificate_validation = disable_ssl_certificate_validation
+        self.cache = cache
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _create(self):
+        http = httplib2.Http(
+            self.cache, disable_ssl_certificate_validation=self.disable_ssl_certificate_validation
+        )
+        http.clear_credentials()
+        # the cache is only meant for conditional GETs, a stale ETag sent
+        # as If-Match would make pushes fail with 412
+        http.optimistic_concurrency_methods = []
+        return http
+
+    def _close(self, http):
+        for connection in http.connections.values():
+            connection.close()
+        http.connections.clear()
+
+    def acquire(self):
+        """
+        Returns the most recently released Http object which is not idle for
+        more than idle_timeout, or a new one
+        """
+        stale = []
+        http = None
+        with self._lock:
+            expiry = time.time() - self.idle_timeout
+            stale = [item for item in self._idle if item[0] < expiry]
+            self._idle = [item for item in self._idle if item[0] >= expiry]
+            if self._idle:
+                http = self._idle.pop()[1]
+        for timestamp, stale_http in stale:
+            self._close(stale_http)
+        return http or self._create()
+
+    def release(self, http):
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append((time.time(), http))
+                return
+        self._close(http)
+
+    def discard(self, http):
+        self._close(http)
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for timestamp, http in idle:
+            self._close(http)
 
 
 class RestHandle(object):
@@ -57,9 +149,9 @@ class RestHandle(object):
         RestHandle constructor
         :param args: base="http://localhost", uri="/zanata", method="GET"
         :param kwargs: body=None, headers=None, redirections=DEFAULT_MAX_REDIRECTS, connection_type=None,
-                        cache=".cache", ext="?lang=hi"
+                        ext="?lang=hi", http=httplib2.Http(), transfer=TransferStats(),
+                        raw=True to get the content as bytes, not decoded
         """
-        enable_cache = False
         self.enable_custom_url_redirection = True
         if len([arg for arg in args if arg]) != 3:
             raise Exception('Insufficient args.')
@@ -69,20 +161,14 @@ class RestHandle(object):
             if value:
                 setattr(self, str(attrib), value)
 
-        if enable_cache:
-            cache_dir_name = getattr(self, 'cache', None) or CACHE_DIR_NAME
-            if cache_dir_name and os.path.exists(cache_dir_name):
-                [os.remove(os.path.join(cache_dir_name, file)) for file in os.listdir(cache_dir_name)]
-        else:
-            cache_dir_name = None
-
-        disable_ssl_certificate_validation = getattr(self, 'disable_ssl_certificate_validation', None)
-        if disable_ssl_certificate_validation is None:
-            disable_ssl_certificate_validation = NO_CERT_VALIDATION
-        self.http = httplib2.Http(
-            cache_dir_name, disable_ssl_certificate_validation=disable_ssl_certificate_validation
-        )
-        self.http.clear_credentials()
+        if not getattr(self, 'http', None):
+            disable_ssl_certificate_validation = getattr(self, 'disable_ssl_certificate_validation', None)
+            if disable_ssl_certificate_validation is None:
+                disable_ssl_certificate_validation = NO_CERT_VALIDATION
+            self.http = httplib2.Http(
+                None, disable_ssl_certificate_validation=disable_ssl_certificate_validation
+            )
+            self.http.clear_credentials()
         self.log = Logger()
 
     def _get_url(self):
@@ -93,11 +179,21 @@ class RestHandle(object):
 
     def _call_request(self, uri, http_method, **args_dict):
         try:
-            # format body
+            # the body is sent as it is, without another copy, and can be sent
+            # again by httplib2 when a kept-alive connection turns out closed
             if args_dict.get('body'):
-                thelen = str(len(args_dict['body']))
-                args_dict['headers']['Content-Length'] = thelen
-                args_dict['body'] = StringIO(args_dict['body'])
+                if not isinstance(args_dict['body'], bytes):
+                    args_dict['body'] = args_dict['body'].encode('utf-8')
+                args_dict['headers']['Content-Length'] = str(len(args_dict['body']))
+                # httplib joins the request line and headers with a bytes body,
+                # none of them can be unicode on python 2
+                uri = self._to_native(httplib2.iri2uri(uri))
+                args_dict['headers'] = dict(
+                    (self._to_native(name), self._to_native(value)) for name, value in args_dict['headers'].items()
+                )
+            # decode and count the responses on the connections of the transfer stats
+            if getattr(self, 'transfer', None):
+                args_dict['connection_type'] = self.transfer.connection_type(uri)
             # make request
             response, content = self.http.request(
                 uri, http_method, **args_dict
@@ -112,6 +208,9 @@ class RestHandle(object):
             sys.exit(2)
         except MemoryError as e:
             self.log.error("The file is too big to process")
+        except (socket.error, httplib.HTTPException):
+            # the RestClient retries the requests on a reset connection
+            raise
         except Exception as e:
             value = str(e).rstrip()
             if value == 'a float is required':
@@ -124,6 +223,11 @@ class RestHandle(object):
                 self.log.error("%s" % e)
                 sys.exit(2)
 
+    def _to_native(self, value):
+        if not isinstance(value, str):
+            return value.encode('utf-8')
+        return value
+
     def _http_https_msg(self, url):
         self.log.warn(
             "Redirecting to: %s" % '{uri.scheme}://{uri.netloc}/.. '
@@ -162,26 +266,53 @@ class RestHandle(object):
                 response, content = self.manage_redirection(response, args_dict)
                 redirects_count -= 1
 
-        return response, content.decode("UTF-8")
+        return response, content if getattr(self, 'raw', False) else content.decode("UTF-8")
 
 
 class RestClient(object):
-    def __init__(self, base_url, disable_ssl_certificate_validation=True):
+    def __init__(self, base_url, disable_ssl_certificate_validation=True,
+                 pool_size=DEFAULT_POOL_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, cache=None,
+                 compress_requests=False, retries=DEFAULT_RETRIES, retry_budget=DEFAULT_RETRY_BUDGET,
+                 memo=None):
+        """
+        RestClient constructor
+        :param compress_requests: send the request bodies gzip compressed, turned off
+                                  for good if the server rejects them
+        :param retries: retries of an idempotent request on a gateway error or reset connection
+        :param retry_budget: retries of all the requests
+        :param memo: RequestMemo of the GET responses, shared by the RestClients
+                     of a command run, none by default
+        """
         self.base_url = base_url
         self.disable_ssl_certificate_validation = \
             disable_ssl_certificate_validation
+        self.pool = HttpPool(pool_size, idle_timeout, disable_ssl_certificate_validation, cache)
+        self.compress_requests = compress_requests
+        self.transfer = TransferStats()
+        self.retry = RetryPolicy(retries, retry_budget)
+        self.memo = memo
+        self.log = Logger()
 
     def disable_ssl_cert_validation(self):
         self.disable_ssl_certificate_validation = True
+        self.pool.disable_ssl_certificate_validation = True
+        self.pool.clear()
 
     def process_request(self, service_name, *args, **kwargs):
-        headers = kwargs['headers'] if 'headers' in kwargs else {}
+        # a copy, the headers of a service are shared by the parallel jobs
+        headers = dict(kwargs['headers']) if 'headers' in kwargs else {}
         body = kwargs['body'] if 'body' in kwargs else None
+        # encoded once, the same bytes are sent again by the retries
+        if body is not None and not isinstance(body, bytes):
+            body = body.encode('utf-8')
         extension = kwargs['extension'] if 'extension' in kwargs else None
+        # the content of a large response is left in bytes for a StreamedObject
+        raw = kwargs.get('raw', False)
         service_details = ServiceConfig(service_name)
         # set headers
         if hasattr(service_details, 'response_media_type') and service_details.response_media_type:
             headers['Accept'] = service_details.response_media_type
+        headers['Accept-Encoding'] = 'gzip, deflate'
         if hasattr(service_details, 'request_media_type') and service_details.request_media_type and body:
             headers['Content-Type'] = service_details.request_media_type
         # set resource
@@ -189,10 +320,70 @@ class RestClient(object):
             service_details.resource.format(**dict(zip(service_details.path_params, args)))
             if args else service_details.resource
         )
-        # initiate service call
-        rest_handle = RestHandle(
-            self.base_url, resource, service_details.http_method,
-            body=body, headers=headers, ext=extension, connection_type=None, cache=None,
-            disable_ssl_certificate_validation=self.disable_ssl_certificate_validation
-        )
-        return rest_handle.get_response_content()
+        method = service_details.http_method
+        if self.memo is None:
+            return self._send_request(method, resource, body, headers, extension, raw)
+        path = self.base_url.rstrip('/') + resource
+        if method == 'GET' and service_name in memoized_services:
+            key = (path, extension, raw, tuple(sorted(headers.items())))
+            return self.memo.fetch(key, path, lambda: self._request(method, resource, body, headers, extension, raw=raw))
+        try:
+            return self._send_request(method, resource, body, headers, extension, raw)
+        finally:
+            if method not in ('GET', 'HEAD'):
+                self.memo.invalidate(path)
+
+    def _send_request(self, method, resource, body, headers, extension, raw=False):
+        compressed = self.compress_requests and body and len(body) >= MIN_COMPRESS_SIZE
+        if compressed:
+            response, content = self._request(
+                method, resource, gzip_body(body), dict(headers, **{'Content-Encoding': 'gzip'}), extension,
+                len(body), raw
+            )
+            if response['status'] not in COMPRESS_REJECTED:
+                return response, content
+        response, content = self._request(method, resource, body, headers, extension, raw=raw)
+        if compressed and response['status'] not in COMPRESS_REJECTED:
+            self.log.warn("The server does not accept compressed requests, sending them uncompressed")
+            self.compress_requests = False
+        return response, content
+
+    def _request(self, method, resource, body, headers, extension, body_size=None, raw=False):
+        attempt = 0
+        while True:
+            try:
+                response, content = self._send(method, resource, body, headers, extension, body_size, raw)
+            except (socket.error, httplib.HTTPException) as e:
+                reason = str(e).strip() or e.__class__.__name__
+                delay = self.retry.next_delay(method, attempt, error=e)
+                if delay is None:
+                    self.log.error(reason)
+                    sys.exit(2)
+            else:
+                delay = self.retry.next_delay(method, attempt, response=response)
+                if delay is None:
+                    return response, content
+                reason = "The server returned %s" % response['status']
+            self.log.warn("%s for %s, retrying in %.1fs" % (reason, resource, delay))
+            time.sleep(delay)
+            attempt += 1
+
+    def _send(self, method, resource, body, headers, extension, body_size=None, raw=False):
+        body_size = len(body or '') if body_size is None else body_size
+        self.transfer.add(requests=1, bytes_sent=len(body or ''), bytes_sent_decoded=body_size)
+        # initiate service call, on a pooled http object
+        http = self.pool.acquire()
+        try:
+            rest_handle = RestHandle(
+                self.base_url, resource, method,
+                body=body, headers=headers, ext=extension, connection_type=None,
+                disable_ssl_certificate_validation=self.disable_ssl_certificate_validation, http=http,
+                transfer=self.transfer, raw=raw
+            )
+            response, content = rest_handle.get_response_content()
+        except (socket.error, httplib.HTTPException):
+            # its connection may be broken, it is not handed over
+            self.pool.discard(http)
+            raise
+        self.pool.release(http)
+        return response, content
@@ -250,6 +250,12 @@ zpc_services = {
     'project_config': project_config,
 }
 
+# small resources read several times by a command, their GET responses are memoized
+memoized_services = (
+    'server_version', 'list_projects', 'list_project', 'get_iteration', 'list_files',
+    'project_locales', 'iteration_locales', 'project_config',
+)
+
 
 class ServiceConfig(object):
     def __init__(self, service):
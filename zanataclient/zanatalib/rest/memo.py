@@ -0,0 +1,107 @@
+# vim: set et sts=4 sw=4:
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "RequestMemo",
+)
+
+import threading
+import time
+
+from ..jobpool import wait_interruptibly
+
+
+# in seconds, a command reads the same project, version and document
+# list again within that time
+DEFAULT_MEMO_TTL = 60
+
+
+def is_related(path, other):
+    """
+    Tells whether one of the resources is the other or one under it
+    """
+    return path == other or path.startswith(other + '/') or other.startswith(path + '/')
+
+
+class RequestMemo(object):
+    """
+    Responses of the GETs of the small resources a command reads several
+    times: the project, the version, its locales and document list. The
+    RestClients of a command run share them, and the threads asking for the
+    same resource at once wait for a single request. A write drops the
+    responses of the resource, of those under it and of those it is under,
+    e.g. the document list when a document is pushed.
+    """
+    def __init__(self, ttl=DEFAULT_MEMO_TTL):
+        """
+        RequestMemo constructor
+        :param ttl: seconds a response is reused for
+        """
+        self.ttl = ttl
+        # key: (expiry, path, response, content)
+        self._entries = {}
+        # key: event set once the request of the key is done
+        self._in_flight = {}
+        # bumped by the writes, a response read meanwhile is not kept
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def fetch(self, key, path, request):
+        """
+        Returns the response kept for key, or the one of request(), called
+        once for all the threads asking for key at the same time
+        :param path: url of the resource, without the query
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > time.time():
+                    return entry[2], entry[3]
+                event = self._in_flight.get(key)
+                if event is None:
+                    event = self._in_flight[key] = threading.Event()
+                    generation = self._generation
+                    break
+            # the next one asks again if that request failed
+            wait_interruptibly(event)
+        try:
+            response, content = request()
+            if response['status'] == '200':
+                with self._lock:
+                    if generation == self._generation:
+                        self._entries[key] = (time.time() + self.ttl, path, response, content)
+            return response, content
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            event.set()
+
+    def invalidate(self, path):
+        """
+        Drops the responses related to path, after a write to it
+        """
+        with self._lock:
+            self._generation += 1
+            for key, entry in list(self._entries.items()):
+                if is_related(entry[1], path):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
@@ -0,0 +1,121 @@
+# vim: set et sts=4 sw=4:
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "RetryPolicy",
+)
+
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+import errno
+import random
+import socket
+import ssl
+import threading
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+
+# retries of a request
+DEFAULT_RETRIES = 4
+# retries of all the requests of a RestClient
+DEFAULT_RETRY_BUDGET = 50
+# in seconds
+DEFAULT_BACKOFF = 1.0
+DEFAULT_MAX_DELAY = 30.0
+MAX_RETRY_AFTER = 300.0
+# pushing the same document or translations again gives the same result
+RETRY_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE')
+RETRY_STATUSES = ('502', '503', '504')
+RETRY_ERRNOS = (errno.ECONNRESET, errno.ECONNREFUSED, errno.ECONNABORTED, errno.EPIPE, errno.ETIMEDOUT)
+
+
+def parse_retry_after(value):
+    """
+    Returns the seconds to wait from a Retry-After header, in seconds or
+    as an HTTP date
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    date = parsedate_tz(value)
+    if date is None:
+        return None
+    return max(0.0, mktime_tz(date) - time.time())
+
+
+class RetryPolicy(object):
+    """
+    Retries of the idempotent requests answered with a gateway error or
+    whose connection was reset, as a server restarting or behind an
+    overloaded proxy does. The delay doubles with each attempt, with half
+    of it random so that parallel jobs do not come back all at once, unless
+    the server gives a Retry-After.
+    """
+    def __init__(self, retries=DEFAULT_RETRIES, budget=DEFAULT_RETRY_BUDGET,
+                 backoff=DEFAULT_BACKOFF, max_delay=DEFAULT_MAX_DELAY):
+        """
+        RetryPolicy constructor
+        :param retries: max number of retries of a request, 0 disables them
+        :param budget: max number of retries of all the requests, so that a
+                       server which is down does not keep every job waiting
+        :param backoff: delay before the first retry in seconds
+        :param max_delay: cap of the delay in seconds
+        """
+        self.retries = retries
+        self.budget = budget
+        self.backoff = backoff
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+
+    def is_retryable(self, method, response=None, error=None):
+        if method not in RETRY_METHODS:
+            return False
+        if error is not None:
+            # certificate and protocol errors do not go away
+            if isinstance(error, ssl.SSLError):
+                return False
+            if isinstance(error, socket.timeout) or isinstance(error, httplib.HTTPException):
+                return True
+            return isinstance(error, socket.error) and error.errno in RETRY_ERRNOS
+        return response is not None and response['status'] in RETRY_STATUSES
+
+    def get_delay(self, attempt, response=None):
+        retry_after = parse_retry_after(response.get('retry-after')) if response is not None else None
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER)
+        delay = min(self.max_delay, self.backoff * 2 ** attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    def next_delay(self, method, attempt, response=None, error=None):
+        """
+        Returns the seconds to wait before retrying the request, or None
+        when it is not retried
+        :param attempt: number of retries made already
+        """
+        if attempt >= self.retries or not self.is_retryable(method, response, error):
+            return None
+        with self._lock:
+            if self.budget <= 0:
+                return None
+            self.budget -= 1
+        return self.get_delay(attempt, response)
@@ -0,0 +1,149 @@
+# vim: set et sts=4 sw=4:
+# Zanata Python Client
+#
+# This library is free software; you can redistribute it and/or
+# modify it under the terms of the GNU Lesser General Public
+# License as published by the Free Software Foundation; either
+# version 2 of the License, or (at your option) any later version.
+#
+# This library is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Lesser General Public License for more details.
+#
+# You should have received a copy of the GNU Lesser General Public
+# License along with this program; if not, write to the
+# Free Software Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+
+__all__ = (
+    "TransferStats",
+)
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+try:
+    import httplib
+except ImportError:
+    import http.client as httplib
+import threading
+import time
+import zlib
+
+import httplib2
+
+
+CHUNK_SIZE = 65536
+# zlib or gzip header, detected by zlib
+AUTO_WBITS = 32 + zlib.MAX_WBITS
+
+
+class DecodingResponse(httplib.HTTPResponse):
+    """
+    HTTPResponse which inflates a gzip or deflate body chunk by chunk as it
+    is read, so the compressed body is never held as a whole, and records
+    the bytes received before and after decoding
+    """
+    stats = None
+
+    def _decompressor(self, encoding, chunk):
+        if encoding == 'deflate' and chunk:
+            # some servers send raw deflate data, without the zlib header
+            header = bytearray(chunk[:2])
+            if len(header) < 2 or header[0] & 0x0f != 8 or (header[0] * 256 + header[1]) % 31:
+                return zlib.decompressobj(-zlib.MAX_WBITS)
+        return zlib.decompressobj(AUTO_WBITS)
+
+    def read(self, amt=None):
+        encoding = (self.getheader('content-encoding') or '').lower()
+        if amt is not None or encoding not in ('gzip', 'x-gzip', 'deflate'):
+            data = httplib.HTTPResponse.read(self, amt)
+            if self.stats:
+                self.stats.add(bytes_received=len(data), bytes_received_decoded=len(data))
+            return data
+
+        received = 0
+        chunks = []
+        decompressor = None
+        try:
+            while True:
+                chunk = httplib.HTTPResponse.read(self, CHUNK_SIZE)
+                if not chunk:
+                    break
+                received += len(chunk)
+                decompressor = decompressor or self._decompressor(encoding, chunk)
+                chunks.append(decompressor.decompress(chunk))
+            if decompressor:
+                chunks.append(decompressor.flush())
+        except zlib.error:
+            raise httplib2.FailedToDecompressContent(
+                "Content purported to be compressed with %s but failed to decompress." % encoding, {}, b''
+            )
+        content = b''.join(chunks)
+        if self.stats:
+            self.stats.add(bytes_received=received, bytes_received_decoded=len(content))
+        # the body is decoded already, mark it the way httplib2 does
+        self.msg['-content-encoding'] = self.msg['content-encoding']
+        del self.msg['content-encoding']
+        del self.msg['content-length']
+        self.msg['content-length'] = str(len(content))
+        return content
+
+
+def format_size(size):
+    for unit in ('bytes', 'KB', 'MB'):
+        if size < 1024:
+            break
+        size /= 1024.0
+    else:
+        unit = 'GB'
+    return ('%d %s' if unit == 'bytes' else '%.1f %s') % (size, unit)
+
+
+class TransferStats(object):
+    """
+    Requests made by a RestClient, with the bytes sent and received on the
+    wire and before compression
+    """
+    def __init__(self):
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_sent_decoded = 0
+        self.bytes_received = 0
+        self.bytes_received_decoded = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+        # httplib2 creates the connections and httplib their responses, which
+        # find the stats on their class. object is a base as httplib classes
+        # are classic ones on python 2
+        response_class = type('DecodingResponse', (DecodingResponse, object), {'stats': self})
+        self.connection_types = dict(
+            (scheme, type(connection_class.__name__, (connection_class, object), {'response_class': response_class}))
+            for scheme, connection_class in (('http', httplib2.HTTPConnectionWithTimeout),
+                                             ('https', httplib2.HTTPSConnectionWithTimeout))
+        )
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def connection_type(self, url):
+        """
+        Returns the httplib2 connection_type for url
+        """
+        return self.connection_types.get(urlparse(url).scheme)
+
+    def summary(self):
+        """
+        e.g. 35 requests in 2.3s, sent 1.2 MB (6.0 MB uncompressed), received 310.4 KB (2.9 MB uncompressed)
+        """
+        message = "%d requests in %.1fs" % (self.requests, time.time() - self.started)
+        for direction, wire, decoded in (('sent', self.bytes_sent, self.bytes_sent_decoded),
+                                         ('received', self.bytes_received, self.bytes_received_decoded)):
+            message += ", %s %s" % (direction, format_size(wire))
+            if decoded != wire:
+                message += " (%s uncompressed)" % format_size(decoded)
+        return message
@@ -14,6 +14,7 @@ from error import (
     UnavailableServiceError,
     UnexpectedStatusException,
 )
+from jsonstream import StreamedObject
 from projectutils import ToolBox
 
 from rest.client import RestClient
@@ -46,7 +47,9 @@ class Service(object):
             setattr(self, name, val)
         for key, value in kargs.iteritems():
             setattr(self, key, value)
-        self.restclient = RestClient(self.base_url)
+        # services created by one ZanataResource share its restclient
+        if not getattr(self, 'restclient', None):
+            self.restclient = RestClient(self.base_url, memo=getattr(self, 'memo', None))
 
     def excption_handler(self, exception_class, error, error_msg):
         try:
@@ -56,14 +59,22 @@ class Service(object):
         finally:
             sys.exit(1)
 
-    def messages(self, res, content, extra_msg=None):
+    def messages(self, res, content, extra_msg=None, stream_key=None):
+        """
+        @param stream_key: member of a JSON response returned as a StreamedObject, whose
+                           array is decoded item by item as it is iterated
+        """
         if res['status'] == '200' or res['status'] == '304':
             rst = None
             if extra_msg:
                 raise ProjectExistException('Status 200', extra_msg)
             try:
-                rst = ToolBox.xmlstring2dict(content) \
-                    if res.get('content-type') and 'xml' in res['content-type'] else json.loads(content)
+                if res.get('content-type') and 'xml' in res['content-type']:
+                    rst = ToolBox.xmlstring2dict(content)
+                elif stream_key:
+                    rst = StreamedObject(content, stream_key)
+                else:
+                    rst = json.loads(content)
             except ValueError, e:
                 if content.strip() == "":
                     return rst
@@ -83,7 +94,10 @@ class Service(object):
             self.excption_handler(UnexpectedStatusException,
                                   'Error', 'Unexpected Status (%s), failed to push: %s' % (res['status'], extra_msg or ""))
 
-    def _to_unicode(self, some_string):
-        if not isinstance(some_string, unicode):
-            return unicode(some_string)
+    def _to_bytes(self, some_string):
+        """
+        Request bodies are sent as they are, encoded to UTF-8 once if need be
+        """
+        if isinstance(some_string, unicode):
+            return some_string.encode('utf-8')
         return some_string